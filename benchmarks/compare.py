@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import argparse
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def load_results(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold):
+    """Return a list of rows comparing benchmarks found in both old and new,
+    and the names of benchmarks whose median wall time regressed by more
+    than threshold percent.
+    """
+    rows = []
+    regressions = []
+    for name, result in new['benchmarks'].items():
+        baseline = old['benchmarks'].get(name)
+        if baseline is None or 'error' in baseline or 'error' in result:
+            continue
+
+        change = (result['wall_time'] / baseline['wall_time'] - 1) * 100
+        if change > threshold:
+            regressions.append(name)
+
+        rows.append((name,
+                     '%.1f' % (baseline['wall_time'] * 1000),
+                     '%.1f' % (result['wall_time'] * 1000),
+                     '%+.1f%%' % change,
+                     '%d -> %d' % (baseline['editor_spawns'], result['editor_spawns']),
+                     '%.1f -> %.1f' % (baseline['peak_rss_kb'] / 1024,
+                                       result['peak_rss_kb'] / 1024)))
+
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+        Compare benchmark results written by run.py, for example between
+        two commits.  Exits with a non-zero status if any benchmark regresses
+        by more than the threshold.
+        """)
+
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent change in median wall time considered a regression '
+                             '(default: 10)')
+
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='increase output verbosity')
+
+    parser.add_argument('old', help='results of the baseline')
+
+    parser.add_argument('new', help='results to compare against the baseline')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s: %(message)s',
+                        level=logging.DEBUG if args.verbose else logging.INFO)
+
+    old = load_results(args.old)
+    new = load_results(args.new)
+    if old.get('wiki') != new.get('wiki'):
+        logger.warning('Results were measured using different wikis')
+
+    rows, regressions = compare(old, new, args.threshold)
+
+    header = ('benchmark', 'old (ms)', 'new (ms)', 'change', 'spawns', 'peak RSS (MiB)')
+    widths = [max(len(row[index]) for row in rows + [header]) for index in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(value.ljust(width) if index == 0 else value.rjust(width)
+                        for index, (value, width) in enumerate(zip(row, widths))))
+
+    for name in regressions:
+        logger.error('%s regressed by more than %g%%', name, args.threshold)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
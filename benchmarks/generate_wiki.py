@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import argparse
+import datetime
+import logging
+import os
+import random
+import sys
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    'default': '= {} =',
+    'markdown': '# {}',
+    'media': '= {} ='
+}
+
+LINKS = {
+    'default': '[[{url}|{description}]]',
+    'markdown': '[{description}]({url})',
+    'media': '[[{url}|{description}]]'
+}
+
+EXTS = {
+    'default': '.wiki',
+    'markdown': '.md',
+    'media': '.mw'
+}
+
+WORDS = """
+    lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod
+    tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam
+    quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo
+    consequat duis aute irure in reprehenderit voluptate velit esse cillum
+    fugiat nulla pariatur excepteur sint occaecat cupidatat non proident sunt
+    culpa qui officia deserunt mollit anim id est laborum
+""".split()
+
+
+def page_names(pages, dirs):
+    """Return names of pages relative to the wiki root; pages are spread
+    evenly over the root and dirs subdirectories.
+    """
+    names = []
+    for index in range(pages):
+        name = 'Page%05d' % index
+        if dirs and index % (dirs + 1):
+            name = 'topic%02d/%s' % (index % (dirs + 1), name)
+        names.append(name)
+
+    return names
+
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def write_page(path, ext, name, lines):
+    filename = os.path.join(path, *name.split('/')) + ext
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def generate(path, pages=1000, links=10, tags=50, diary=365, dirs=10, words=200,
+             broken=0.01, syntax='default', seed=0):
+    """Generate a synthetic wiki in path.  Each page links to links other
+    pages, of which a fraction are broken, and is tagged with up to three of
+    tags distinct tags.  Returns the extension of generated pages.
+    """
+    rng = random.Random(seed)
+    ext = EXTS[syntax]
+    header = HEADERS[syntax]
+    link = LINKS[syntax]
+
+    names = page_names(pages, dirs)
+    tag_names = ['tag%03d' % index for index in range(tags)]
+
+    def make_link(target, description):
+        return link.format(url='/' + target, description=description)
+
+    for name in names:
+        lines = [header.format(name.rpartition('/')[2]), '']
+        if tag_names:
+            lines.extend([':%s:' % ':'.join(rng.sample(tag_names, min(3, len(tag_names)))), ''])
+
+        for _ in range(links):
+            if rng.random() < broken:
+                target = 'Missing%05d' % rng.randrange(pages or 1)
+            else:
+                target = rng.choice(names)
+            lines.append(paragraph(rng, max(words // max(links, 1), 1)))
+            lines.append('See %s.' % make_link(target, target.rpartition('/')[2]))
+            lines.append('')
+
+        write_page(path, ext, name, lines)
+
+    index = [header.format('Index'), '']
+    index.extend('- ' + make_link(name, name) for name in names[:100])
+    write_page(path, ext, 'index', index)
+
+    today = datetime.date(2026, 1, 1)
+    for days in range(diary):
+        date = (today - datetime.timedelta(days=days)).isoformat()
+        write_page(path, ext, 'diary/' + date,
+                   [header.format('Entry for ' + date), '', paragraph(rng, words // 4)])
+
+    write_page(path, ext, 'diary/diary', [header.format('Diary')])
+
+    logger.debug('Generated %d pages and %d diary entries in %s', pages, diary, path)
+    return ext
+
+
+def add_arguments(parser):
+    """Add arguments used to configure generate() to parser."""
+    parser.add_argument('--pages', type=int, default=1000,
+                        help='number of pages (default: 1000)')
+
+    parser.add_argument('--links', type=int, default=10,
+                        help='number of links per page (default: 10)')
+
+    parser.add_argument('--tags', type=int, default=50,
+                        help='number of distinct tags (default: 50)')
+
+    parser.add_argument('--diary', type=int, default=365,
+                        help='number of diary entries (default: 365)')
+
+    parser.add_argument('--dirs', type=int, default=10,
+                        help='number of subdirectories (default: 10)')
+
+    parser.add_argument('--words', type=int, default=200,
+                        help='number of words per page (default: 200)')
+
+    parser.add_argument('--broken', type=float, default=0.01,
+                        help='fraction of links which are broken (default: 0.01)')
+
+    parser.add_argument('--syntax', choices=sorted(EXTS), default='default',
+                        help='syntax of wiki pages (default: default)')
+
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of random number generator (default: 0)')
+
+
+def generate_options(args):
+    """Return keyword arguments for generate() from parsed arguments."""
+    return {name: getattr(args, name)
+            for name in ('pages', 'links', 'tags', 'diary', 'dirs', 'words', 'broken', 'syntax',
+                         'seed')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+        Generate a synthetic wiki of configurable size for benchmarking.
+        """)
+
+    add_arguments(parser)
+
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='increase output verbosity')
+
+    parser.add_argument('path', help='directory to generate wiki in')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s: %(message)s',
+                        level=logging.DEBUG if args.verbose else logging.INFO)
+
+    generate(args.path, **generate_options(args))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import argparse
+import datetime
+import fnmatch
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_wiki import add_arguments, generate, generate_options
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_EDITOR = os.path.join(BENCHMARKS_DIR, 'stub_editor.py')
+
+# The launcher is used when available so that benchmarks measure the same
+# startup path as the installed vimwiki command:
+LAUNCH = """
+import sys
+sys.argv[0] = 'vimwiki'
+try:
+    from vimwiki_cli.launcher import main
+except ImportError:
+    from vimwiki_cli.__main__ import cli as main
+main()
+"""
+
+PAGE = 'topic01/Page00001'
+
+# Benchmarks are run in order as some commands modify the wiki; each is
+# given as a name, command line, and whether cached data is removed before
+# each run to measure a cold start:
+BENCHMARKS = [
+    ('index', [], False),
+    ('help', ['help'], False),
+    ('goto', ['goto', PAGE], False),
+    ('diary', ['diary'], False),
+    ('diary-today', ['diary', 'today'], False),
+    ('diary-tomorrow', ['diary', 'tomorrow'], False),
+    ('diary-yesterday', ['diary', 'yesterday'], False),
+    ('diary-generate-links', ['diary', 'generate-links'], False),
+    ('diary-generate-links-native', ['diary', 'generate-links', '--engine', 'native'], False),
+    ('generate-links', ['generate-links', 'index'], False),
+    ('generate-links-native', ['generate-links', '--engine', 'native', 'index'], False),
+    ('tags-rebuild', ['tags', 'rebuild'], False),
+    ('tags-rebuild-native-cold', ['tags', 'rebuild', '--engine', 'native'], True),
+    ('tags-rebuild-native', ['tags', 'rebuild', '--engine', 'native'], False),
+    ('tags-generate-links', ['tags', 'generate-links', 'index'], False),
+    ('tags-search', ['tags', 'search', 'tag001'], False),
+    ('search-open', ['search', '--open', 'lorem'], False),
+    ('search-cold', ['search', 'lorem ipsum'], True),
+    ('search', ['search', 'lorem ipsum'], False),
+    ('search-regex', ['search', '--regex', r'lab\w+e'], False),
+    ('search-no-index', ['search', '--no-index', 'lorem ipsum'], False),
+    ('check-links', ['check-links'], False),
+    ('check-links-native-cold', ['check-links', '--engine', 'native'], True),
+    ('check-links-native', ['check-links', '--engine', 'native'], False),
+    ('backlinks', ['backlinks', PAGE], False),
+    ('orphans', ['orphans'], False),
+    ('all-html', ['all-html'], False),
+    ('all-html-native-cold', ['all-html', '--engine', 'native'], True),
+    ('all-html-native', ['all-html', '--engine', 'native'], False),
+    ('batch', ['batch', 'tags rebuild', 'generate-links index', 'diary generate-links'], False),
+    ('config-list', ['config', 'list'], True),
+    ('server-status', ['server', 'status'], False)
+]
+
+
+def count_lines(filename):
+    try:
+        with open(filename) as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+
+def run_once(args, env, cwd):
+    """Run vimwiki with args.  Returns (wall time, peak RSS in KiB, exit
+    code, standard error).
+    """
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', LAUNCH] + args, cwd=cwd, env=env,
+                                   stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL,
+                                   stderr=stderr)
+
+        # wait4() reports the peak RSS of the process, including the editor
+        # which may replace it, and its children:
+        _, status, rusage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else \
+            -os.WTERMSIG(status)
+
+        stderr.seek(0)
+        error = stderr.read().decode('utf-8', 'replace')
+
+    rss = rusage.ru_maxrss
+    if sys.platform == 'darwin':
+        rss //= 1024
+
+    return elapsed, rss, process.returncode, error
+
+
+def run_benchmark(name, args, reset, env, cwd, repeat, warmup):
+    """Run a benchmark repeat times after warmup runs.  Returns a dict of
+    results.
+    """
+    log = env['VIMWIKI_BENCH_LOG']
+    cache = env['XDG_CACHE_HOME']
+
+    times = []
+    spawns = []
+    rss = []
+    for index in range(warmup + repeat):
+        if reset:
+            shutil.rmtree(cache, ignore_errors=True)
+
+        before = count_lines(log)
+        elapsed, peak, returncode, error = run_once(args, env, cwd)
+
+        # Commands which fail, for example as they are not supported by the
+        # tree, are not measured further:
+        if returncode not in (0, 1):
+            logger.warning('%s exited with status %d:\n%s', name, returncode, error.strip())
+            return {'args': args, 'cold': reset, 'exit_code': returncode, 'error': error}
+
+        if index >= warmup:
+            times.append(elapsed)
+            spawns.append(count_lines(log) - before)
+            rss.append(peak)
+
+    result = {
+        'args': args,
+        'cold': reset,
+        'times': times,
+        'wall_time': statistics.median(times),
+        'min_time': min(times),
+        'editor_spawns': max(spawns),
+        'peak_rss_kb': max(rss),
+        'exit_code': returncode
+    }
+
+    logger.info('%-30s %9.1f ms %3d spawns %8.1f MiB', name, result['wall_time'] * 1000,
+                result['editor_spawns'], result['peak_rss_kb'] / 1024)
+    return result
+
+
+def selected(name, patterns):
+    """Return True if name matches any of patterns, or no patterns are given."""
+    return not patterns or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def git_commit(tree):
+    """Return commit of tree, or None if it is not a git working tree."""
+    try:
+        process = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=tree,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                 universal_newlines=True)
+    except OSError:
+        return None
+
+    return process.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+        Benchmark vimwiki commands against a synthetic wiki using a stub
+        editor which records invocations.  Results are written as JSON and
+        may be compared between commits using compare.py.
+        """)
+
+    add_arguments(parser)
+
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='number of measured runs per benchmark (default: 5)')
+
+    parser.add_argument('-w', '--warmup', type=int, default=1,
+                        help='number of unmeasured runs per benchmark (default: 1)')
+
+    parser.add_argument('-t', '--tree', default=os.path.dirname(BENCHMARKS_DIR),
+                        help='source tree to benchmark (default: this tree)')
+
+    parser.add_argument('-o', '--output', nargs='?', default=sys.stdout,
+                        type=argparse.FileType('w'),
+                        help='write results to file (default: <stdout>)', metavar='FILE')
+
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list benchmarks and exit')
+
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='increase output verbosity')
+
+    parser.add_argument('patterns', nargs='*', metavar='pattern',
+                        help='run only benchmarks matching pattern (default: all)')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s: %(message)s',
+                        level=logging.DEBUG if args.verbose else logging.INFO)
+
+    benchmarks = [benchmark for benchmark in BENCHMARKS
+                  if selected(benchmark[0], args.patterns)]
+    if args.list:
+        for name, command, _ in benchmarks:
+            print('%-30s vimwiki %s' % (name, ' '.join(command)))
+        return 0
+
+    tree = os.path.abspath(args.tree)
+    options = generate_options(args)
+
+    with tempfile.TemporaryDirectory(prefix='vimwiki-bench-') as tmpdir:
+        path = os.path.join(tmpdir, 'wiki')
+        logger.debug('Generating wiki in %s', path)
+        ext = generate(path, **options)
+
+        env = {key: value for key, value in os.environ.items()
+               if not key.startswith('VIMWIKI_')}
+        env.update({
+            'HOME': os.path.join(tmpdir, 'home'),
+            'XDG_CACHE_HOME': os.path.join(tmpdir, 'cache'),
+            'XDG_RUNTIME_DIR': tmpdir,
+            'PYTHONPATH': tree,
+            'EDITOR': STUB_EDITOR,
+            'VIMWIKI_BENCH_LOG': os.path.join(tmpdir, 'editor.log'),
+            'VIMWIKI_PATH': path,
+            'VIMWIKI_EXT': ext,
+            'VIMWIKI_SYNTAX': options['syntax']
+        })
+        os.makedirs(env['HOME'])
+
+        results = {}
+        for name, command, reset in benchmarks:
+            results[name] = run_benchmark(name, command, reset, env, path,
+                                          args.repeat, args.warmup)
+
+    with args.output as f:
+        json.dump({
+            'version': RESULTS_VERSION,
+            'commit': git_commit(tree),
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'wiki': options,
+            'repeat': args.repeat,
+            'benchmarks': results
+        }, f, indent=2)
+        f.write('\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
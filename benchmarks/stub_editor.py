@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+# A stand-in for the editor which records each invocation and exits without
+# doing any work, so that benchmarks measure vimwiki-cli rather than Vim.
+# Invocations are appended as JSON lines to the file named by the
+# VIMWIKI_BENCH_LOG environment variable.  Scripts sourced with -S are
+# answered as if every command succeeded, and editor servers are never
+# running.
+
+import json
+import os
+import re
+import sys
+
+_WRITEFILE = re.compile(r"call writefile\((s:results|\[json_encode\(s:wikis\)\]), "
+                        r"'((?:[^']|'')*)'\)")
+
+
+def answer(script):
+    """Write the results a script sourced by vimwiki-cli expects."""
+    with open(script) as f:
+        data = f.read()
+
+    for match in _WRITEFILE.finditer(data):
+        filename = match.group(2).replace("''", "'")
+        with open(filename, 'w') as f:
+            if match.group(1) == 's:results':
+                f.write("\n" * data.count("call add(s:results, '')"))
+            else:
+                f.write('[]\n')
+
+
+def main():
+    args = sys.argv[1:]
+
+    log = os.getenv('VIMWIKI_BENCH_LOG')
+    if log:
+        with open(log, 'a') as f:
+            f.write(json.dumps({'args': args, 'cwd': os.getcwd()}) + '\n')
+
+    if '--remote-expr' in args or '--remote-send' in args:
+        sys.stderr.write('E247: no registered server\n')
+        return 1
+
+    if '-S' in args:
+        answer(args[args.index('-S') + 1])
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -33,11 +33,11 @@ setup(name='vimwiki-cli',
       license='BSD-2-Clause',
       keywords='cli vim vimwiki wiki',
       install_requires=[
-          'click>=7.1',
+          'click>=8.0',
       ],
       entry_points={
           'console_scripts': [
-              'vimwiki=vimwiki_cli.__main__:cli'
+              'vimwiki=vimwiki_cli.launcher:main'
           ]
       },
       extras_require={
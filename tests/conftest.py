@@ -22,9 +22,11 @@
 # SUCH DAMAGE.
 
 import os
+import subprocess
 
 import pytest
 
+from vimwiki_cli import trace
 from vimwiki_cli.context import CONTEXT_SETTINGS
 from vimwiki_cli.wiki import Wiki
 
@@ -38,6 +40,19 @@ def setup_env():
             del os.environ[key]
 
 
+# Isolate cached data from the user's cache directory:
+@pytest.fixture(autouse=True)
+def cache_home(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+# Discard spans recorded by each test:
+@pytest.fixture(autouse=True)
+def trace_reset():
+    yield
+    trace.reset()
+
+
 @pytest.fixture(autouse=True)
 def wiki_options():
     return {}
@@ -46,3 +61,19 @@ def wiki_options():
 @pytest.fixture
 def wiki(wiki_options):
     return Wiki(**wiki_options)
+
+
+# Git repository isolated from the user's configuration:
+@pytest.fixture
+def repo(monkeypatch, tmp_path):
+    path = tmp_path / 'repo'
+    path.mkdir()
+    monkeypatch.chdir(path)
+    monkeypatch.setenv('GIT_CONFIG_GLOBAL', os.devnull)
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    for args in (['init', '-q'],
+                 ['config', 'user.name', 'vimwiki-cli'],
+                 ['config', 'user.email', 'vimwiki-cli@example.com']):
+        subprocess.run(['git'] + args, check=True)
+
+    return path
@@ -0,0 +1,81 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+
+import mock
+import pytest
+
+from vimwiki_cli.cache import *
+
+
+def test_cache_dir(tmp_path):
+    dirname = cache_dir(str(tmp_path))
+    assert os.path.isdir(dirname)
+    assert dirname.startswith(os.environ['XDG_CACHE_HOME'])
+
+    assert cache_dir(str(tmp_path)) == dirname
+    assert cache_dir(str(tmp_path / 'other')) != dirname
+
+
+def test_file_hash(tmp_path):
+    (tmp_path / 'a').write_bytes(b'data')
+    (tmp_path / 'b').write_bytes(b'data')
+    (tmp_path / 'c').write_bytes(b'other')
+
+    assert file_hash(str(tmp_path / 'a')) == file_hash(str(tmp_path / 'b'))
+    assert file_hash(str(tmp_path / 'a')) != file_hash(str(tmp_path / 'c'))
+
+
+def test_atomic_write(tmp_path):
+    filename = tmp_path / 'file'
+    filename.write_text('old')
+    filename.chmod(0o600)
+
+    atomic_write(str(filename), 'new')
+    assert filename.read_text() == 'new'
+    assert filename.stat().st_mode & 0o777 == 0o600
+    assert os.listdir(str(tmp_path)) == ['file']
+
+
+@mock.patch('os.replace', side_effect=OSError)
+def test_atomic_write_with_error(mock_replace, tmp_path):
+    with pytest.raises(OSError):
+        atomic_write(str(tmp_path / 'file'), b'data')
+
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_update_file(tmp_path):
+    filename = str(tmp_path / 'file')
+    assert update_file(filename, 'data') is True
+    assert update_file(filename, 'data') is False
+    assert update_file(filename, b'other') is True
+
+
+def test_json(tmp_path):
+    filename = str(tmp_path / 'file.json')
+    assert load_json(filename, 'DEFAULT') == 'DEFAULT'
+
+    save_json(filename, {'key': ['value']})
+    assert load_json(filename) == {'key': ['value']}
@@ -21,11 +21,20 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import os
+import subprocess
+import sys
+
 import mock
 import pytest
 from click.testing import CliRunner
 
 from vimwiki_cli.__main__ import *
+from vimwiki_cli.editor import Batch, BatchResult, ServerError
+from vimwiki_cli.links import Link
+from vimwiki_cli.metadata import Location
+from vimwiki_cli.search import Match
+from vimwiki_cli.settings import DEFAULT_WIKI, ConfigError
 from vimwiki_cli.wiki import Wiki
 
 
@@ -41,7 +50,16 @@ def runner():
     ('--count 42', {'count': 42}),
     ('--select', {'select': True}),
     ('--open-matches', {'open_matches': True}),
-    ('--open-tabs', {'open_tabs': True})
+    ('--open-tabs', {'open_tabs': True}),
+    ('--no-interactive', {'interactive': False}),
+    ('--server', {'server': True}),
+    ('--servername NAME', {'servername': 'NAME'}),
+    ('--timeout 1.5', {'timeout': 1.5}),
+    ('--path PATH', {'path': 'PATH'}),
+    ('--ext .md', {'ext': '.md'}),
+    ('--syntax markdown', {'syntax': 'markdown'}),
+    ('--path-html PATH', {'path_html': 'PATH'}),
+    ('--template-path PATH', {'template_path': 'PATH'})
 ])
 def test_options(_, mock_make_wiki, runner, args, expected):
     result = runner.invoke(cli, args=args)
@@ -59,7 +77,16 @@ def test_options(_, mock_make_wiki, runner, args, expected):
     ({'count': Wiki.DEFAULT_COUNT}),
     ({'select': Wiki.DEFAULT_SELECT}),
     ({'open_matches': Wiki.DEFAULT_OPEN_MATCHES}),
-    ({'open_tabs': Wiki.DEFAULT_OPEN_TABS})
+    ({'open_tabs': Wiki.DEFAULT_OPEN_TABS}),
+    ({'interactive': Wiki.DEFAULT_INTERACTIVE}),
+    ({'server': Wiki.DEFAULT_SERVER}),
+    ({'servername': Wiki.DEFAULT_SERVERNAME}),
+    ({'timeout': Wiki.DEFAULT_TIMEOUT}),
+    ({'path': Wiki.DEFAULT_PATH}),
+    ({'ext': Wiki.DEFAULT_EXT}),
+    ({'syntax': Wiki.DEFAULT_SYNTAX}),
+    ({'path_html': Wiki.DEFAULT_PATH_HTML}),
+    ({'template_path': Wiki.DEFAULT_TEMPLATE_PATH})
 ])
 def test_options_with_defaults(_, mock_make_wiki, runner, expected):
     result = runner.invoke(cli)
@@ -77,7 +104,16 @@ def test_options_with_defaults(_, mock_make_wiki, runner, expected):
     ({'VIMWIKI_COUNT': '42'}, {'count': 42}),
     ({'VIMWIKI_SELECT': '1'}, {'select': True}),
     ({'VIMWIKI_OPEN_MATCHES': '1'}, {'open_matches': True}),
-    ({'VIMWIKI_OPEN_TABS': '1'}, {'open_tabs': True})
+    ({'VIMWIKI_OPEN_TABS': '1'}, {'open_tabs': True}),
+    ({'VIMWIKI_INTERACTIVE': '0'}, {'interactive': False}),
+    ({'VIMWIKI_SERVER': '1'}, {'server': True}),
+    ({'VIMWIKI_SERVERNAME': 'NAME'}, {'servername': 'NAME'}),
+    ({'VIMWIKI_TIMEOUT': '1.5'}, {'timeout': 1.5}),
+    ({'VIMWIKI_PATH': 'PATH'}, {'path': 'PATH'}),
+    ({'VIMWIKI_EXT': '.md'}, {'ext': '.md'}),
+    ({'VIMWIKI_SYNTAX': 'markdown'}, {'syntax': 'markdown'}),
+    ({'VIMWIKI_PATH_HTML': 'PATH'}, {'path_html': 'PATH'}),
+    ({'VIMWIKI_TEMPLATE_PATH': 'PATH'}, {'template_path': 'PATH'})
 ])
 def test_options_with_env(_, mock_make_wiki, runner, env, expected):
     result = runner.invoke(cli, env=env)
@@ -88,6 +124,80 @@ def test_options_with_env(_, mock_make_wiki, runner, env, expected):
             mock_make_wiki.call_args.kwargs[key] == value
 
 
+@mock.patch('vimwiki_cli.__main__.make_wiki')
+@mock.patch('vimwiki_cli.__main__.index')
+@mock.patch('vimwiki_cli.trace.enable')
+@pytest.mark.parametrize('args,env,expected', [
+    ('', {}, (False, None)),
+    ('--timings', {}, (True, None)),
+    ('--trace FILE', {}, (False, 'FILE')),
+    ('', {'VIMWIKI_TIMINGS': '1', 'VIMWIKI_TRACE': 'FILE'}, (True, 'FILE'))
+])
+def test_trace_options(mock_enable, _, mock_make_wiki, runner, args, env, expected):
+    result = runner.invoke(cli, args=args, env=env)
+    assert result.exit_code == 0
+
+    mock_enable.assert_called_with(*expected)
+    assert 'timings' not in mock_make_wiki.call_args.kwargs and \
+        'trace' not in mock_make_wiki.call_args.kwargs
+
+
+@mock.patch('vimwiki_cli.parallel.run_each')
+@mock.patch('vimwiki_cli.wiki.Wiki.wikis', return_value=[DEFAULT_WIKI] * 3)
+@pytest.mark.parametrize('args,counts,jobs', [
+    ('--count all', [1, 2, 3], 2),
+    ('--wikis 2,1,2 --jobs 4', [2, 1], 4)
+])
+def test_wikis(mock_wikis, mock_run_each, runner, args, counts, jobs):
+    mock_run_each.side_effect = lambda commands, jobs, env: [0] * len(commands)
+    env = {'VIMWIKI_JOBS': '2', 'VIMWIKI_EDITOR': 'EDITOR'}
+    args = args.split() + ['--select', '-v', 'tags', 'rebuild', '--engine', 'native']
+
+    with mock.patch.dict('os.environ', env):
+        result = runner.invoke(cli, args=args)
+    assert result.exit_code == 0
+    assert result.output == ''.join('[%d] ok\n' % count for count in counts)
+
+    commands, _jobs, _env = mock_run_each.call_args.args
+    assert _jobs == jobs
+    assert commands == [(count, [sys.executable, '-m', 'vimwiki_cli', '--editor', 'EDITOR',
+                                 '--select', '--servername', 'VIMWIKI', '--verbose',
+                                 '--no-interactive', '--count', str(count), 'tags', 'rebuild',
+                                 '--engine', 'native'])
+                        for count in counts]
+    assert 'VIMWIKI_JOBS' not in _env
+    assert _env['VIMWIKI_EDITOR'] == 'EDITOR'
+
+
+@mock.patch('vimwiki_cli.parallel.run_each', return_value=[0, 2, 1])
+def test_wikis_with_error(mock_run_each, runner, caplog):
+    result = runner.invoke(cli, '--wikis 1,2,3 check-links --engine native')
+    assert result.exit_code == 2
+    assert '[2] exited with status 2' in caplog.text
+    assert '[3] exited with status 1' in caplog.text
+
+
+@pytest.mark.parametrize('args', [
+    '--count all',
+    '--count 1 --wikis 2 tags rebuild',
+    '--count ALL tags rebuild',
+    '--wikis 1,X tags rebuild',
+    '--jobs 0 --count all tags rebuild'
+])
+def test_wikis_with_invalid_args(runner, args):
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 2
+
+
+@mock.patch('os.execvp')
+def test_no_interactive(mock_execvp, runner):
+    result = runner.invoke(cli, '--no-interactive goto PAGE')
+    assert result.exit_code == 1
+    assert 'Error: interactive commands are disabled' in result.output
+
+    mock_execvp.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.__main__.index')
 def test_default(mock_index, runner):
     result = runner.invoke(cli)
@@ -97,16 +207,111 @@ def test_default(mock_index, runner):
     mock_index.assert_called_with()
 
 
+def test_cli_help(runner):
+    result = runner.invoke(cli, '--help')
+    assert result.exit_code == 0
+
+    # Lazily loaded command groups should be listed:
+    for name in ('config', 'diary', 'hook', 'server', 'tags', 'watch'):
+        assert '  %s ' % name in result.output
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.all_html')
 @pytest.mark.parametrize('args,expected', [
-    ('', False),
-    ('--all', True)
+    ('', (False, 'vim', ())),
+    ('--all', (True, 'vim', ())),
+    ('--engine native', (False, 'native', ())),
+    ('--engine native --only PATH1 --only PATH2', (False, 'native', ('PATH1', 'PATH2')))
 ])
 def test_all_html(mock_all_html, runner, args, expected):
     result = runner.invoke(cli, 'all-html ' + args)
     assert result.exit_code == 0
 
-    mock_all_html.assert_called_with(expected)
+    mock_all_html.assert_called_with(*expected)
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.all_html')
+@pytest.mark.parametrize('args', [
+    '--syntax markdown all-html --engine native',
+    'all-html --only PATH'
+])
+def test_all_html_with_invalid_args(mock_all_html, runner, args):
+    result = runner.invoke(cli, args)
+    assert result.exit_code != 0
+
+    mock_all_html.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.editor.Batch.run')
+def test_batch(mock_run, runner, caplog):
+    mock_run.side_effect = lambda: [BatchResult(None, None), BatchResult(None, 'ERROR')]
+
+    result = runner.invoke(cli, ['batch', 'generate-links PAGE', '-f', '-'],
+                           input='# comment\n\ntags rebuild\n')
+    assert result.exit_code == 1
+
+    assert 'generate-links PAGE: ok' in result.output
+    assert 'tags rebuild: ERROR' in caplog.text
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search', return_value=[])
+@mock.patch('vimwiki_cli.editor.Batch.run')
+def test_batch_with_exit(mock_run, mock_search, runner, caplog):
+    mock_run.side_effect = lambda: [BatchResult(None, None), BatchResult(None, None)]
+
+    # Operations which exit are reported without stopping the batch:
+    result = runner.invoke(cli, ['batch', 'tags rebuild', 'search nomatch',
+                                 'generate-links index'])
+    assert result.exit_code == 1
+
+    assert 'tags rebuild: ok' in result.output
+    assert 'search nomatch: exited with status 1' in caplog.text
+    assert 'generate-links index: ok' in result.output
+    assert mock_run.call_count == 1
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search', side_effect=ConfigError('ERROR'))
+@mock.patch('vimwiki_cli.editor.Batch.run', return_value=[])
+def test_batch_with_error(mock_run, mock_search, runner, caplog):
+    result = runner.invoke(cli, ['batch', 'search PATTERN'])
+    assert result.exit_code == 1
+
+    assert 'search PATTERN: ERROR' in caplog.text
+
+
+@mock.patch('vimwiki_cli.editor.Batch.run')
+@pytest.mark.parametrize('args', [
+    ['batch', 'goto PAGE'],
+    ['batch', 'batch']
+])
+def test_batch_with_invalid_operation(mock_run, runner, args):
+    result = runner.invoke(cli, args)
+    assert result.exit_code != 0
+
+    mock_run.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.backlinks')
+@pytest.mark.parametrize('links,exit_code', [
+    ([Link('PAGE', 1, 'TARGET')], 0),
+    ([], 1)
+])
+def test_backlinks(mock_backlinks, runner, links, exit_code):
+    mock_backlinks.return_value = links
+
+    result = runner.invoke(cli, 'backlinks TARGET')
+    assert result.exit_code == exit_code
+    assert result.output == ''.join('%s:%d:%s\n' % link for link in links)
+
+    mock_backlinks.assert_called_with('TARGET')
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.backlinks')
+def test_backlinks_with_empty_page(mock_backlinks, runner):
+    result = runner.invoke(cli, 'backlinks ""')
+    assert result.exit_code != 0
+
+    mock_backlinks.assert_not_called()
 
 
 @mock.patch('vimwiki_cli.wiki.Wiki.check_links')
@@ -117,10 +322,47 @@ def test_check_links(mock_check_links, runner):
     mock_check_links.assert_called_with()
 
 
+@mock.patch('vimwiki_cli.wiki.Wiki.check_links')
+@pytest.mark.parametrize('broken,exit_code', [
+    ([Link('PAGE', 1, 'TARGET')], 1),
+    ([], 0)
+])
+def test_check_links_with_native(mock_check_links, runner, broken, exit_code):
+    mock_check_links.return_value = broken
+
+    result = runner.invoke(cli, 'check-links --engine native')
+    assert result.exit_code == exit_code
+    assert result.output == ''.join('%s:%d:%s\n' % link for link in broken)
+
+    mock_check_links.assert_called_with('native')
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.check_links', side_effect=ConfigError('ERROR'))
+def test_check_links_with_config_error(mock_check_links, runner):
+    result = runner.invoke(cli, '--count 2 check-links --engine native')
+    assert result.exit_code == 1
+    assert 'Error: ERROR' in result.output
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.wikis')
+@pytest.mark.parametrize('args,refresh', [('', False), ('--refresh', True)])
+def test_config_list(mock_wikis, runner, args, refresh):
+    mock_wikis.return_value = [DEFAULT_WIKI, dict(DEFAULT_WIKI, path='PATH', ext='.md',
+                                                  syntax='markdown')]
+
+    result = runner.invoke(cli, 'config list ' + args)
+    assert result.exit_code == 0
+    assert result.output == '1\t%s\t.wiki\tdefault\n2\tPATH\t.md\tmarkdown\n' % \
+        DEFAULT_WIKI['path']
+
+    mock_wikis.assert_called_with(refresh)
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.generate_links')
 @pytest.mark.parametrize('args,expected', [
-    ('PAGE', ('PAGE', '')),
-    ('PAGE PATTERN', ('PAGE', 'PATTERN'))
+    ('PAGE', ('PAGE', '', 'vim')),
+    ('PAGE PATTERN', ('PAGE', 'PATTERN', 'vim')),
+    ('--engine native PAGE', ('PAGE', '', 'native'))
 ])
 def test_generate_links(mock_generate_links, runner, args, expected):
     result = runner.invoke(cli, 'generate-links ' + args)
@@ -153,6 +395,71 @@ def test_goto_with_empty_page(mock_goto, runner):
     mock_goto.assert_not_called()
 
 
+def complete(runner, path, args):
+    words = 'vimwiki --path %s %s' % (path, args)
+    env = {
+        '_VIMWIKI_COMPLETE': 'bash_complete',
+        'COMP_WORDS': words,
+        'COMP_CWORD': str(len(words.split()) - (0 if words.endswith(' ') else 1))
+    }
+    result = runner.invoke(cli, [], env=env, prog_name='vimwiki')
+    assert result.exit_code == 0
+    return [line.partition(',')[2] for line in result.output.splitlines() if line]
+
+
+@pytest.mark.parametrize('args,expected', [
+    ('goto ', ['b/Page', 'index']),
+    ('goto ind', ['index']),
+    ('goto bpg', ['b/Page']),
+    ('backlinks b/', ['b/Page']),
+    ('generate-links IDX', ['index']),
+    ('tags generate-links in', ['index']),
+    ('--count all goto ', []),
+    ('--ext .md goto ', [])
+])
+def test_complete_pages(runner, tmp_path, args, expected):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'b').mkdir()
+    (path / 'index.wiki').write_text('')
+    (path / 'b' / 'Page.wiki').write_text('')
+
+    assert complete(runner, path, args) == expected
+
+
+@pytest.mark.parametrize('args,expected', [
+    ('tags search ', ['home', 'work']),
+    ('tags search w', ['work']),
+    ('tags generate-links index hm', ['home']),
+    ('tags generate-links index work ', ['home', 'work'])
+])
+def test_complete_tags(runner, tmp_path, args, expected):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text(':work:home:\n')
+    runner.invoke(cli, ['--path', str(path), 'tags', 'rebuild', '--engine', 'native'])
+
+    assert complete(runner, path, args) == expected
+    assert complete(runner, tmp_path / 'missing', args) == []
+
+
+@mock.patch('vimwiki_cli.pages.refresh_pages')
+def test_complete_pages_with_stale_list(mock_refresh_pages, runner, tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('')
+    assert complete(runner, path, 'goto ') == ['index']
+    mock_refresh_pages.assert_not_called()
+
+    # The stale list is used while it is refreshed in the background:
+    (path / 'Page.wiki').write_text('')
+    os.utime(str(path), ns=(0, 0))
+    assert complete(runner, path, 'goto ') == ['index']
+    mock_refresh_pages.assert_called_with(str(path), '.wiki')
+
+    assert complete(runner, tmp_path / 'missing', 'goto ') == []
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.help')
 def test_help(mock_help, runner):
     result = runner.invoke(cli, 'help')
@@ -169,9 +476,75 @@ def test_index(mock_index, runner):
     mock_index.assert_called_with()
 
 
+@mock.patch('vimwiki_cli.wiki.Wiki.orphans', return_value=['PAGE1', 'PAGE2'])
+def test_orphans(mock_orphans, runner):
+    result = runner.invoke(cli, 'orphans')
+    assert result.exit_code == 0
+    assert result.output == 'PAGE1\nPAGE2\n'
+
+    mock_orphans.assert_called_with()
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.search')
-def test_search(mock_search, runner):
+@pytest.mark.parametrize('matches,exit_code', [
+    ([Match('PAGE', 1, 'TEXT')], 0),
+    ([], 1)
+])
+def test_search(mock_search, runner, matches, exit_code):
+    mock_search.return_value = matches
+
     result = runner.invoke(cli, 'search PATTERN')
+    assert result.exit_code == exit_code
+    assert result.output == ''.join('%s:%d:%s\n' % match for match in matches)
+
+    mock_search.assert_called_with('PATTERN', open=False, regex=False, index=True,
+                                   max_count=None)
+
+
+def test_search_with_missing_path(runner, tmp_path):
+    result = runner.invoke(cli, ['--path', str(tmp_path / 'missing'), 'search', 'PATTERN'])
+    assert result.exit_code == 1
+    assert 'does not exist' in result.output
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search', return_value=[])
+def test_search_with_regex(mock_search, runner):
+    result = runner.invoke(cli, 'search --regex PAT+ERN')
+    assert result.exit_code == 1
+
+    mock_search.assert_called_with('PAT+ERN', open=False, regex=True, index=True,
+                                   max_count=None)
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search', return_value=iter([Match('PAGE', 1, 'TEXT')]))
+def test_search_without_index(mock_search, runner):
+    result = runner.invoke(cli, 'search --no-index --max-count 1 PATTERN')
+    assert result.exit_code == 0
+    assert result.output == 'PAGE:1:TEXT\n'
+
+    mock_search.assert_called_with('PATTERN', open=False, regex=False, index=False,
+                                   max_count=1)
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search')
+def test_search_with_invalid_max_count(mock_search, runner):
+    result = runner.invoke(cli, 'search --max-count 0 PATTERN')
+    assert result.exit_code == 2
+
+    mock_search.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search')
+def test_search_with_invalid_regex(mock_search, runner):
+    result = runner.invoke(cli, 'search --regex (')
+    assert result.exit_code == 2
+
+    mock_search.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search')
+def test_search_with_open(mock_search, runner):
+    result = runner.invoke(cli, 'search --open PATTERN')
     assert result.exit_code == 0
 
     mock_search.assert_called_with('PATTERN')
@@ -199,7 +572,15 @@ def test_diary_generate_links(mock_diary_generate_links, runner):
     result = runner.invoke(cli, 'diary generate-links')
     assert result.exit_code == 0
 
-    mock_diary_generate_links.assert_called_with()
+    mock_diary_generate_links.assert_called_with('vim')
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.diary_generate_links')
+def test_diary_generate_links_with_native(mock_diary_generate_links, runner):
+    result = runner.invoke(cli, 'diary generate-links --engine native')
+    assert result.exit_code == 0
+
+    mock_diary_generate_links.assert_called_with('native')
 
 
 @mock.patch('vimwiki_cli.wiki.Wiki.diary_index')
@@ -234,6 +615,290 @@ def test_diary_yesterday(mock_make_yesterday_diary_note, runner):
     mock_make_yesterday_diary_note.assert_called_with()
 
 
+@pytest.fixture
+def hook_repo(repo):
+    for name, content in (('index.wiki', '= Index =\n'),
+                          ('page.wiki', 'Page :tag:\n'),
+                          ('diary/2026-10-01.wiki', '= Entry =\n')):
+        (repo / name).parent.mkdir(exist_ok=True)
+        (repo / name).write_text(content)
+
+    git('config', 'vimwiki.options', '--path .')
+    for key in ('generatelinks', 'generatediarylinks', 'generatetaglinks', 'rebuildtags',
+                'allhtml'):
+        git('config', 'vimwiki.' + key, 'true')
+
+    return repo
+
+
+def git(*args):
+    return subprocess.run(['git'] + list(args), check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout
+
+
+def run_batch(batch):
+    return [BatchResult(command, None) for command in batch._commands]
+
+
+@mock.patch.object(Batch, 'run', autospec=True, side_effect=run_batch)
+def test_hook_pre_commit(mock_run, runner, hook_repo):
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'generate-links index: ok',
+        'diary generate-links: ok',
+        'tags rebuild: ok',
+        'tags generate-links index: ok',
+        'all-html: ok'
+    ]
+
+    # Steps using the editor are run in a single session:
+    (batch,), _ = mock_run.call_args
+    assert mock_run.call_count == 1 and len(batch) == 5
+
+
+@mock.patch.object(Batch, 'run', autospec=True, side_effect=run_batch)
+def test_hook_pre_commit_with_native(mock_run, runner, hook_repo):
+    git('config', 'vimwiki.engine', 'native')
+    git('config', 'vimwiki.allhtml', 'false')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+
+    (batch,), _ = mock_run.call_args
+    assert [command.session_args[-2] for command in batch._commands] == [
+        'VimwikiGenerateTagLinks '
+    ]
+
+    assert '- [[page]]' in (hook_repo / 'index.wiki').read_text()
+    assert '[[2026-10-01|Entry]]' in (hook_repo / 'diary' / 'diary.wiki').read_text()
+    assert git('diff', '--cached', '--name-only').splitlines() == [
+        '.vimwiki_tags', 'diary/2026-10-01.wiki', 'diary/diary.wiki', 'index.wiki',
+        'page.wiki'
+    ]
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+def test_hook_pre_commit_without_options(mock_run, runner, hook_repo):
+    git('config', '--unset', 'vimwiki.options')
+    git('config', 'vimwiki.engine', 'native')
+    for key in ('generatediarylinks', 'generatetaglinks', 'rebuildtags', 'allhtml'):
+        git('config', 'vimwiki.' + key, 'false')
+    git('add', '.')
+
+    # The repository is used as the wiki if none is selected:
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ['generate-links index: ok']
+    assert '- [[page]]' in (hook_repo / 'index.wiki').read_text()
+
+    mock_run.assert_not_called()
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+def test_hook_pre_commit_with_pages_outside_wiki(mock_run, runner, hook_repo, caplog):
+    git('config', 'vimwiki.options', '--path wiki')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+    assert 'No pages staged for commit are in the wiki' in caplog.text
+
+    mock_run.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis')
+def test_hook_pre_commit_with_diary_rel_path(mock_load_wikis, runner, hook_repo):
+    mock_load_wikis.return_value = [dict(DEFAULT_WIKI, path=str(hook_repo),
+                                         diary_rel_path='journal')]
+    git('config', 'vimwiki.options', '--count 1')
+    git('config', 'vimwiki.generatetaglinks', 'false')
+    git('config', 'vimwiki.allhtml', 'false')
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial commit')
+
+    # Pages outside of the diary directory do not affect the diary index:
+    (hook_repo / 'diary' / '2026-10-01.wiki').write_text('= Changed =\n')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit --engine native')
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ['tags rebuild: ok']
+
+    (hook_repo / 'journal').mkdir()
+    (hook_repo / 'journal' / '2026-10-02.wiki').write_text('= Entry =\n')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit --engine native')
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'generate-links index: ok',
+        'diary generate-links: ok',
+        'tags rebuild: ok'
+    ]
+    assert '[[2026-10-02|Entry]]' in (hook_repo / 'journal' / 'diary.wiki').read_text()
+    assert '- [[diary/2026-10-01]]' in (hook_repo / 'index.wiki').read_text()
+    assert '- [[journal/2026-10-02]]' not in (hook_repo / 'index.wiki').read_text()
+    assert 'journal/diary.wiki' in git('diff', '--cached', '--name-only').splitlines()
+
+
+@mock.patch.object(Batch, 'run', autospec=True, side_effect=run_batch)
+def test_hook_pre_commit_with_modified_page(mock_run, runner, hook_repo):
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial commit')
+
+    (hook_repo / 'page.wiki').write_text('Page :other:\n')
+    git('add', 'page.wiki')
+
+    result = runner.invoke(cli, 'hook pre-commit --engine native')
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'tags rebuild: ok',
+        'tags generate-links index: ok',
+        'all-html: ok'
+    ]
+    assert '\nother\tpage.wiki\t' in (hook_repo / '.vimwiki_tags').read_text()
+
+
+@mock.patch.object(Batch, 'run', autospec=True, side_effect=run_batch)
+def test_hook_pre_commit_with_unstaged_changes(mock_run, runner, hook_repo):
+    git('config', 'vimwiki.engine', 'native')
+    git('config', 'vimwiki.allhtml', 'false')
+    git('config', 'vimwiki.linkspage', 'Links')
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial commit')
+
+    (hook_repo / 'added.wiki').write_text('Added :added:\n')
+    git('add', 'added.wiki')
+    (hook_repo / 'added.wiki').write_text('Added :added:\nUnstaged :unstaged:\n')
+    (hook_repo / 'untracked.wiki').write_text('Untracked :untracked:\n')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+
+    # Pages are read as staged, and unstaged changes are restored:
+    links = git('show', ':Links.wiki')
+    assert '- [[added]]' in links and '[[untracked]]' not in links
+    tags = git('show', ':.vimwiki_tags')
+    assert 'added\t' in tags and 'unstaged\t' not in tags and 'untracked\t' not in tags
+    assert (hook_repo / 'added.wiki').read_text() == 'Added :added:\nUnstaged :unstaged:\n'
+    assert (hook_repo / 'untracked.wiki').exists()
+    assert git('status', '--porcelain').splitlines() == [
+        'A  .vimwiki_tags', 'A  Links.wiki', 'AM added.wiki', '?? untracked.wiki'
+    ]
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+def test_hook_pre_commit_with_unstaged_output(mock_run, runner, hook_repo, caplog):
+    git('config', 'vimwiki.engine', 'native')
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial commit')
+
+    (hook_repo / 'added.wiki').write_text('Added\n')
+    git('add', 'added.wiki')
+    (hook_repo / 'index.wiki').write_text('= Index =\nUnstaged\n')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 1
+    assert 'index.wiki has changes not staged for commit' in caplog.text
+
+    # Files with unstaged changes are neither written nor staged:
+    mock_run.assert_not_called()
+    assert (hook_repo / 'index.wiki').read_text() == '= Index =\nUnstaged\n'
+    assert git('diff', '--cached', '--name-only').splitlines() == ['added.wiki']
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+def test_hook_pre_commit_without_pages(mock_run, runner, hook_repo):
+    (hook_repo / 'other.txt').write_text('other\n')
+    git('add', 'other.txt')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 0
+    assert result.output == ''
+
+    mock_run.assert_not_called()
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+def test_hook_pre_commit_with_error(mock_run, runner, hook_repo, caplog):
+    mock_run.side_effect = lambda batch: [BatchResult(command, 'ERROR')
+                                          for command in batch._commands]
+    git('config', 'vimwiki.generatelinks', 'false')
+    git('config', 'vimwiki.linkspage', 'Links')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 1
+    assert 'tags rebuild: ERROR' in caplog.text
+
+    # Files written by steps are not staged:
+    (hook_repo / 'Links.wiki').write_text('Links\n')
+    assert 'Links.wiki' not in git('diff', '--cached', '--name-only')
+
+
+@mock.patch.object(Batch, 'run', autospec=True)
+@pytest.mark.parametrize('args,indexonly', [('--index-only', None), ('', 'true')])
+def test_hook_pre_commit_with_index_only(mock_run, runner, hook_repo, args, indexonly):
+    if indexonly is not None:
+        git('config', 'vimwiki.indexonly', indexonly)
+    git('config', 'vimwiki.generatetaglinks', 'false')
+    git('config', 'vimwiki.allhtml', 'false')
+    git('add', '.')
+    (hook_repo / 'page.wiki').write_text('Unstaged :unstaged:\n')
+
+    result = runner.invoke(cli, 'hook pre-commit ' + args)
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'generate-links index: ok',
+        'diary generate-links: ok',
+        'tags rebuild: ok'
+    ]
+
+    mock_run.assert_not_called()
+    assert git('show', ':.vimwiki_tags').splitlines()[-1] == \
+        'tag\tpage.wiki\t1;"\tvimwiki:page\\tpage'
+    assert '- [[page]]' in git('show', ':index.wiki')
+    assert git('diff', '--name-only').splitlines() == ['page.wiki']
+
+
+@pytest.mark.parametrize('key,other', [('generatetaglinks', 'allhtml'),
+                                       ('allhtml', 'generatetaglinks')])
+def test_hook_pre_commit_with_index_only_and_unsupported(runner, hook_repo, key, other):
+    git('config', 'vimwiki.' + other, 'false')
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit --index-only')
+    assert result.exit_code == 2
+    assert 'vimwiki.%s is not supported with --index-only' % key in result.output
+
+
+@pytest.mark.parametrize('key,value', [
+    ('engine', 'INVALID'),
+    ('options', 'tags rebuild'),
+    ('rebuildtags', 'maybe')
+])
+def test_hook_pre_commit_with_invalid_config(runner, hook_repo, key, value):
+    git('config', 'vimwiki.' + key, value)
+    git('add', '.')
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code != 0
+    assert 'Error:' in result.output
+
+
+def test_hook_pre_commit_without_repo(runner, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('GIT_CEILING_DIRECTORIES', str(tmp_path))
+
+    result = runner.invoke(cli, 'hook pre-commit')
+    assert result.exit_code == 1
+    assert 'Error:' in result.output
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.generate_tag_links')
 @pytest.mark.parametrize('args,expected', [
     ('PAGE', ('PAGE', ())),
@@ -256,14 +921,38 @@ def test_tags_generate_links_with_empty_page(mock_generate_tag_links, runner):
 
 @mock.patch('vimwiki_cli.wiki.Wiki.rebuild_tags')
 @pytest.mark.parametrize('args,expected', [
-    ('', False),
-    ('--all', True)
+    ('', (False, 'vim', ())),
+    ('--all', (True, 'vim', ())),
+    ('--engine native', (False, 'native', ())),
+    ('--engine native --only PATH1 --only PATH2', (False, 'native', ('PATH1', 'PATH2')))
 ])
 def test_tags_rebuild(mock_rebuild_tags, runner, args, expected):
     result = runner.invoke(cli, 'tags rebuild ' + args)
     assert result.exit_code == 0
 
-    mock_rebuild_tags.assert_called_with(expected)
+    mock_rebuild_tags.assert_called_with(*expected)
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.rebuild_tags')
+def test_tags_rebuild_with_only(mock_rebuild_tags, runner):
+    result = runner.invoke(cli, 'tags rebuild --only PATH')
+    assert result.exit_code != 0
+
+    mock_rebuild_tags.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.list_tags')
+@pytest.mark.parametrize('args,tags,output,exit_code', [
+    ('', {'b': [None], 'a': [None, None]}, 'a\nb\n', 0),
+    ('--long', {'b': [None], 'a': [None, None]}, 'a\t2\nb\t1\n', 0),
+    ('', {}, '', 1)
+])
+def test_tags_list(mock_list_tags, runner, args, tags, output, exit_code):
+    mock_list_tags.return_value = tags
+
+    result = runner.invoke(cli, 'tags list ' + args)
+    assert result.exit_code == exit_code
+    assert result.output == output
 
 
 @mock.patch('vimwiki_cli.wiki.Wiki.search_tags')
@@ -274,9 +963,164 @@ def test_search_tags(mock_search_tags, runner):
     mock_search_tags.assert_called_with('PATTERN')
 
 
+@mock.patch('vimwiki_cli.wiki.Wiki.search_tags')
+@pytest.mark.parametrize('matches,exit_code', [
+    ([('tag1', Location('Page', 4, 'Page#tag1')), ('tag2', Location('index', 1, 'index'))], 0),
+    ([], 1)
+])
+def test_search_tags_with_print(mock_search_tags, runner, matches, exit_code):
+    mock_search_tags.return_value = matches
+
+    result = runner.invoke(cli, 'tags search --print tag.')
+    assert result.exit_code == exit_code
+    assert result.output == ''.join('%s:%d:%s\n' % (location.page, location.lineno, name)
+                                    for name, location in matches)
+
+    mock_search_tags.assert_called_with('tag.', open=False)
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.search_tags')
+def test_search_tags_with_invalid_regex(mock_search_tags, runner):
+    result = runner.invoke(cli, 'tags search --print [')
+    assert result.exit_code != 0
+
+    mock_search_tags.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.wiki.Wiki.search_tags')
 def test_search_tags_with_empty_pattern(mock_search_tags, runner):
     result = runner.invoke(cli, 'tags search ""')
     assert result.exit_code != 0
 
     mock_search_tags.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.start_server')
+@pytest.mark.parametrize('started,expected', [
+    (True, ''),
+    (False, 'Server is already running\n')
+])
+def test_server_start(mock_start_server, runner, started, expected):
+    mock_start_server.return_value = started
+
+    result = runner.invoke(cli, 'server start')
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.start_server', side_effect=ServerError('ERROR'))
+def test_server_start_with_error(mock_start_server, runner):
+    result = runner.invoke(cli, 'server start')
+    assert result.exit_code != 0
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.server_status')
+@pytest.mark.parametrize('address,exit_code', [
+    ('ADDRESS', 0),
+    (None, 1)
+])
+def test_server_status(mock_server_status, runner, address, exit_code):
+    mock_server_status.return_value = address
+
+    result = runner.invoke(cli, 'server status')
+    assert result.exit_code == exit_code
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.stop_server')
+@pytest.mark.parametrize('stopped,expected', [
+    (True, ''),
+    (False, 'Server is not running\n')
+])
+def test_server_stop(mock_stop_server, runner, stopped, expected):
+    mock_stop_server.return_value = stopped
+
+    result = runner.invoke(cli, 'server stop')
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+@pytest.mark.parametrize('command,method', [
+    ('status', 'server_status'),
+    ('stop', 'stop_server')
+])
+@pytest.mark.parametrize('error', [
+    ServerError('ERROR'),
+    FileNotFoundError('ERROR')
+])
+def test_server_with_error(runner, command, method, error):
+    with mock.patch.object(Wiki, method, side_effect=error):
+        result = runner.invoke(cli, 'server ' + command)
+    assert result.exit_code == 1
+    assert result.output == 'Error: ERROR\n'
+
+
+@pytest.mark.parametrize('command,method', [
+    ('start', 'start_server'),
+    ('status', 'server_status'),
+    ('stop', 'stop_server')
+])
+def test_server_with_timeout(runner, command, method):
+    with mock.patch.object(Wiki, method, side_effect=subprocess.TimeoutExpired(['vim'], 1.5)):
+        result = runner.invoke(cli, '--timeout 1.5 server ' + command)
+    assert result.exit_code == 1
+    assert 'server timed out after 1.5 seconds' in result.output
+
+
+@pytest.fixture
+def watch_wiki(tmp_path):
+    path = tmp_path / 'wiki'
+    (path / 'diary').mkdir(parents=True)
+    (path / 'index.wiki').write_text('= Index =\n')
+    (path / 'Page.wiki').write_text(':old:\n')
+    return path
+
+
+@mock.patch('vimwiki_cli.watch.collect')
+def test_watch(mock_collect, runner, watch_wiki):
+    def collect(watcher, debounce):
+        if mock_collect.call_count > 1:
+            raise KeyboardInterrupt
+
+        entry = watch_wiki / 'diary' / '2026-01-01.wiki'
+        entry.write_text('= Entry =\n')
+        (watch_wiki / 'Page.wiki').write_text(':new:\n')
+        return {str(entry), str(watch_wiki / 'Page.wiki')}
+
+    mock_collect.side_effect = collect
+
+    result = runner.invoke(cli, ['--path', str(watch_wiki), 'watch', '--poll', '--debounce', '0'])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'generate-links index: ok', 'tags rebuild: ok', 'all-html: ok',
+        'generate-links index: ok', 'diary generate-links: ok', 'tags rebuild: ok',
+        'all-html: ok'
+    ]
+
+    mock_collect.assert_called_with(mock.ANY, 0)
+    assert '[[Page]]' in (watch_wiki / 'index.wiki').read_text()
+    assert '[[2026-01-01|Entry]]' in (watch_wiki / 'diary' / 'diary.wiki').read_text()
+    assert 'new\tPage.wiki' in (watch_wiki / '.vimwiki_tags').read_text()
+    assert (watch_wiki.parent / 'wiki_html' / 'Page.html').exists()
+
+
+@mock.patch('vimwiki_cli.wiki.Wiki.rebuild_tags', side_effect=ConfigError('ERROR'))
+@mock.patch('vimwiki_cli.watch.collect', side_effect=KeyboardInterrupt)
+def test_watch_with_error(mock_collect, mock_rebuild_tags, runner, watch_wiki, caplog):
+    result = runner.invoke(cli, ['--path', str(watch_wiki), 'watch', '--poll'])
+    assert result.exit_code == 0
+
+    # A failed update is reported without stopping the others:
+    assert 'tags rebuild: ERROR' in caplog.text
+    assert result.output.splitlines() == ['generate-links index: ok', 'all-html: ok']
+
+
+@mock.patch('vimwiki_cli.watch.open_watcher')
+@pytest.mark.parametrize('args', [
+    '--syntax markdown watch --html',
+    '--path MISSING watch'
+])
+def test_watch_with_invalid_args(mock_open_watcher, runner, watch_wiki, args):
+    result = runner.invoke(cli, args)
+    assert result.exit_code != 0
+
+    mock_open_watcher.assert_not_called()
@@ -21,11 +21,15 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import os
 import subprocess
+import sys
+import tempfile
 
 import mock
 import pytest
 
+from vimwiki_cli import parallel, trace
 from vimwiki_cli.editor import *
 
 
@@ -115,43 +119,111 @@ def test_noninteractive_with_write_quit(cmd):
     assert cmd._args == ['COMMAND', 'wq!']
 
 
+def execute(returncode=0, lines=(), callback=None, output=()):
+    """Return a replacement for parallel.execute which writes output to the
+    stdout callback and lines to the stderr callback, and returns
+    returncode.
+    """
+    async def side_effect(args, **kwargs):
+        if callback is not None:
+            callback(args)
+        for line in output:
+            kwargs['stdout'](line)
+        for line in lines:
+            kwargs['stderr'](line)
+
+        return returncode
+
+    return side_effect
+
+
+def returns(*values):
+    """Return a replacement for a coroutine function which returns each of
+    values in turn, repeating the last.
+    """
+    values = list(values)
+
+    async def side_effect(*args, **kwargs):
+        return values.pop(0) if len(values) > 1 else values[0]
+
+    return side_effect
+
+
 @mock.patch('sys.exit')
-@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=execute())
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR', 'timeout': 1.5}])
+@pytest.mark.parametrize('cmd_options', [{'interactive': False}])
+def test_noninteractive_run(mock_execute, mock_exit, cmd):
+    cmd.run()
+
+    mock_execute.assert_called_with(['EDITOR', '-c', 'COMMAND'], timeout=1.5, stderr=mock.ANY)
+    mock_exit.assert_called_with(0)
+
+
+@mock.patch('sys.exit')
+@mock.patch('vimwiki_cli.parallel.execute')
 @pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
 @pytest.mark.parametrize('cmd_options', [{'interactive': False}])
-def test_noninteractive_run(mock_Popen, mock_exit, cmd):
-    mock_Popen.return_value.communicate.return_value = (b'', b'')
-    mock_Popen.return_value.returncode = 0
+def test_noninteractive_run_with_trace(mock_execute, mock_exit, cmd):
+    def startuptime(args):
+        assert args[1] == '--startuptime'
+        with open(args[2], 'w') as f:
+            f.write('001.000  001.000: --- VIM STARTING ---\n')
 
-    cmd.run()
+    mock_execute.side_effect = execute(callback=startuptime)
 
-    mock_Popen.assert_called_with(['EDITOR', '-c', 'COMMAND'],
-                                  stdin=subprocess.PIPE,
-                                  stdout=subprocess.PIPE,
-                                  stderr=subprocess.PIPE)
+    trace.enable(timings=True)
+    cmd.run()
 
-    mock_exit.assert_called_with(mock_Popen.return_value.returncode)
+    assert mock_execute.call_args.args[0][3:] == ['-c', 'COMMAND']
+    assert [(span.name, span.category) for span in trace._spans] == [
+        ('make command', trace.CLI),
+        ('editor', trace.CLI),
+        ('--- VIM STARTING ---', trace.EDITOR)
+    ]
 
 
-@mock.patch('subprocess.Popen', side_effect=OSError)
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=OSError)
 @pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
 @pytest.mark.parametrize('cmd_options', [{'interactive': False}])
-def test_noninteractive_run_with_error(mock_Popen, cmd):
+def test_noninteractive_run_with_error(mock_execute, cmd):
     with pytest.raises(OSError):
         cmd.run()
 
 
 @mock.patch('sys.exit')
-@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=execute(~0, ['ERROR1', 'ERROR2']))
 @pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
 @pytest.mark.parametrize('cmd_options', [{'interactive': False}])
-def test_noninteractive_run_with_returncode(mock_Popen, mock_exit, cmd):
-    mock_Popen.return_value.communicate.return_value = (b'', b'')
-    mock_Popen.return_value.returncode = ~0
+def test_noninteractive_run_with_returncode(mock_execute, mock_exit, cmd, caplog):
+    cmd.run()
 
+    mock_exit.assert_called_with(~0)
+    assert caplog.messages == ['ERROR1\nERROR2']
+
+
+@mock.patch('sys.exit')
+@mock.patch('vimwiki_cli.parallel.execute',
+            side_effect=subprocess.TimeoutExpired(['EDITOR'], 1.5))
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
+@pytest.mark.parametrize('cmd_options', [{'interactive': False}])
+def test_noninteractive_run_with_timeout(mock_execute, mock_exit, cmd, caplog):
     cmd.run()
 
-    mock_exit.assert_called_with(mock_Popen.return_value.returncode)
+    mock_exit.assert_called_with(1)
+    assert caplog.messages == ['editor timed out after 1.5 seconds']
+
+
+@pytest.mark.parametrize('wiki_options', [{'editor': sys.executable}])
+def test_execute(wiki):
+    cmd = Command(wiki, 'import sys; sys.exit(3)', interactive=False)
+    assert parallel.run(cmd.execute()) == 3
+
+
+@pytest.mark.parametrize('cmd_options', [{'interactive': True}])
+def test_execute_with_interactive(cmd):
+    with pytest.raises(ValueError):
+        parallel.run(cmd.execute())
 
 
 def test_global_with_defaults(cmd_global):
@@ -185,3 +257,326 @@ def test_local_with_defaults(cmd_local):
 
 def test_diary_with_defaults(cmd_diary):
     assert cmd_diary._args == ['VimwikiDiaryIndex', 'DIARY_COMMAND']
+
+
+@pytest.mark.parametrize('cmd_options,expected', [
+    ({'interactive': False}, ['COMMAND']),
+    ({'interactive': False, 'quit': True}, ['COMMAND']),
+    ({'interactive': False, 'write_quit': True}, ['COMMAND', 'write'])
+])
+def test_session_args(cmd, expected):
+    assert cmd.session_args == expected
+
+
+@pytest.fixture
+def batch(wiki):
+    return Batch(wiki)
+
+
+def test_batch_with_interactive(batch, wiki):
+    with pytest.raises(ValueError):
+        batch.add(Command(wiki, 'COMMAND', interactive=True))
+
+    assert len(batch) == 0
+
+
+def test_batch_script(batch, wiki):
+    batch.add(Command(wiki, 'COMMAND1', interactive=False, quit=True))
+    batch.add(Command(wiki, 'COMMAND2', interactive=False, write_quit=True))
+
+    script = batch.script("RESULTS'")
+    assert script == [
+        'let s:results = []',
+        'try', '  COMMAND1', "  call add(s:results, '')",
+        'catch', '  call add(s:results, v:exception)', 'endtry',
+        'silent! %bwipeout!',
+        'try', '  COMMAND2', '  write', "  call add(s:results, '')",
+        'catch', '  call add(s:results, v:exception)', 'endtry',
+        'silent! %bwipeout!',
+        "call writefile(s:results, 'RESULTS''')",
+        'qa!'
+    ]
+
+
+@mock.patch('vimwiki_cli.parallel.execute')
+def test_batch_run_without_commands(mock_execute, batch):
+    assert batch.run() == []
+
+    mock_execute.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.parallel.execute')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
+def test_batch_run(mock_execute, batch, wiki):
+    def results(args):
+        assert args[:2] == ['EDITOR', '-S']
+        with open(args[2]) as f:
+            script = f.read()
+
+        results = script.split("writefile(s:results, '")[1].split("')")[0]
+        with open(results, 'w') as f:
+            f.write('\nERROR\n')
+
+    mock_execute.side_effect = execute(callback=results)
+
+    cmd1 = Command(wiki, 'COMMAND1', interactive=False)
+    cmd2 = Command(wiki, 'COMMAND2', interactive=False)
+    batch.add(cmd1)
+    batch.add(cmd2)
+
+    assert batch.run() == [BatchResult(cmd1, None), BatchResult(cmd2, 'ERROR')]
+
+
+@pytest.mark.parametrize('side_effect,expected', [
+    (execute(1), 'editor exited with status 1'),
+    (execute(1, ['ERROR1', 'ERROR2']), 'ERROR1\nERROR2'),
+    (subprocess.TimeoutExpired(['EDITOR'], 1.5), 'editor timed out after 1.5 seconds')
+])
+def test_batch_run_with_error(batch, wiki, side_effect, expected):
+    batch.add(Command(wiki, 'COMMAND', interactive=False))
+
+    with mock.patch('vimwiki_cli.parallel.execute', side_effect=side_effect):
+        (result,) = batch.run()
+    assert result.error == expected
+
+
+@pytest.fixture
+def server(wiki):
+    return Server(wiki)
+
+
+@pytest.mark.parametrize('wiki_options,expected', [
+    ({'editor': 'vim', 'servername': 'NAME'}, 'NAME'),
+    ({'editor': '/usr/bin/nvim', 'servername': 'NAME'}, 'vimwiki-cli-name.sock')
+])
+def test_server_address(server, expected):
+    assert server.address.endswith(expected)
+
+
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=execute(output=['']))
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR', 'servername': 'NAME',
+                                           'timeout': 1.5}])
+def test_server_execute(mock_execute, server):
+    assert parallel.run(server.execute(['COMMAND1', "COMMAND2 'ARG'"])) == ''
+
+    mock_execute.assert_called_with(['EDITOR', '--servername', 'NAME', '--remote-expr',
+                                     "VimwikiCliExecute(['COMMAND1', 'COMMAND2 ''ARG'''])"],
+                                    timeout=1.5, stdout=mock.ANY, stderr=mock.ANY)
+
+
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=execute(1, ['ERROR']))
+def test_server_expr_with_error(mock_execute, server):
+    with pytest.raises(ServerError, match='ERROR'):
+        parallel.run(server.expr('1'))
+
+
+@mock.patch('vimwiki_cli.parallel.execute',
+            side_effect=subprocess.TimeoutExpired(['EDITOR'], 1.5))
+def test_server_expr_with_timeout(mock_execute, server):
+    with pytest.raises(subprocess.TimeoutExpired):
+        parallel.run(server.expr('1'))
+
+
+@pytest.mark.parametrize('side_effect,expected', [
+    (execute(0, output=['1']), True),
+    (execute(0, output=['0']), False),
+    (execute(1), False)
+])
+def test_server_running(server, side_effect, expected):
+    with mock.patch('vimwiki_cli.parallel.execute', side_effect=side_effect):
+        assert parallel.run(server.running()) is expected
+
+
+@mock.patch('vimwiki_cli.editor.Server.running')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'vim', 'servername': 'NAME'}])
+@pytest.mark.parametrize('running,expected', [
+    (True, 'NAME'),
+    (False, None)
+])
+def test_server_status(mock_running, server, running, expected):
+    mock_running.side_effect = returns(running)
+
+    assert parallel.run(server.status()) == expected
+
+
+def test_runtime_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert runtime_dir() == str(tmp_path)
+
+    # Otherwise a private directory is created in the temporary directory:
+    monkeypatch.delenv('XDG_RUNTIME_DIR')
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    path = runtime_dir()
+    assert path == str(tmp_path / ('vimwiki-cli-%d' % os.getuid()))
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    assert runtime_dir() == path
+
+
+@pytest.mark.parametrize('setup', [
+    lambda path: os.chmod(path, 0o755),
+    lambda path: (os.rmdir(path), os.symlink(os.path.dirname(path), path))
+])
+def test_runtime_dir_with_shared_dir(monkeypatch, tmp_path, setup):
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    setup(runtime_dir())
+
+    with pytest.raises(ServerError, match='not private'):
+        runtime_dir()
+
+
+@mock.patch('vimwiki_cli.parallel.execute')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'nvim', 'servername': 'MISSING'}])
+def test_server_running_without_socket(mock_execute, server):
+    assert parallel.run(server.running()) is False
+
+    mock_execute.assert_not_called()
+
+
+@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.editor.Server.running')
+@mock.patch('vimwiki_cli.editor.runtime_dir')
+@pytest.mark.parametrize('wiki_options,prefix,expected', [
+    ({'editor': 'vim'}, [sys.executable, '-c', mock.ANY], ['vim', '--servername', 'VIMWIKI']),
+    ({'editor': 'nvim'}, [], ['nvim', '--headless', '--listen'])
+])
+def test_server_start(mock_runtime_dir, mock_running, mock_Popen, server, tmp_path, prefix,
+                      expected):
+    mock_runtime_dir.return_value = str(tmp_path)
+    mock_running.side_effect = returns(False, False, True)
+
+    assert parallel.run(server.start()) is True
+
+    # Vim servers are run on a pseudo-terminal as Vim exits at end of input:
+    args = mock_Popen.call_args.args[0]
+    assert args[:len(prefix)] == prefix
+    assert args[len(prefix):len(prefix) + len(expected)] == expected
+    assert args[-2] == '-S'
+
+    # The script is created in the runtime directory and removed once sourced:
+    assert os.path.dirname(args[-1]) == str(tmp_path)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def has_clientserver():
+    # Vim servers on X11 also require a display:
+    try:
+        version = subprocess.run(['vim', '--version'], stdout=subprocess.PIPE).stdout
+    except OSError:
+        return False
+
+    return b'+clientserver' in version and (sys.platform == 'darwin' or 'DISPLAY' in os.environ)
+
+
+@pytest.mark.skipif(not has_clientserver(), reason='requires vim with +clientserver')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'vim',
+                                           'servername': 'VIMWIKI-CLI-%d' % os.getpid()}])
+def test_server_with_vim(server):
+    try:
+        assert parallel.run(server.start()) is True
+        assert parallel.run(server.execute(['let g:vimwiki_cli_test = 42'])) == ''
+        assert parallel.run(server.expr('g:vimwiki_cli_test')) == '42'
+        assert parallel.run(server.execute(['throw "ERROR"'])) == 'ERROR'
+    finally:
+        assert parallel.run(server.stop()) is True
+
+    assert parallel.run(server.running()) is False
+
+
+@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(True))
+def test_server_start_when_running(mock_running, mock_Popen, server):
+    assert parallel.run(server.start()) is False
+
+    mock_Popen.assert_not_called()
+
+
+@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(False))
+@mock.patch('vimwiki_cli.editor.runtime_dir')
+def test_server_start_with_timeout(mock_runtime_dir, mock_running, mock_Popen, server, tmp_path):
+    mock_runtime_dir.return_value = str(tmp_path)
+
+    with pytest.raises(ServerError):
+        parallel.run(server.start(timeout=0))
+
+    assert os.listdir(str(tmp_path)) == []
+
+
+@mock.patch('vimwiki_cli.parallel.execute', side_effect=execute())
+@mock.patch('vimwiki_cli.editor.Server.running')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR', 'servername': 'NAME'}])
+def test_server_stop(mock_running, mock_execute, server):
+    mock_running.side_effect = returns(True, False)
+
+    assert parallel.run(server.stop()) is True
+
+    assert mock_execute.call_args.args[0] == ['EDITOR', '--servername', 'NAME',
+                                              '--remote-send', '<C-\\><C-N>:qa!<CR>']
+
+
+@mock.patch('vimwiki_cli.parallel.execute')
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(False))
+def test_server_stop_when_not_running(mock_running, mock_execute, server):
+    assert parallel.run(server.stop()) is False
+
+    mock_execute.assert_not_called()
+
+
+@mock.patch('sys.exit', side_effect=SystemExit)
+@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.editor.Server.execute', side_effect=returns('ERROR'))
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(True))
+@pytest.mark.parametrize('wiki_options', [{'server': True}])
+@pytest.mark.parametrize('cmd_options', [{'interactive': False, 'write_quit': True}])
+def test_noninteractive_run_with_server(mock_running, mock_execute, mock_Popen, mock_exit, cmd):
+    with pytest.raises(SystemExit):
+        cmd.run()
+
+    mock_execute.assert_called_with(['COMMAND', 'write'])
+    mock_exit.assert_called_with(1)
+    mock_Popen.assert_not_called()
+
+
+@mock.patch('sys.exit')
+@mock.patch('vimwiki_cli.editor.Server.execute',
+            side_effect=subprocess.TimeoutExpired(['EDITOR'], 1.5))
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(True))
+@pytest.mark.parametrize('wiki_options', [{'server': True}])
+@pytest.mark.parametrize('cmd_options', [{'interactive': False}])
+def test_noninteractive_run_with_server_timeout(mock_running, mock_execute, mock_exit, cmd,
+                                                caplog):
+    cmd.run()
+
+    mock_exit.assert_called_with(1)
+    assert 'editor timed out after 1.5 seconds' in caplog.text
+
+
+@mock.patch('subprocess.Popen')
+@mock.patch('vimwiki_cli.editor.Server.execute')
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(True))
+@pytest.mark.parametrize('wiki_options', [{'server': True}])
+def test_batch_run_with_server(mock_running, mock_execute, mock_Popen, batch, wiki):
+    mock_execute.side_effect = returns('', 'ERROR')
+    batch.add(Command(wiki, 'COMMAND1', interactive=False))
+    batch.add(Command(wiki, 'COMMAND2', interactive=False))
+
+    assert [result.error for result in batch.run()] == [None, 'ERROR']
+    mock_Popen.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.editor.Server.execute',
+            side_effect=[returns('')(), subprocess.TimeoutExpired(['EDITOR'], 1.5)])
+@mock.patch('vimwiki_cli.editor.Server.running', side_effect=returns(True))
+@pytest.mark.parametrize('wiki_options', [{'server': True}])
+def test_batch_run_with_server_timeout(mock_running, mock_execute, batch, wiki):
+    for name in ('COMMAND1', 'COMMAND2', 'COMMAND3'):
+        batch.add(Command(wiki, name, interactive=False))
+
+    # Commands are not sent once the server stops responding:
+    assert [result.error for result in batch.run()] == [
+        None,
+        'server timed out after 1.5 seconds',
+        'server timed out after 1.5 seconds'
+    ]
+    assert mock_execute.call_count == 2
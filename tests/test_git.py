@@ -0,0 +1,268 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+import subprocess
+
+import pytest
+
+from vimwiki_cli.git import *
+
+
+def run(*args):
+    subprocess.run(['git'] + list(args), check=True)
+
+
+def test_git(repo):
+    assert git('rev-parse', '--is-inside-work-tree') == b'true\n'
+
+
+def test_git_with_error(repo):
+    with pytest.raises(GitError) as excinfo:
+        git('rev-parse', '--verify', '--quiet', 'MISSING')
+
+    assert excinfo.value.returncode == 1
+    assert str(excinfo.value) == 'git exited with status 1'
+
+
+def test_get_config(repo):
+    run('config', 'vimwiki.options', '--count 2')
+    run('config', 'vimwiki.linksPage', 'Links')
+    run('config', 'vimwiki.linkspage', 'Index')
+    run('config', 'other.options', 'OTHER')
+    with open('.git/config', 'a') as f:
+        f.write('[vimwiki]\n\trebuildtags\n')
+
+    assert get_config('vimwiki') == {
+        'options': '--count 2',
+        'linkspage': 'Index',
+        'rebuildtags': None
+    }
+
+
+def test_get_config_without_options(repo):
+    assert get_config('vimwiki') == {}
+
+
+@pytest.mark.parametrize('value,expected', [
+    (None, True),
+    ('true', True),
+    ('Yes', True),
+    ('on', True),
+    ('1', True),
+    ('42', True),
+    ('false', False),
+    ('NO', False),
+    ('off', False),
+    ('0', False),
+    ('', False)
+])
+def test_config_bool(value, expected):
+    assert config_bool(value) == expected
+
+
+def test_config_bool_with_invalid_value():
+    with pytest.raises(GitError):
+        config_bool('maybe')
+
+
+def test_toplevel(repo):
+    (repo / 'subdir').mkdir()
+    os.chdir('subdir')
+
+    assert toplevel() == os.path.realpath(str(repo))
+
+
+def test_staged_files(repo):
+    for name in ('deleted', 'modified', 'renamed', 'unstaged'):
+        (repo / name).write_text(name)
+    run('add', '.')
+    run('commit', '-q', '-m', 'Initial commit')
+
+    (repo / 'added').write_text('added')
+    (repo / 'modified').write_text('MODIFIED')
+    (repo / 'unstaged').write_text('UNSTAGED')
+    run('add', 'added', 'modified')
+    run('rm', '-q', 'deleted')
+    run('mv', 'renamed', 'moved')
+
+    path = str(repo)
+    assert sorted(staged_files(path)) == [
+        ('A', os.path.join(path, 'added')),
+        ('A', os.path.join(path, 'moved')),
+        ('D', os.path.join(path, 'deleted')),
+        ('D', os.path.join(path, 'renamed')),
+        ('M', os.path.join(path, 'modified'))
+    ]
+
+
+def test_staged_files_without_changes(repo):
+    assert staged_files(str(repo)) == []
+
+
+def test_add(repo, tmp_path):
+    (repo / '.gitignore').write_text('ignored\n')
+    for name in ('deleted', 'modified'):
+        (repo / name).write_text(name)
+    run('add', '.')
+    run('commit', '-q', '-m', 'Initial commit')
+
+    (repo / 'deleted').unlink()
+    (repo / 'modified').write_text('MODIFIED')
+    (repo / 'added').write_text('added')
+    (repo / 'ignored').write_text('ignored')
+    (repo / 'unrelated').write_text('unrelated')
+    (tmp_path / 'outside').write_text('outside')
+
+    filenames = [str(repo / name) for name in ('deleted', 'modified', 'added', 'ignored')]
+    add(str(repo), filenames + [str(tmp_path / 'outside')])
+
+    assert sorted(staged_files(str(repo))) == [
+        ('A', str(repo / 'added')),
+        ('D', str(repo / 'deleted')),
+        ('M', str(repo / 'modified'))
+    ]
+
+
+def test_add_without_files(repo):
+    add(str(repo), [])
+    assert staged_files(str(repo)) == []
+
+
+def test_unstaged_files(repo, tmp_path):
+    (repo / '.gitignore').write_text('ignored\n')
+    (repo / 'dir').mkdir()
+    for name in ('deleted', 'modified', 'staged', 'dir/modified'):
+        (repo / name).write_text(name)
+    run('add', '.')
+    run('commit', '-q', '-m', 'Initial commit')
+
+    (repo / 'deleted').unlink()
+    (repo / 'modified').write_text('MODIFIED')
+    (repo / 'dir' / 'modified').write_text('MODIFIED')
+    (repo / 'staged').write_text('STAGED')
+    run('add', 'staged')
+    for name in ('ignored', 'untracked', 'dir/untracked'):
+        (repo / name).write_text(name)
+
+    path = str(repo)
+    assert unstaged_files(path, [path, str(tmp_path / 'outside')]) == (
+        [os.path.join(path, name) for name in ('deleted', 'dir/modified', 'modified')],
+        [os.path.join(path, name) for name in ('dir/untracked', 'untracked')]
+    )
+    assert unstaged_files(path, [str(repo / 'dir')]) == (
+        [os.path.join(path, 'dir/modified')], [os.path.join(path, 'dir/untracked')]
+    )
+    assert unstaged_files(path, [str(tmp_path / 'outside')]) == ([], [])
+
+
+def test_keep_index(repo):
+    (repo / 'dir').mkdir()
+    for name in ('deleted', 'partial', 'clean'):
+        (repo / name).write_text('one\n')
+    run('add', '.')
+    run('commit', '-q', '-m', 'Initial commit')
+
+    (repo / 'deleted').unlink()
+    (repo / 'partial').write_text('one\nstaged\n')
+    run('add', 'partial')
+    (repo / 'partial').write_text('one\nstaged\nunstaged\n')
+    (repo / 'dir' / 'untracked').write_text('untracked\n')
+
+    path = str(repo)
+    with keep_index(path, [path]):
+        assert unstaged_files(path, [path]) == ([], [])
+        assert (repo / 'deleted').read_text() == 'one\n'
+        assert (repo / 'partial').read_text() == 'one\nstaged\n'
+
+        # Files written within the context may be staged:
+        (repo / 'clean').write_text('one\ngenerated\n')
+        run('add', 'clean')
+
+    assert not (repo / 'deleted').exists()
+    assert (repo / 'partial').read_text() == 'one\nstaged\nunstaged\n'
+    assert (repo / 'dir' / 'untracked').read_text() == 'untracked\n'
+    assert (repo / 'clean').read_text() == 'one\ngenerated\n'
+    assert unstaged_files(path, [path]) == (
+        [os.path.join(path, name) for name in ('deleted', 'partial')],
+        [os.path.join(path, 'dir/untracked')]
+    )
+    assert not os.path.exists(os.path.join(git_dir(), UNSTAGED_DIR))
+
+
+def test_keep_index_without_changes(repo):
+    path = str(repo)
+    with keep_index(path, [path]):
+        assert not os.path.exists(os.path.join(git_dir(), UNSTAGED_DIR))
+
+
+def test_keep_index_with_conflict(repo):
+    (repo / 'untracked').write_text('untracked\n')
+
+    path = str(repo)
+    with pytest.raises(GitError, match='unable to restore'):
+        with keep_index(path, [path]):
+            (repo / 'untracked').write_text('created\n')
+
+    # Changes are kept until restored by the user:
+    saved = os.path.join(git_dir(), UNSTAGED_DIR)
+    with open(os.path.join(saved, 'untracked', 'untracked')) as f:
+        assert f.read() == 'untracked\n'
+
+    with pytest.raises(GitError, match='exists'):
+        with keep_index(path, [path]):
+            pass
+
+
+def test_ls_files(repo):
+    (repo / 'dir').mkdir()
+    (repo / 'dir' / 'file').write_text('file\n')
+    (repo / 'other').write_text('other\n')
+    run('add', '.')
+
+    assert ls_files(str(repo / 'dir')) == {
+        'dir/file': ('100644', hash_object(b'file\n'))
+    }
+
+
+def test_update_index(repo):
+    obj = hash_object(b'content\n')
+    update_index([('100644', obj, 'dir/file')])
+
+    assert ls_files(str(repo)) == {'dir/file': ('100644', obj)}
+    assert not (repo / 'dir').exists()
+
+
+def test_update_index_without_entries(repo):
+    update_index([])
+    assert ls_files(str(repo)) == {}
+
+
+def test_cat_file(repo):
+    obj = hash_object(b'content\n')
+    with CatFile() as cat_file:
+        assert cat_file.read(obj) == b'content\n'
+        assert cat_file.read(hash_object(b'')) == b''
+
+        with pytest.raises(GitError):
+            cat_file.read('0' * 40)
@@ -0,0 +1,273 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+
+import mock
+import pytest
+
+from vimwiki_cli.html import *
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('a < b & <b>c</b>', 'a &lt; b &amp; <b>c</b>'),
+    ('*bold* _italic_ ~~del~~ ^sup^ ,,sub,,',
+     '<strong>bold</strong> <em>italic</em> <del>del</del> <sup>sup</sup> <sub>sub</sub>'),
+    ('*_both_*', '<strong><em>both</em></strong>'),
+    ('snake_case_name 2*3*4', 'snake_case_name 2*3*4'),
+    ('`*code* <x>`', '<code>*code* &lt;x&gt;</code>'),
+    ('$x^2$', '\\(x^2\\)'),
+    ('[[Page]] [[Page#Anchor|*desc*]]',
+     '<a href="Page.html">Page</a> <a href="Page.html#Anchor"><strong>desc</strong></a>'),
+    ('[[/Page]] [[dir/]] [[diary:2024-01-01]]',
+     '<a href="../Page.html">/Page</a> <a href="dir/">dir/</a> '
+     '<a href="../diary/2024-01-01.html">diary:2024-01-01</a>'),
+    ('[[https://example.com|{{image.png}}]]',
+     '<a href="https://example.com"><img src="image.png" /></a>'),
+    ('{{image.png|alt|width:10px}}', '<img src="image.png" alt="alt" style="width:10px" />'),
+    ('see https://example.com/a_b.', 'see <a href="https://example.com/a_b">'
+     'https://example.com/a_b</a>.'),
+    (':tag1:tag2: TODO', '<span id="tag1" class="tag">tag1</span> '
+     '<span id="tag2" class="tag">tag2</span> <span class="todo">TODO</span>')
+])
+def test_inline(text, expected):
+    assert inline(text, '../') == expected
+
+
+def test_inline_with_diary_rel_path():
+    assert inline('[[diary:2024-01-01]] {{diary:image.png}}', '../', 'journal') == \
+        '<a href="../journal/2024-01-01.html">diary:2024-01-01</a> ' \
+        '<img src="../journal/image.png" />'
+
+
+def test_convert():
+    document = convert([
+        '%title Title',
+        '%template other',
+        '= Header =',
+        '  == Centered ==',
+        'Some text',
+        'continues here.',
+        '%% comment',
+        '',
+        '* item',
+        '  continued',
+        '  1. nested',
+        '* [X] done',
+        '----',
+        'Term:: Definition',
+        '    quoted'
+    ], 'Page')
+
+    assert document.content == [
+        '<div id="Header"><h1 id="Header" class="header"><a href="#Header">Header</a></h1></div>',
+        '<div id="Header-Centered"><h2 id="Centered" class="header justcenter">'
+        '<a href="#Header-Centered">Centered</a></h2></div>',
+        '<p>', 'Some text', 'continues here.', '</p>',
+        '<ul>', '<li>item', 'continued',
+        '<ol>', '<li>nested', '</li>', '</ol>', '</li>',
+        '<li class="done4">done', '</li>', '</ul>',
+        '<hr />',
+        '<dl>', '<dt>Term</dt>', '<dd>Definition</dd>', '</dl>',
+        '<blockquote>', 'quoted', '</blockquote>'
+    ]
+    assert document.title == 'Title'
+    assert document.template == 'other'
+    assert not document.nohtml
+
+
+def test_convert_with_table():
+    document = convert([
+        ' | A | B | C |',
+        ' |---|---|---|',
+        ' | [[x|y]] | > | 1 |',
+        ' | 2 | 3 | \\/ |'
+    ], 'Page')
+
+    assert document.content == [
+        '<table class="center">',
+        '<thead>', '<tr>', '<th>A</th>', '<th>B</th>', '<th>C</th>', '</tr>', '</thead>',
+        '<tbody>',
+        '<tr>', '<td colspan="2"><a href="x.html">y</a></td>', '<td rowspan="2">1</td>', '</tr>',
+        '<tr>', '<td>2</td>', '<td>3</td>', '</tr>',
+        '</tbody>',
+        '</table>'
+    ]
+
+
+def test_convert_with_preformatted():
+    document = convert([
+        '{{{class="python"',
+        'if a < b:',
+        '    = not a header =',
+        '}}}',
+        '{{$',
+        'x^2',
+        '}}$',
+        '{{{',
+        'unterminated'
+    ], 'Page')
+
+    assert document.content == [
+        '<pre class="python">', 'if a &lt; b:', '    = not a header =', '</pre>',
+        '\\[', 'x^2', '\\]',
+        '<pre>', 'unterminated', '</pre>'
+    ]
+
+
+def test_convert_with_placeholders():
+    document = convert(['%nohtml', '%date'], 'dir/Page')
+
+    assert document.title == 'Page'
+    assert document.date
+    assert document.dated
+    assert document.template == TEMPLATE_DEFAULT
+    assert document.nohtml
+
+
+@pytest.fixture
+def wiki_path(tmp_path):
+    path = tmp_path / 'wiki'
+    (path / 'dir').mkdir(parents=True)
+    (path / 'index.wiki').write_text('%title Home\n= Index =\n[[dir/Page]]\n')
+    (path / 'dir' / 'Page.wiki').write_text('%template other\n[[/index]]\n')
+    (path / 'Hidden.wiki').write_text('%nohtml\n')
+    (path / 'templates').mkdir()
+    (path / 'templates' / 'other.tpl').write_text('%root_path%|%wiki_path%|%content%\n')
+    return path
+
+
+def test_all_html(tmp_path, wiki_path):
+    path_html = tmp_path / 'html'
+    (path_html / 'old').mkdir(parents=True)
+    (path_html / 'old' / 'Removed.html').write_text('')
+
+    assert all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates')) == 2
+
+    index = (path_html / 'index.html').read_text()
+    assert '<title>Home</title>' in index
+    assert 'href="style.css"' in index
+    assert '<a href="dir/Page.html">dir/Page</a>' in index
+    assert (path_html / 'dir' / 'Page.html').read_text() == \
+        '../|dir/Page.wiki|<p>\n<a href="../index.html">/index</a>\n</p>\n'
+    assert (path_html / CSS_NAME).exists()
+    assert not (path_html / 'Hidden.html').exists()
+    assert not (path_html / 'old' / 'Removed.html').exists()
+
+
+def test_all_html_with_manifest(tmp_path, wiki_path):
+    path_html = tmp_path / 'html'
+
+    def run(**kwargs):
+        return all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates'),
+                        **kwargs)
+
+    assert run() == 2
+    os.utime(str(path_html / 'index.html'), ns=(0, 0))
+
+    # Pages are only converted again if their content changes:
+    assert run() == 0
+    os.utime(str(wiki_path / 'index.wiki'), ns=(0, 2 ** 62))
+    assert run() == 0
+
+    # Unchanged output is not written, even if converted:
+    assert run(all=True) == 2
+    assert os.stat(str(path_html / 'index.html')).st_mtime_ns == 0
+
+    (wiki_path / 'index.wiki').write_text('%title Home\n= Changed =\n')
+    assert run() == 1
+    assert 'Changed' in (path_html / 'index.html').read_text()
+
+    # Pages are converted again if their template changes:
+    (wiki_path / 'templates' / 'other.tpl').write_text('%content%\n')
+    assert run() == 1
+    assert (path_html / 'dir' / 'Page.html').read_text() == \
+        '<p>\n<a href="../index.html">/index</a>\n</p>\n'
+
+    # Or if their HTML files are removed:
+    (path_html / 'dir' / 'Page.html').unlink()
+    assert run() == 1
+    assert (path_html / 'dir' / 'Page.html').exists()
+
+    # Removed pages are dropped from the manifest:
+    (wiki_path / 'dir' / 'Page.wiki').unlink()
+    assert run() == 0
+    assert not (path_html / 'dir' / 'Page.html').exists()
+
+
+@mock.patch('vimwiki_cli.html.datetime')
+def test_all_html_with_date(mock_datetime, tmp_path, wiki_path):
+    path_html = tmp_path / 'html'
+    (wiki_path / 'Dated.wiki').write_text('%date\n')
+    (wiki_path / 'Fixed.wiki').write_text('%date 2020-01-01\n')
+
+    def run(today):
+        mock_datetime.date.today.return_value.isoformat.return_value = today
+        return all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates'))
+
+    assert run('2026-01-01') == 4
+    assert run('2026-01-01') == 0
+
+    # Pages with a bare %date are converted again once the date changes:
+    assert run('2026-01-02') == 1
+    assert '<title>Dated</title>' in (path_html / 'Dated.html').read_text()
+    assert run('2026-01-02') == 0
+
+
+def test_all_html_with_user_htmls(tmp_path, wiki_path):
+    path_html = tmp_path / 'html'
+    (path_html / 'dir').mkdir(parents=True)
+    (path_html / 'search.html').write_text('')
+    (path_html / 'dir' / '404.html').write_text('')
+    (path_html / 'Removed.html').write_text('')
+
+    # User HTML files are matched by file name in any directory:
+    assert all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates'),
+                    user_htmls=['search.html', '404.html']) == 2
+    assert (path_html / 'search.html').exists()
+    assert (path_html / 'dir' / '404.html').exists()
+    assert not (path_html / 'Removed.html').exists()
+
+    assert all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates'),
+                    only=[str(wiki_path / 'search.wiki')], user_htmls=['search.html']) == 0
+    assert (path_html / 'search.html').exists()
+
+
+def test_all_html_with_only(tmp_path, wiki_path):
+    path_html = tmp_path / 'html'
+    assert all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates')) == 2
+    (path_html / 'Orphan.html').write_text('')
+
+    (wiki_path / 'index.wiki').write_text('= Changed =\n')
+    (wiki_path / 'dir' / 'Page.wiki').write_text('= Changed =\n')
+    (wiki_path / 'dir' / 'Page.wiki').rename(wiki_path / 'dir' / 'Renamed.wiki')
+
+    only = [str(wiki_path / 'dir' / 'Page.wiki'), str(wiki_path / 'dir' / 'Renamed.wiki')]
+    assert all_html(str(wiki_path), '.wiki', str(path_html), str(wiki_path / 'templates'),
+                    only=only) == 1
+
+    # Other pages and HTML files are left untouched:
+    assert 'Changed' not in (path_html / 'index.html').read_text()
+    assert (path_html / 'Orphan.html').exists()
+    assert not (path_html / 'dir' / 'Page.html').exists()
+    assert 'Changed' in (path_html / 'dir' / 'Renamed.html').read_text()
@@ -0,0 +1,167 @@
+# Copyright (C) 2021 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+import subprocess
+import sys
+
+import mock
+import pytest
+from click.testing import CliRunner
+
+from vimwiki_cli.__main__ import cli
+from vimwiki_cli.launcher import *
+
+# Modules which may be imported before the editor is launched by the fast
+# path; importing anything else, such as click, regresses cold-start time:
+FAST_IMPORTS = {'vimwiki_cli', 'vimwiki_cli.launcher'}
+
+# Modules which are only imported by commands which need them:
+LAZY_IMPORTS = {'asyncio', 'sqlite3', 'vimwiki_cli.config', 'vimwiki_cli.diary',
+                'vimwiki_cli.git', 'vimwiki_cli.hook', 'vimwiki_cli.html', 'vimwiki_cli.links',
+                'vimwiki_cli.listing', 'vimwiki_cli.metadata', 'vimwiki_cli.parallel',
+                'vimwiki_cli.search', 'vimwiki_cli.server', 'vimwiki_cli.staged',
+                'vimwiki_cli.tags', 'vimwiki_cli.watch', 'vimwiki_cli.watcher'}
+
+# Cumulative import time of the fast path in microseconds:
+FAST_IMPORT_BUDGET = 20000
+
+
+def import_times(module):
+    """Return a mapping of modules imported by module to their cumulative
+    import time in microseconds, as reported by a fresh interpreter.
+    """
+    # Coverage is not measured as it imports modules of its own:
+    env = {key: value for key, value in os.environ.items() if not key.startswith('COV_CORE_')}
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True, env=env, check=True)
+    times = {}
+    for line in process.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv('EDITOR', 'vim')
+    return monkeypatch
+
+
+@mock.patch('os.execvp')
+@pytest.mark.parametrize('args', [
+    '',
+    'diary',
+    'diary today',
+    'diary tomorrow',
+    'diary yesterday',
+    '--editor EDITOR diary today',
+    '--editor=EDITOR --count 2 diary today',
+    '--count=0',
+    '--select diary today',
+    '--count 2 --select',
+    '--open-tabs diary yesterday',
+    '--open-tabs --select'
+])
+def test_fast_args(mock_execvp, env, args):
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0
+
+    # Editor arguments must match those of the command line interface:
+    expected = mock_execvp.call_args.args[1]
+    assert fast_args(args.split()) == expected
+
+
+@mock.patch('os.execvp')
+@pytest.mark.parametrize('environ', [
+    {'VIMWIKI_EDITOR': 'EDITOR'},
+    {'VIMWIKI_EDITOR': ''},
+    {'VIMWIKI_COUNT': '2'},
+    {'VIMWIKI_SELECT': 'yes'},
+    {'VIMWIKI_OPEN_TABS': '1', 'VIMWIKI_SELECT': 'off'}
+])
+def test_fast_args_with_env(mock_execvp, env, environ):
+    for key, value in environ.items():
+        env.setenv(key, value)
+
+    result = CliRunner().invoke(cli, 'diary today')
+    assert result.exit_code == 0
+
+    expected = mock_execvp.call_args.args[1]
+    assert fast_args(['diary', 'today']) == expected
+
+
+@pytest.mark.parametrize('args,environ', [
+    ('--help', {}),
+    ('--version', {}),
+    ('-v diary today', {}),
+    ('--path PATH diary today', {}),
+    ('--select=1', {}),
+    ('--editor', {}),
+    ('--count COUNT', {}),
+    ('diary generate-links', {}),
+    ('goto PAGE', {}),
+    ('diary today', {'VIMWIKI_VERBOSE': '1'}),
+    ('--timings diary today', {}),
+    ('diary today', {'VIMWIKI_TIMINGS': '1'}),
+    ('diary today', {'VIMWIKI_TRACE': 'FILE'}),
+    ('diary today', {'VIMWIKI_COUNT': 'COUNT'}),
+    ('--count all diary today', {}),
+    ('diary today', {'VIMWIKI_WIKIS': '1,2'}),
+    ('diary today', {'VIMWIKI_INTERACTIVE': '0'}),
+    ('diary today', {'VIMWIKI_SELECT': 'maybe'}),
+    ('', {'_VIMWIKI_COMPLETE': 'bash_complete'})
+])
+def test_fast_args_with_fallback(env, args, environ):
+    for key, value in environ.items():
+        env.setenv(key, value)
+
+    assert fast_args(args.split()) is None
+
+
+@mock.patch('vimwiki_cli.__main__.cli')
+@mock.patch('os.execvp')
+@pytest.mark.parametrize('argv,fast', [
+    (['vimwiki', 'diary', 'today'], True),
+    (['vimwiki', 'tags', 'rebuild'], False)
+])
+def test_main(mock_execvp, mock_cli, env, argv, fast):
+    env.setattr(sys, 'argv', argv)
+    main()
+
+    assert mock_execvp.called == fast
+    assert mock_cli.called != fast
+
+
+def test_fast_imports():
+    times = import_times('vimwiki_cli.launcher')
+    assert not set(name for name in times if name.startswith('vimwiki_cli')) - FAST_IMPORTS
+    assert 'click' not in times and 'logging' not in times
+    assert times['vimwiki_cli.launcher'] < FAST_IMPORT_BUDGET
+
+
+def test_lazy_imports():
+    times = import_times('vimwiki_cli.__main__')
+    assert not LAZY_IMPORTS & set(times)
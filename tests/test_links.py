@@ -0,0 +1,174 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+
+import pytest
+
+from vimwiki_cli.links import *
+from vimwiki_cli.syntax import get_syntax
+
+
+@pytest.mark.parametrize('target,page,expected', [
+    ('Page', 'index', (PAGE, 'Page')),
+    (' Page#Anchor ', 'dir/index', (PAGE, 'dir/Page')),
+    ('../Page', 'dir/index', (PAGE, 'Page')),
+    ('/Page', 'dir/index', (PAGE, 'Page')),
+    ('Page.md', 'index', (PAGE, 'Page')),
+    ('diary:2024-01-01', 'dir/index', (PAGE, 'diary/2024-01-01')),
+    ('dir/', 'index', (DIRECTORY, 'dir')),
+    ('local:image.png', 'dir/index', (FILE, 'dir/image.png')),
+    ('file:/tmp/file.txt', 'index', (FILE, '/tmp/file.txt')),
+    ('//tmp/file.txt', 'index', (FILE, '/tmp/file.txt')),
+    ('#Anchor', 'index', None),
+    ('https://example.com', 'index', None),
+    ('wiki1:Page', 'index', None),
+    ('wn.Other:Page', 'index', None)
+])
+def test_resolve(target, page, expected):
+    assert resolve(target, page, '.md') == expected
+
+
+def test_resolve_with_diary_rel_path():
+    assert resolve('diary:2024-01-01', 'index', '.md', 'journal') == (PAGE, 'journal/2024-01-01')
+
+
+@pytest.mark.parametrize('syntax,lines,expected', [
+    ('default', ['[[Page]] and [[Other|desc]]', '`[[Code]]`', '{{{', '[[Pre]]', '}}}',
+                 '[[https://example.com]]'],
+     [(1, 'Page', PAGE, 'Page'), (1, 'Other', PAGE, 'Other')]),
+    ('markdown', ['[desc](Page.md) ![image](image.png) [[Other]]', '```', '[x](Pre)', '```'],
+     [(1, 'Page.md', PAGE, 'Page'), (1, 'Other', PAGE, 'Other')])
+])
+def test_scan_links(syntax, lines, expected):
+    assert scan_links(lines, 'index', get_syntax(syntax), '.md') == expected
+
+
+def test_check_links(tmp_path):
+    (tmp_path / 'dir').mkdir()
+    (tmp_path / 'index.wiki').write_text('[[Page]]\n[[Missing]]\n[[dir/]]\n[[local:none.png]]\n')
+    (tmp_path / 'Page.wiki').write_text('[[index]] [[missing/]]\n')
+
+    assert check_links(str(tmp_path), '.wiki', 'default') == [
+        Link('Page', 1, 'missing/'),
+        Link('index', 2, 'Missing'),
+        Link('index', 4, 'local:none.png')
+    ]
+
+    (tmp_path / 'Missing.wiki').write_text('')
+    (tmp_path / 'Page.wiki').unlink()
+
+    assert check_links(str(tmp_path), '.wiki', 'default') == [
+        Link('index', 1, 'Page'),
+        Link('index', 4, 'local:none.png')
+    ]
+
+
+def test_link_index(tmp_path):
+    # The wiki is kept apart from the cache directory, which changes as the
+    # index is written:
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('[[Page]]\n')
+
+    with LinkIndex(str(path), '.wiki', 'default') as index:
+        assert not index.is_current()
+        assert index.update() == 1
+        assert index.update() == 0
+        assert index.is_current()
+
+        # Adding a page in a new directory modifies its parent directory:
+        (path / 'dir').mkdir()
+        (path / 'dir' / 'Page.wiki').write_text('')
+        assert not index.is_current()
+        assert index.update() == 1
+        assert index.is_current()
+
+        # Pages modified in place are detected by their stat:
+        os.utime(str(path / 'dir'), ns=(0, 0))
+        index.update()
+        (path / 'dir' / 'Page.wiki').write_text('[[index]]\n')
+        os.utime(str(path / 'dir'), ns=(0, 0))
+        assert not index.is_current()
+        assert index.update() == 1
+        assert index.is_current()
+
+        (path / 'dir' / 'Page.wiki').unlink()
+        assert not index.is_current()
+
+    # Changing settings rebuilds the index:
+    with LinkIndex(str(path), '.wiki', 'markdown') as index:
+        assert index.update() == 1
+    with LinkIndex(str(path), '.wiki', 'markdown', 'journal') as index:
+        assert index.update() == 1
+
+
+def test_check_links_with_diary_rel_path(tmp_path):
+    (tmp_path / 'journal').mkdir()
+    (tmp_path / 'journal' / '2024-01-01.wiki').write_text('')
+    (tmp_path / 'index.wiki').write_text('[[diary:2024-01-01]]\n')
+
+    assert check_links(str(tmp_path), '.wiki', 'default', diary_rel_path='journal') == []
+    assert check_links(str(tmp_path), '.wiki', 'default') == [
+        Link('index', 1, 'diary:2024-01-01')
+    ]
+
+
+def test_backlinks_and_orphans(tmp_path):
+    (tmp_path / 'dir').mkdir()
+    (tmp_path / 'index.wiki').write_text('[[Page]]\n\n[[dir/Page]]\n')
+    (tmp_path / 'Page.wiki').write_text('[[Page]] [[index]]\n')
+    (tmp_path / 'dir' / 'Page.wiki').write_text('[[../Page#Anchor|desc]]\n')
+    (tmp_path / 'Orphan.wiki').write_text('[[Orphan]]\n')
+
+    with LinkIndex(str(tmp_path), '.wiki', 'default') as index:
+        index.update()
+
+        assert list(index.backlinks('Page')) == [
+            Link('dir/Page', 1, '../Page#Anchor'),
+            Link('index', 1, 'Page')
+        ]
+        assert list(index.backlinks('Orphan')) == []
+        assert list(index.orphans()) == ['Orphan']
+
+
+def test_backlinks_and_orphans_with_index_update(tmp_path):
+    # The wiki is kept apart from the cache directory, which changes as the
+    # index is written:
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('[[Page]]\n')
+    (path / 'Page.wiki').write_text('')
+
+    assert backlinks(str(path), '.wiki', 'default', 'Page') == [Link('index', 1, 'Page')]
+    assert orphans(str(path), '.wiki', 'default') == []
+
+    (path / 'Orphan.wiki').write_text('')
+    assert orphans(str(path), '.wiki', 'default') == ['Orphan']
+
+    # Pages modified in place are rescanned:
+    (path / 'Orphan.wiki').write_text('[[Page]]\n')
+    assert backlinks(str(path), '.wiki', 'default', 'Page') == [
+        Link('Orphan', 1, 'Page'),
+        Link('index', 1, 'Page')
+    ]
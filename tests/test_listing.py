@@ -0,0 +1,226 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import pytest
+
+from vimwiki_cli.listing import *
+
+
+def generate(margin):
+    return [margin + '- A', margin + '- B']
+
+
+@pytest.mark.parametrize('lines,expected', [
+    ([], ['= Header =', '- A', '- B']),
+    (['Text'], ['Text', '', '= Header =', '- A', '- B']),
+    (['= Header =', '- Old', '', 'Text'], ['= Header =', '- A', '- B', '', 'Text']),
+    (['Text', '  = Header =  ', '    * Old', '', '', '== Next =='],
+     ['Text', '  = Header =', '    - A', '    - B', '', '== Next ==']),
+    (['= Header =', '- Old'], ['= Header =', '- A', '- B'])
+])
+def test_update_listing(lines, expected):
+    assert update_listing(lines, 'Header', generate, 'default') == expected
+
+
+@pytest.mark.parametrize('lines,expected', [
+    (['Text'], ['= Header =', '- A', '- B', '', 'Text']),
+    (['', 'Text'], ['= Header =', '- A', '- B', '', 'Text'])
+])
+def test_update_listing_with_default(lines, expected):
+    assert update_listing(lines, 'Header', generate, 'default', default=0) == expected
+
+
+@pytest.mark.parametrize('pattern,name,expected', [
+    ('**/*', 'index', True),
+    ('**/*', 'a/b/Page', True),
+    ('a/*', 'a/Page', True),
+    ('a/*', 'a/b/Page', False),
+    ('a/**', 'a/b/Page', True),
+    ('a/**/Page', 'a/Page', True),
+    ('?', 'a', True),
+    ('a?b', 'a/b', False),
+    ('[ab]', 'b', True),
+    ('[!ab]', 'c', True),
+    ('[!ab]', 'a', False),
+    ('a.b', 'axb', False)
+])
+def test_glob_regex(pattern, name, expected):
+    assert bool(glob_regex(pattern).match(name)) == expected
+
+
+def test_update_listing_with_markdown():
+    assert update_listing(['# Header', '- Old'], 'Header', generate, 'markdown') == \
+        ['# Header', '- A', '- B']
+
+
+@pytest.mark.parametrize('syntax,description,expected', [
+    ('default', None, '[[dir/Page]]'),
+    ('default', 'Page', '[[dir/Page|Page]]'),
+    ('markdown', None, '[dir/Page](dir/Page)'),
+    ('markdown', 'Page', '[Page](dir/Page)')
+])
+def test_format_link(syntax, description, expected):
+    assert format_link('dir/Page', syntax, description) == expected
+
+
+@pytest.mark.parametrize('syntax,expected', [
+    ('default', '== Header =='),
+    ('markdown', '## Header')
+])
+def test_format_header(syntax, expected):
+    assert format_header('Header', 2, syntax) == expected
+
+
+def test_generate_links(tmp_path):
+    for name in ['index.wiki', 'a/Page.wiki', 'a/b/Page.wiki', 'diary/2024-01-01.wiki']:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('')
+
+    assert generate_links(str(tmp_path), '.wiki', 'default', 'a/index')
+    assert (tmp_path / 'a' / 'index.wiki').read_text() == \
+        '= Generated Links =\n- [[../index]]\n- [[Page]]\n- [[b/Page]]\n'
+
+    # Links are generated to all pages, including the page itself once it
+    # has been created; like Vim's glob, * does not match across
+    # directories:
+    assert generate_links(str(tmp_path), '.wiki', 'default', 'a/index', 'a/*')
+    assert (tmp_path / 'a' / 'index.wiki').read_text() == \
+        '= Generated Links =\n- [[Page]]\n- [[index]]\n'
+
+    # The page is only written if the links change:
+    assert not generate_links(str(tmp_path), '.wiki', 'default', 'a/index', 'a/*')
+
+    assert generate_links(str(tmp_path), '.wiki', 'default', 'a/index', 'a/**/P?ge')
+    assert (tmp_path / 'a' / 'index.wiki').read_text() == \
+        '= Generated Links =\n- [[Page]]\n- [[b/Page]]\n'
+
+
+@pytest.mark.parametrize('syntax,bullet,expected', [
+    ('default', None, '- [[Page]]'),
+    ('media', None, '* [[Page]]'),
+    ('default', '*', '* [[Page]]')
+])
+def test_generate_links_with_bullet(tmp_path, syntax, bullet, expected):
+    (tmp_path / 'Page.wiki').write_text('')
+
+    assert generate_links(str(tmp_path), '.wiki', syntax, 'Page', bullet=bullet)
+    assert (tmp_path / 'Page.wiki').read_text().splitlines()[1] == expected
+
+
+def test_generate_links_with_diary_rel_path(tmp_path):
+    for name in ['diary/2024-01-01.wiki', 'journal/2024-01-02.wiki']:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text('')
+
+    assert generate_links(str(tmp_path), '.wiki', 'default', 'index', '', 'journal')
+    assert (tmp_path / 'index.wiki').read_text() == \
+        '= Generated Links =\n- [[diary/2024-01-01]]\n'
+
+
+def test_diary_generate_links(tmp_path):
+    (tmp_path / 'diary').mkdir()
+    for name in ['2023-12-31', '2024-01-01', '2024-01-02', '2024-02-01-meeting', '2024-13-01',
+                 'diary', 'notes']:
+        (tmp_path / 'diary' / (name + '.wiki')).write_text('')
+    (tmp_path / 'diary' / '2024-01-02.wiki').write_text('\n= Caption =\n')
+    (tmp_path / 'diary' / 'diary.wiki').write_text('Top\n')
+
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default')
+    assert (tmp_path / 'diary' / 'diary.wiki').read_text() == \
+        '= Diary =\n' \
+        '== 2024 ==\n' \
+        '\n' \
+        '=== February ===\n' \
+        '- [[2024-02-01-meeting]]\n' \
+        '\n' \
+        '=== January ===\n' \
+        '- [[2024-01-02|Caption]]\n' \
+        '- [[2024-01-01]]\n' \
+        '\n' \
+        '== 2023 ==\n' \
+        '\n' \
+        '=== December ===\n' \
+        '- [[2023-12-31]]\n' \
+        '\n' \
+        'Top\n'
+
+    # The diary index is only written if the links change:
+    assert not diary_generate_links(str(tmp_path), '.wiki', 'default')
+
+    (tmp_path / 'diary' / '2023-12-31.wiki').unlink()
+    (tmp_path / 'diary' / '2024-01-01.wiki').write_text('= New Caption =\n')
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default')
+    assert (tmp_path / 'diary' / 'diary.wiki').read_text() == \
+        '= Diary =\n' \
+        '== 2024 ==\n' \
+        '\n' \
+        '=== February ===\n' \
+        '- [[2024-02-01-meeting]]\n' \
+        '\n' \
+        '=== January ===\n' \
+        '- [[2024-01-02|Caption]]\n' \
+        '- [[2024-01-01|New Caption]]\n' \
+        '\n' \
+        'Top\n'
+
+
+def test_diary_generate_links_with_diary_rel_path(tmp_path):
+    for name in ['diary/2024-01-01.wiki', 'journal/2024-01-02.wiki']:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text('')
+
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default', 'journal')
+    assert (tmp_path / 'journal' / 'diary.wiki').read_text() == \
+        '= Diary =\n== 2024 ==\n\n=== January ===\n- [[2024-01-02]]\n'
+    assert not (tmp_path / 'diary' / 'diary.wiki').exists()
+
+    # The default diary directory is used otherwise:
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default')
+    assert (tmp_path / 'diary' / 'diary.wiki').read_text() == \
+        '= Diary =\n== 2024 ==\n\n=== January ===\n- [[2024-01-01]]\n'
+
+
+def test_diary_generate_links_with_markdown(tmp_path):
+    (tmp_path / 'diary').mkdir()
+    (tmp_path / 'diary' / '2024-01-01.md').write_text('# Caption\n')
+    (tmp_path / 'diary' / '2024-01-02.md').write_text('')
+
+    # Markdown links always have a description:
+    assert diary_generate_links(str(tmp_path), '.md', 'markdown')
+    assert (tmp_path / 'diary' / 'diary.md').read_text() == \
+        '# Diary\n## 2024\n\n### January\n\n' \
+        '- [2024-01-02](2024-01-02)\n- [Caption](2024-01-01)\n'
+
+
+def test_diary_generate_links_with_bullet(tmp_path):
+    (tmp_path / 'diary').mkdir()
+    (tmp_path / 'diary' / '2024-01-01.wiki').write_text('')
+
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default', bullet='*')
+    assert (tmp_path / 'diary' / 'diary.wiki').read_text() == \
+        '= Diary =\n== 2024 ==\n\n=== January ===\n* [[2024-01-01]]\n'
+
+
+def test_diary_generate_links_without_diary(tmp_path):
+    assert diary_generate_links(str(tmp_path), '.wiki', 'default')
+    assert (tmp_path / 'diary' / 'diary.wiki').read_text() == '= Diary =\n'
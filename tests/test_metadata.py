@@ -0,0 +1,165 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+
+import mock
+import pytest
+
+from vimwiki_cli.metadata import *
+from vimwiki_cli.syntax import get_syntax
+
+
+@pytest.mark.parametrize('lines,expected', [
+    ([':tag1:tag2:'],
+     [Tag('tag1', 1, 'Page'), Tag('tag2', 1, 'Page')]),
+    (['= Header =', ':tag:'],
+     [Tag('tag', 2, 'Page#Header')]),
+    (['= Header =', '== Sub ==', '', ':tag:'],
+     [Tag('tag', 4, 'Page#Header#Sub')]),
+    (['', '', '', 'text :tag: more :other:'],
+     [Tag('tag', 4, 'Page#tag'), Tag('other', 4, 'Page#other')]),
+    (['= :notag: ='], []),
+    (['{{{', ':notag:', '}}}', 'a:notag:', ':not a tag:'], [])
+])
+def test_scan_tags(lines, expected):
+    assert scan_tags(lines, 'Page', get_syntax('default')) == expected
+
+
+def test_scan_tags_with_markdown():
+    lines = ['# Header', ':tag:', '```', ':notag:', '```']
+    assert scan_tags(lines, 'Page', get_syntax('markdown')) == [Tag('tag', 2, 'Page#Header')]
+
+
+def test_format_metadata():
+    lines = format_metadata({'b/Page': [Tag('tag', 1, 'b/Page')],
+                             'a\\Page': [Tag('tag', 3, 'a\\Page#tag')]}, '.wiki')
+
+    assert lines[0] == '!_TAG_FILE_FORMAT\t2'
+    assert lines[-1] == 'tag\tb/Page.wiki\t1;"\tvimwiki:b/Page\\tb/Page'
+    assert lines[-2] == 'tag\ta\\Page.wiki\t3;"\tvimwiki:a\\\\Page\\ta\\\\Page#tag'
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_rebuild_tags(tmp_path, jobs):
+    (tmp_path / 'index.wiki').write_text(':tag1:\n')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'Page.wiki').write_text('= Header =\r\n:tag2:\r\n')
+    (tmp_path / '.hidden').mkdir()
+    (tmp_path / '.hidden' / 'Page.wiki').write_text(':hidden:\n')
+
+    with mock.patch('vimwiki_cli.pages.PARALLEL_THRESHOLD', 0):
+        rebuild_tags(str(tmp_path), '.wiki', 'default', jobs=jobs)
+
+    lines = (tmp_path / METADATA_FILE).read_text().splitlines()
+    assert lines[7:] == [
+        'tag1\tindex.wiki\t1;"\tvimwiki:index\\tindex',
+        'tag2\tsub/Page.wiki\t2;"\tvimwiki:sub/Page\\tsub/Page#Header'
+    ]
+
+
+def test_parse_metadata():
+    metadata = {'a\\Page': [Tag('tag1', 3, 'a\\Page#tag1')],
+                'b/Page': [Tag('tag1', 1, 'b/Page'), Tag('tag2', 2, 'b/Page#Header')]}
+
+    lines = format_metadata(metadata, '.wiki') + ['malformed']
+    assert parse_metadata(lines) == metadata
+
+
+def test_read_metadata_without_file(tmp_path):
+    assert read_metadata(str(tmp_path)) == {}
+
+
+@pytest.fixture
+def tagged_wiki(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text(':tag1:\n')
+    (path / 'Page.wiki').write_text(':tag2:\n')
+    return path
+
+
+def test_rebuild_tags_incremental(tagged_wiki):
+    path = str(tagged_wiki)
+    assert rebuild_tags(path, '.wiki', 'default', all=False) == 2
+    assert rebuild_tags(path, '.wiki', 'default', all=False) == 0
+
+    # Changing mtime alone should not cause a page to be scanned:
+    os.utime(str(tagged_wiki / 'Page.wiki'), ns=(0, 0))
+    assert rebuild_tags(path, '.wiki', 'default', all=False) == 0
+
+    (tagged_wiki / 'Page.wiki').write_text(':tag3:\n')
+    (tagged_wiki / 'index.wiki').unlink()
+    assert rebuild_tags(path, '.wiki', 'default', all=False) == 1
+
+    assert read_metadata(path) == {'Page': [Tag('tag3', 1, 'Page')]}
+
+    # Rebuilding all pages ignores the manifest:
+    assert rebuild_tags(path, '.wiki', 'default', all=True) == 1
+
+
+def test_rebuild_tags_with_only(tagged_wiki, tmp_path):
+    path = str(tagged_wiki)
+    (tagged_wiki / METADATA_FILE).write_text('\n'.join(format_metadata({
+        'index': [Tag('old', 1, 'index')],
+        'Deleted': [Tag('deleted', 1, 'Deleted')]
+    }, '.wiki')) + '\n')
+
+    only = [str(tagged_wiki / 'Page.wiki'), str(tagged_wiki / 'Deleted.wiki'),
+            str(tagged_wiki / 'README.md'), str(tmp_path / 'Outside.wiki')]
+    assert rebuild_tags(path, '.wiki', 'default', all=False, only=only) == 1
+
+    assert read_metadata(path) == {'index': [Tag('old', 1, 'index')],
+                                   'Page': [Tag('tag2', 1, 'Page')]}
+
+
+def test_load_tags(tagged_wiki):
+    path = str(tagged_wiki)
+    assert load_tags(path) == {}
+
+    (tagged_wiki / 'Page.wiki').write_text('\n\n\ntext :tag1:\n')
+    rebuild_tags(path, '.wiki', 'default')
+    expected = {'tag1': [Location('Page', 4, 'Page#tag1'), Location('index', 1, 'index')]}
+    assert load_tags(path) == expected
+
+    # Tags are cached until the metadata file changes:
+    with mock.patch('vimwiki_cli.metadata.read_metadata') as mock_read_metadata:
+        assert load_tags(path) == expected
+        mock_read_metadata.assert_not_called()
+
+    (tagged_wiki / 'index.wiki').write_text(':tag2:\n')
+    rebuild_tags(path, '.wiki', 'default')
+    assert load_tags(path) == {'tag1': [Location('Page', 4, 'Page#tag1')],
+                               'tag2': [Location('index', 1, 'index')]}
+
+
+@pytest.mark.parametrize('pattern,expected', [
+    ('tag1', [('tag1', Location('index', 1, 'index'))]),
+    ('tag.', [('tag1', Location('index', 1, 'index')), ('tag2', Location('Page', 1, 'Page'))]),
+    ('tag', [])
+])
+def test_search_tags(tagged_wiki, pattern, expected):
+    path = str(tagged_wiki)
+    rebuild_tags(path, '.wiki', 'default')
+
+    assert search_tags(path, pattern) == expected
@@ -0,0 +1,181 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+import subprocess
+
+import mock
+import pytest
+
+from vimwiki_cli.pages import *
+
+
+def test_page_name():
+    assert page_name('/wiki', os.path.join('/wiki', 'sub', 'Page.wiki'), '.wiki') == 'sub/Page'
+
+
+def test_iter_pages(tmp_path):
+    for name in ['index.wiki', 'index.html', '.index.wiki', 'b/Page.wiki', '.git/Page.wiki']:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text('')
+
+    assert [page for page, _ in iter_pages(str(tmp_path), '.wiki')] == ['index', 'b/Page']
+
+
+def test_list_pages(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'b').mkdir()
+    (path / 'index.wiki').write_text('')
+    (path / 'b' / 'Page.wiki').write_text('')
+
+    assert list_pages(str(path), '.wiki') == ['b/Page', 'index']
+
+    # Cached pages are used until a directory is modified:
+    st = os.stat(str(path / 'b'))
+    (path / 'b' / 'New.wiki').write_text('')
+    os.utime(str(path / 'b'), ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert list_pages(str(path), '.wiki') == ['b/Page', 'index']
+    os.utime(str(path / 'b'), ns=(0, 0))
+    assert list_pages(str(path), '.wiki') == ['b/New', 'b/Page', 'index']
+
+    (path / 'b' / 'New.wiki').unlink()
+    os.rename(str(path / 'index.wiki'), str(path / 'b' / 'index.wiki'))
+    assert list_pages(str(path), '.wiki') == ['b/Page', 'b/index']
+    (path / 'b' / 'Page.wiki').unlink()
+    (path / 'b' / 'index.wiki').unlink()
+    (path / 'b').rmdir()
+    assert list_pages(str(path), '.wiki') == []
+
+
+def test_cached_pages(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('')
+    assert cached_pages(str(path), '.wiki') == (None, True)
+
+    list_pages(str(path), '.wiki')
+    assert cached_pages(str(path), '.wiki') == (['index'], False)
+    assert cached_pages(str(path), '.md') == (None, True)
+
+    # Stale pages are returned until the list is rebuilt:
+    (path / 'Page.wiki').write_text('')
+    os.utime(str(path), ns=(0, 0))
+    assert cached_pages(str(path), '.wiki') == (['index'], True)
+
+
+def test_refresh_pages(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('')
+
+    processes = []
+    popen = subprocess.Popen
+    with mock.patch('subprocess.Popen', side_effect=lambda *args, **kwargs:
+                    processes.append(popen(*args, **kwargs))) as mock_popen:
+        refresh_pages(str(path), '.wiki')
+
+    assert mock_popen.call_args.kwargs['start_new_session']
+    assert processes[0].wait() == 0
+    assert cached_pages(str(path), '.wiki') == (['index'], False)
+
+
+@pytest.mark.parametrize('incomplete,expected', [
+    ('', ['Diary', 'b/Page', 'b/index', 'index']),
+    ('b/', ['b/Page', 'b/index']),
+    ('ind', ['index']),
+    ('bpg', ['b/Page']),
+    ('BPG', ['b/Page']),
+    ('dx', ['b/index', 'index']),
+    ('[.*', []),
+    ('missing', [])
+])
+def test_match_pages(incomplete, expected):
+    assert match_pages(['Diary', 'b/Page', 'b/index', 'index'], incomplete) == expected
+
+
+@pytest.mark.parametrize('page,expected', [
+    ('diary/2024-01-01', True),
+    ('diary/diary', True),
+    ('diary', False),
+    ('dir/diary/2024-01-01', False)
+])
+def test_is_diary_page(page, expected):
+    assert is_diary_page(page) == expected
+
+
+@pytest.mark.parametrize('page,expected', [
+    ('journal/2024-01-01', True),
+    ('diary/2024-01-01', False)
+])
+def test_is_diary_page_with_diary_rel_path(page, expected):
+    assert is_diary_page(page, 'journal') == expected
+
+
+def test_map_pages():
+    assert map_pages(abs, [-1, 2]) == [1, 2]
+
+
+def test_select_pages(tmp_path):
+    (tmp_path / 'Page.wiki').write_text('')
+
+    filenames = [str(tmp_path / 'Page.wiki'), str(tmp_path / 'Missing.wiki'),
+                 str(tmp_path / 'README.md'), os.path.join(os.sep, 'Outside.wiki')]
+    assert select_pages(str(tmp_path), '.wiki', filenames) == \
+        ({'Page': str(tmp_path / 'Page.wiki')}, {'Missing'})
+
+
+def test_diff_pages(tmp_path):
+    for name in ['a', 'b', 'c', 'd']:
+        (tmp_path / name).write_text(name)
+    pages = {name: str(tmp_path / name) for name in ['a', 'b', 'c', 'd']}
+
+    changed, _ = diff_pages(pages, {})
+    assert sorted(changed) == ['a', 'b', 'c', 'd']
+
+    known = dict(changed)
+    known['b'] = ([0, 0], changed['b'][1])
+    known['c'] = ([0, 0], 'OLD')
+    del known['d']
+
+    changed, touched = diff_pages(pages, known)
+    assert sorted(changed) == ['c', 'd']
+    assert sorted(touched) == ['b']
+
+
+def test_snapshot(tmp_path):
+    (tmp_path / '.hidden').mkdir()
+    (tmp_path / '.hidden' / 'Page.wiki').write_text('')
+    for name in ['Page.wiki', '.vimwiki_tags', 'Old.wiki', 'Same.wiki']:
+        (tmp_path / name).write_text(name)
+
+    before = snapshot(str(tmp_path), str(tmp_path / 'missing'))
+    assert sorted(before) == [str(tmp_path / name)
+                              for name in ['.vimwiki_tags', 'Old.wiki', 'Page.wiki', 'Same.wiki']]
+
+    (tmp_path / 'Page.wiki').write_text('Modified')
+    (tmp_path / 'Old.wiki').unlink()
+    (tmp_path / 'New.wiki').write_text('')
+
+    assert changed_files(before, snapshot(str(tmp_path))) == \
+        [str(tmp_path / name) for name in ['New.wiki', 'Old.wiki', 'Page.wiki']]
@@ -0,0 +1,118 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from vimwiki_cli import parallel
+from vimwiki_cli.parallel import *
+
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+
+def test_run_each(capsys):
+    statuses = run_each([
+        ('1', python('print("out"); print("err", file=__import__("sys").stderr)')),
+        ('2', python('raise SystemExit(3)')),
+        ('3', python('print("a\\nb", end="")'))
+    ], jobs=2)
+    assert statuses == [0, 3, 0]
+
+    out, err = capsys.readouterr()
+    assert sorted(out.splitlines()) == ['[1] out', '[3] a', '[3] b']
+    assert err.splitlines() == ['[1] err']
+
+
+def test_run_each_with_env(capsys):
+    statuses = run_each([('1', python('import os; print(os.environ["VAR"])'))],
+                        env={'VAR': 'VALUE'})
+    assert statuses == [0]
+
+    out, _ = capsys.readouterr()
+    assert out == '[1] VALUE\n'
+
+
+def test_run_each_without_commands():
+    assert run_each([]) == []
+
+
+def test_execute():
+    stdout, stderr = [], []
+    code = 'import sys; print("a\\r\\nb"); print("c", file=sys.stderr, end=""); sys.exit(2)'
+    assert run(execute(python(code), stdout=stdout.append, stderr=stderr.append)) == 2
+    assert stdout == ['a', 'b']
+    assert stderr == ['c']
+
+
+def test_execute_with_long_lines(monkeypatch):
+    monkeypatch.setattr(parallel, '_CHUNK_SIZE', 4)
+
+    stdout = []
+    assert run(execute(python('print("x" * 10)'), stdout=stdout.append)) == 0
+    assert ''.join(stdout) == 'x' * 10
+    assert all(len(line) <= 8 for line in stdout)
+
+
+def test_execute_with_timeout():
+    # The child writes the pid of a grandchild which must also be killed:
+    pids = []
+    code = ('import subprocess, sys, time; '
+            'p = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]); '
+            'print(p.pid, flush=True); time.sleep(60)')
+
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        run(execute(python(code), timeout=1, stdout=lambda line: pids.append(int(line))))
+    assert time.monotonic() - start < 30
+
+    (pid,) = pids
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            with open('/proc/%d/stat' % pid) as f:
+                if f.read().split(') ')[1].startswith('Z'):
+                    break
+        except FileNotFoundError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail('process %d was not killed' % pid)
+
+
+def test_gather():
+    running = []
+
+    async def job(value):
+        running.append(value)
+        assert len(running) <= 2
+        await asyncio.sleep(0.01)
+        running.remove(value)
+        return value
+
+    assert run(gather([job(value) for value in range(5)], jobs=2)) == list(range(5))
@@ -0,0 +1,177 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+
+import pytest
+
+from vimwiki_cli.search import *
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('Hello World\n\nhello again\n')
+    (path / 'Page.wiki').write_text('= Header =\nworld, hello!\n')
+
+    with SearchIndex(str(path), '.wiki') as index:
+        yield index
+
+
+def test_terms():
+    assert terms('Hello, hello world_1!') == {'hello', 'world_1'}
+
+
+def test_search(index):
+    assert index.update() == 2
+    assert index.update() == 0
+
+    assert list(index.search('HELLO world')) == [
+        Match('Page', 2, 'world, hello!'),
+        Match('index', 1, 'Hello World')
+    ]
+    assert list(index.search('missing')) == []
+    assert list(index.search('!!')) == []
+
+
+def test_search_after_update(index):
+    index.update()
+
+    path = index._path
+    with open(os.path.join(path, 'index.wiki'), 'w') as f:
+        f.write('goodbye world\n')
+    os.unlink(os.path.join(path, 'Page.wiki'))
+
+    assert index.update() == 1
+    assert list(index.search('world')) == [Match('index', 1, 'goodbye world')]
+    assert list(index.search('hello')) == []
+
+
+def test_is_current(index):
+    assert not index.is_current()
+    index.update()
+    assert index.is_current()
+
+    # Pages added to or removed from the wiki are detected:
+    path = index._path
+    os.utime(path, ns=(0, 0))
+    assert not index.is_current()
+    index.update()
+    assert index.is_current()
+
+    # As are pages modified in place:
+    with open(os.path.join(path, 'Page.wiki'), 'a') as f:
+        f.write('more\n')
+    os.utime(path, ns=(0, 0))
+    assert not index.is_current()
+    assert index.update() == 1
+    assert index.is_current()
+
+
+def test_search_with_version(tmp_path):
+    with SearchIndex(str(tmp_path), '.wiki') as index:
+        index._db.execute('PRAGMA user_version = 0')
+
+    with SearchIndex(str(tmp_path), '.wiki') as index:
+        assert list(index.search('hello')) == []
+
+
+@pytest.mark.parametrize('pattern,expected', [
+    ('ab', None),
+    ('Abcd', ('and', ['abc', 'bcd'])),
+    ('^abc$', 'abc'),
+    ('abc.*def', ('and', ['abc', 'def'])),
+    ('abc|def', ('or', ['abc', 'def'])),
+    ('abc|d', None),
+    ('(abc)+x?(?:def)*', 'abc'),
+    (r'\w+abc\d', 'abc')
+])
+def test_trigram_query(pattern, expected):
+    assert trigram_query(pattern) == expected
+
+
+@pytest.mark.parametrize('pattern,expected', [
+    ('hel+o', ['Page', 'index']),
+    ('again|nothing', []),
+    ('again|ag', ['index']),
+    ('W.rld', ['index'])
+])
+def test_candidates(index, pattern, expected):
+    index.update()
+
+    # Candidates may include pages which do not match, but never exclude
+    # pages which do:
+    candidates = index.candidates(pattern)
+    assert set(expected) <= set(candidates)
+    assert set(candidates) <= set(['Page', 'index'])
+
+
+def test_candidates_with_trigrams(index):
+    index.update()
+
+    assert index.candidates('(Hello|again)') == ['Page', 'index']
+    assert index.candidates('again') == ['index']
+    assert index.candidates('header.*hello') == ['Page']
+    assert index.candidates('missing') == []
+
+
+def test_search_regex(index):
+    index.update()
+
+    assert list(index.search_regex(r'^[Hh]ello\b')) == [
+        Match('index', 1, 'Hello World'),
+        Match('index', 3, 'hello again')
+    ]
+    assert list(index.search_regex(r'^$')) == [Match('index', 2, '')]
+
+
+@pytest.mark.parametrize('pattern,regex,expected', [
+    ('HELLO world', False, [('Page', 2), ('index', 1)]),
+    ('missing', False, []),
+    (r'^[Hh]ello\b', True, [('index', 1), ('index', 3)]),
+    (r'^$', True, [('empty', 1), ('index', 2)]),
+    ('(café|Header)', True, [('Page', 1), ('empty', 2)])
+])
+def test_grep(tmp_path, pattern, regex, expected):
+    (tmp_path / 'index.wiki').write_text('Hello World\n\nhello again\n')
+    (tmp_path / 'Page.wiki').write_text('= Header =\nworld, hello!\n')
+    (tmp_path / 'empty.wiki').write_text('\ncafé\n')
+    (tmp_path / 'blank.wiki').write_text('')
+
+    matches = grep(str(tmp_path), '.wiki', pattern, regex=regex, jobs=1)
+    assert [(match.page, match.lineno) for match in matches] == expected
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_grep_with_max_count(tmp_path, monkeypatch, jobs):
+    monkeypatch.setattr('vimwiki_cli.search.GREP_CHUNK_SIZE', 2)
+    for i in range(10):
+        (tmp_path / ('Page%d.wiki' % i)).write_text('hello\nhello\n')
+
+    matches = list(grep(str(tmp_path), '.wiki', 'hello', jobs=jobs))
+    assert [match.page for match in matches] == ['Page%d' % (i // 2) for i in range(20)]
+
+    matches = list(grep(str(tmp_path), '.wiki', 'hello', max_count=3, jobs=jobs))
+    assert matches == [Match('Page0', 1, 'hello'), Match('Page0', 2, 'hello'),
+                       Match('Page1', 1, 'hello')]
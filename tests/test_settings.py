@@ -0,0 +1,151 @@
+# Copyright (C) 2021 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import json
+import os
+import subprocess
+
+import mock
+import pytest
+
+from vimwiki_cli.settings import *
+
+
+@pytest.fixture
+def home(monkeypatch, tmp_path):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.delenv('MYVIMRC', raising=False)
+    monkeypatch.delenv('XDG_CONFIG_HOME', raising=False)
+    return tmp_path
+
+
+def make_run(wikis, returncode=0):
+    def run(args, **kwargs):
+        assert args[:2] == ['EDITOR', '-S']
+        with open(args[2]) as f:
+            script = f.read()
+
+        if wikis is not None:
+            output = script.split("writefile([json_encode(s:wikis)], '")[1].split("')")[0]
+            with open(output, 'w') as f:
+                json.dump(wikis, f)
+
+        return mock.Mock(returncode=returncode)
+
+    return run
+
+
+@pytest.mark.parametrize('editor,env,expected', [
+    ('vim', {}, ['.vimrc', '.vim/vimrc']),
+    ('vim', {'MYVIMRC': '/VIMRC'}, ['/VIMRC', '.vimrc', '.vim/vimrc']),
+    ('/usr/bin/nvim', {}, ['.config/nvim/init.vim', '.config/nvim/init.lua']),
+    ('nvim', {'XDG_CONFIG_HOME': '/CONFIG'}, ['/CONFIG/nvim/init.vim', '/CONFIG/nvim/init.lua'])
+])
+def test_vimrc_files(monkeypatch, home, editor, env, expected):
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+
+    assert vimrc_files(editor) == [os.path.join(str(home), filename) for filename in expected]
+
+
+@mock.patch('subprocess.run')
+@pytest.mark.parametrize('wikis,expected', [
+    ([], [DEFAULT_WIKI]),
+    ([{'path': '~/notes/', 'ext': '.md', 'syntax': 'markdown', 'auto_tags': 1},
+      {'path_html': '', 'diary_rel_path': 'journal/'}],
+     [dict(DEFAULT_WIKI, path='~/notes', ext='.md', syntax='markdown'),
+      dict(DEFAULT_WIKI, diary_rel_path='journal')]),
+    ([{'user_htmls': '404.html,search.html'}],
+     [dict(DEFAULT_WIKI, user_htmls='404.html,search.html')]),
+    ([{'list_markers': ['*', '-', 1]}, {'list_markers': []}],
+     [dict(DEFAULT_WIKI, list_markers=['*', '-']), DEFAULT_WIKI])
+])
+def test_query_wikis(mock_run, wikis, expected):
+    mock_run.side_effect = make_run(wikis)
+
+    assert query_wikis('EDITOR') == expected
+
+
+@mock.patch('subprocess.run')
+def test_query_wikis_with_returncode(mock_run):
+    mock_run.side_effect = make_run(None, returncode=1)
+
+    with pytest.raises(ConfigError, match='editor exited with status 1'):
+        query_wikis('EDITOR')
+
+
+@mock.patch('subprocess.run', side_effect=subprocess.TimeoutExpired('EDITOR', 1.0))
+def test_query_wikis_with_timeout(mock_run):
+    with pytest.raises(ConfigError, match='timed out'):
+        query_wikis('EDITOR')
+
+
+@mock.patch('vimwiki_cli.settings.query_wikis', return_value=['WIKI'])
+def test_load_wikis(mock_query_wikis, home):
+    vimrc = home / '.vimrc'
+    vimrc.write_text('let g:vimwiki_list = []\n')
+
+    assert load_wikis('EDITOR') == ['WIKI']
+    assert mock_query_wikis.call_count == 1
+
+    # Settings are cached until the contents of a vimrc change:
+    os.utime(str(vimrc), ns=(0, 0))
+    assert load_wikis('EDITOR') == ['WIKI']
+    assert mock_query_wikis.call_count == 1
+
+    vimrc.write_text('let g:vimwiki_list = [{}]\n')
+    assert load_wikis('EDITOR') == ['WIKI']
+    assert mock_query_wikis.call_count == 2
+
+    (home / '.vim').mkdir()
+    (home / '.vim' / 'vimrc').write_text('')
+    assert load_wikis('EDITOR') == ['WIKI']
+    assert mock_query_wikis.call_count == 3
+
+    assert load_wikis('OTHER') == ['WIKI']
+    assert mock_query_wikis.call_count == 4
+
+    assert load_wikis('OTHER', refresh=True) == ['WIKI']
+    assert mock_query_wikis.call_count == 5
+
+    assert load_wikis('OTHER') == ['WIKI']
+    assert mock_query_wikis.call_count == 5
+
+
+@mock.patch('vimwiki_cli.settings.query_wikis', return_value=['WIKI'])
+def test_settings_cached(mock_query_wikis, home):
+    assert not settings_cached('EDITOR')
+
+    load_wikis('EDITOR')
+    assert settings_cached('EDITOR')
+    assert not settings_cached('OTHER')
+
+
+@pytest.mark.parametrize('count,expected', [(0, 'WIKI1'), (1, 'WIKI1'), (2, 'WIKI2')])
+def test_select_wiki(count, expected):
+    assert select_wiki(['WIKI1', 'WIKI2'], count) == expected
+
+
+def test_select_wiki_with_invalid_count():
+    with pytest.raises(ConfigError, match='wiki 3 is not configured; 2 wikis found'):
+        select_wiki(['WIKI1', 'WIKI2'], 3)
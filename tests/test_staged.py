@@ -0,0 +1,142 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import subprocess
+
+import pytest
+
+from vimwiki_cli.git import ls_files
+from vimwiki_cli.staged import *
+
+
+@pytest.fixture
+def staged(repo):
+    for name, content in (('index.wiki', '= Index =\n'),
+                          ('page.wiki', 'Page :tag:\n'),
+                          ('dir/other.wiki', 'Other\n'),
+                          ('diary/2026-10-01.wiki', '= First =\n'),
+                          ('diary/2026-10-02.wiki', 'No caption\n'),
+                          ('.hidden/page.wiki', ''),
+                          ('notes.txt', '')):
+        (repo / name).parent.mkdir(exist_ok=True)
+        (repo / name).write_text(content)
+
+    subprocess.run(['git', 'add', '.'], check=True)
+    with StagedWiki(str(repo), '.wiki', str(repo)) as staged:
+        yield staged
+
+
+def test_pages(staged):
+    assert staged.pages() == ['diary/2026-10-01', 'diary/2026-10-02', 'dir/other', 'index',
+                              'page']
+
+
+def test_read_lines(staged, repo):
+    (repo / 'page.wiki').write_text('Unstaged\n')
+
+    assert staged.read_lines(str(repo / 'page.wiki')) == ['Page :tag:']
+    assert staged.read_lines(str(repo / 'missing.wiki')) is None
+
+
+def test_write_lines(staged, repo):
+    filename = str(repo / 'page.wiki')
+    assert not staged.write_lines(filename, ['Page :tag:'])
+    assert staged.write_lines(filename, ['Written'])
+    assert staged.read_lines(filename) == ['Written']
+
+    assert staged.write_lines(str(repo / 'new.wiki'), ['New'])
+    assert 'new' in staged.pages()
+
+
+def test_commit(staged, repo):
+    (repo / 'index.wiki').write_text('Unstaged\n')
+    staged.write_lines(str(repo / 'index.wiki'), ['Index'])
+    staged.write_lines(str(repo / 'page.wiki'), ['Page'])
+    staged.write_lines(str(repo / 'new' / 'page.wiki'), ['New'])
+
+    assert staged.commit() == [str(repo / 'index.wiki'), str(repo / 'new' / 'page.wiki'),
+                               str(repo / 'page.wiki')]
+
+    entries = ls_files(str(repo))
+    for name, content in (('index.wiki', b'Index\n'), ('page.wiki', b'Page\n'),
+                          ('new/page.wiki', b'New\n')):
+        assert staged._cat_file.read(entries[name][1]) == content
+
+    # Unstaged changes are preserved:
+    assert (repo / 'index.wiki').read_text() == 'Unstaged\n'
+    assert (repo / 'page.wiki').read_text() == 'Page\n'
+    assert (repo / 'new' / 'page.wiki').read_text() == 'New\n'
+
+
+def test_generate_links(staged, repo):
+    assert generate_links(staged, 'default', 'index')
+    assert staged.read_lines(str(repo / 'index.wiki')) == [
+        '= Index =',
+        '',
+        '= Generated Links =',
+        '- [[dir/other]]',
+        '- [[index]]',
+        '- [[page]]'
+    ]
+
+    assert not generate_links(staged, 'default', 'index')
+
+
+def test_generate_links_with_diary_rel_path(staged, repo):
+    assert generate_links(staged, 'default', 'index', '', 'dir')
+    assert staged.read_lines(str(repo / 'index.wiki'))[3:] == [
+        '- [[diary/2026-10-01]]',
+        '- [[diary/2026-10-02]]',
+        '- [[index]]',
+        '- [[page]]'
+    ]
+
+
+def test_diary_generate_links(staged, repo):
+    assert diary_generate_links(staged, 'default')
+    assert staged.read_lines(str(repo / 'diary' / 'diary.wiki')) == [
+        '= Diary =',
+        '== 2026 ==',
+        '',
+        '=== October ===',
+        '- [[2026-10-02]]',
+        '- [[2026-10-01|First]]'
+    ]
+
+
+def test_diary_generate_links_with_diary_rel_path(staged, repo):
+    assert diary_generate_links(staged, 'default', 'dir')
+    assert staged.read_lines(str(repo / 'dir' / 'diary.wiki')) == ['= Diary =']
+    assert staged.read_lines(str(repo / 'diary' / 'diary.wiki')) is None
+
+
+def test_rebuild_tags(staged, repo):
+    filename = str(repo / '.vimwiki_tags')
+    assert rebuild_tags(staged, 'default', ['page'])
+    assert staged.read_lines(filename)[-1] == 'tag\tpage.wiki\t1;"\tvimwiki:page\\tpage'
+
+    staged.write_lines(str(repo / 'dir' / 'other.wiki'), ['Other :new:'])
+    assert rebuild_tags(staged, 'default', ['dir/other', 'missing'])
+    assert [line.split('\t')[0] for line in staged.read_lines(filename)[-2:]] == ['new', 'tag']
+
+    assert not rebuild_tags(staged, 'default', ['page'])
@@ -0,0 +1,174 @@
+# Copyright (C) 2021 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import json
+import os
+
+import mock
+import pytest
+
+from vimwiki_cli import trace
+
+STARTUPTIME = """
+
+times in msec
+ clock   self+sourced   self:  sourced script
+ clock   elapsed:              other lines
+
+000.005  000.005: --- VIM STARTING ---
+000.105  000.100: Allocated generic buffers
+001.200  000.800  000.600: sourcing /usr/share/vim/vim90/defaults.vim
+003.000  001.800: VIMINIT
+"""
+
+
+@pytest.fixture
+def startuptime(tmp_path):
+    filename = tmp_path / 'startuptime.log'
+    filename.write_text(STARTUPTIME)
+    return str(filename)
+
+
+def test_span():
+    with trace.span('outer', key='value'):
+        with trace.span('inner'):
+            pass
+
+    (inner, outer) = trace._spans
+    assert (inner.name, inner.depth, inner.args) == ('inner', 1, {})
+    assert (outer.name, outer.depth, outer.args) == ('outer', 0, {'key': 'value'})
+    assert outer.start <= inner.start and outer.duration >= inner.duration
+
+
+def test_span_with_error():
+    with pytest.raises(ValueError):
+        with trace.span('span'):
+            raise ValueError
+
+    assert [span.name for span in trace._spans] == ['span']
+    assert trace._depth == 0
+
+
+def test_span_without_tracing():
+    for _ in range(trace.MAX_PENDING_SPANS + 1):
+        with trace.span('pending'):
+            pass
+
+    assert len(trace._spans) == trace.MAX_PENDING_SPANS
+
+    trace.enable(timings=True)
+    with trace.span('enabled'):
+        pass
+
+    assert trace._spans[-1].name == 'enabled'
+
+
+def test_read_startuptime(startuptime):
+    start = trace._origin + 1
+    trace.read_startuptime(startuptime, start)
+
+    spans = [(span.name, span.category, round(span.start, 6), round(span.duration, 6))
+             for span in trace._spans]
+    assert spans == [
+        ('--- VIM STARTING ---', trace.EDITOR, 1.0, 0.000005),
+        ('Allocated generic buffers', trace.EDITOR, 1.000005, 0.0001),
+        ('sourcing /usr/share/vim/vim90/defaults.vim', trace.EDITOR, 1.0004, 0.0008),
+        ('VIMINIT', trace.EDITOR, 1.0012, 0.0018)
+    ]
+
+
+def test_read_startuptime_without_file(tmp_path):
+    trace.read_startuptime(str(tmp_path / 'startuptime.log'), trace._origin)
+    assert trace._spans == []
+
+
+def test_startuptime():
+    with trace.startuptime() as filename:
+        assert filename is None
+
+    trace.enable(timings=True)
+    with trace.startuptime() as filename:
+        with open(filename, 'w') as f:
+            f.write(STARTUPTIME)
+
+    assert not os.path.exists(filename)
+    assert len(trace._spans) == 4
+
+
+@mock.patch('atexit.register')
+def test_enable(mock_register):
+    trace.enable()
+    assert not trace.enabled()
+
+    trace.enable(timings=True)
+    trace.enable(trace='FILE')
+    assert trace.enabled()
+    assert trace._timings and trace._trace == 'FILE'
+
+    mock_register.assert_called_once_with(trace.finish)
+
+
+def test_summary(startuptime):
+    trace.add_span('outer', trace._origin, 0.002)
+    trace.add_span('inner', trace._origin + 0.001, 0.001, depth=1)
+    trace.read_startuptime(startuptime, trace._origin)
+
+    assert trace.summary() == [
+        'Span                                          Start (ms)   Time (ms)',
+        'outer                                                0.0         2.0',
+        '  inner                                              1.0         1.0',
+        'Slowest editor events:',
+        '  VIMINIT                                            1.2         1.8',
+        '  sourcing /usr/share/vim/vim90/defaults.vim         0.4         0.8',
+        '  Allocated generic buffers                          0.0         0.1',
+        '  --- VIM STARTING ---                               0.0         0.0'
+    ]
+
+
+def test_trace_events():
+    trace.add_span('span', trace._origin + 0.001, 0.002, key='value')
+    trace.add_span('event', trace._origin, 0.001, trace.EDITOR)
+
+    (cli, editor, span, event) = trace.trace_events()['traceEvents']
+    assert (cli['ph'], cli['tid'], cli['args']) == ('M', 0, {'name': trace.CLI})
+    assert (editor['ph'], editor['tid'], editor['args']) == ('M', 1, {'name': trace.EDITOR})
+    assert span == {'name': 'span', 'cat': trace.CLI, 'ph': 'X', 'ts': 1000.0, 'dur': 2000.0,
+                    'pid': os.getpid(), 'tid': 0, 'args': {'key': 'value'}}
+    assert (event['tid'], event['ts'], event['dur']) == (1, 0.0, 1000.0)
+
+
+@mock.patch('atexit.register')
+def test_finish(_, tmp_path, capsys):
+    filename = tmp_path / 'trace.json'
+    trace.add_span('span', trace._origin, 0.001)
+
+    trace.finish()
+    assert not filename.exists()
+
+    trace.enable(timings=True, trace=str(filename))
+    trace.finish()
+    trace.finish()
+
+    (_, err) = capsys.readouterr()
+    assert err.splitlines() == trace.summary()
+    assert json.loads(filename.read_text()) == trace.trace_events()
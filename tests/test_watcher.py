@@ -0,0 +1,106 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+
+import mock
+import pytest
+
+from vimwiki_cli.watcher import *
+
+
+@pytest.fixture
+def wiki_path(tmp_path):
+    path = tmp_path / 'wiki'
+    (path / 'dir').mkdir(parents=True)
+    (path / 'index.wiki').write_text('')
+    return path
+
+
+@pytest.fixture(params=['inotify', 'polling'])
+def watcher(request, wiki_path):
+    if request.param == 'inotify':
+        watcher = InotifyWatcher(str(wiki_path), '.wiki')
+    else:
+        watcher = PollingWatcher(str(wiki_path), '.wiki', interval=0.01)
+
+    with watcher:
+        yield watcher
+
+
+def test_read(watcher, wiki_path):
+    (wiki_path / 'index.wiki').write_text('= Index =\n')
+    (wiki_path / 'dir' / 'Page.wiki').write_text('')
+    (wiki_path / 'README.md').write_text('')
+    (wiki_path / '.index.wiki.swp').write_text('')
+
+    assert collect(watcher, 0.1) == {str(wiki_path / 'index.wiki'),
+                                     str(wiki_path / 'dir' / 'Page.wiki')}
+
+    (wiki_path / 'index.wiki').unlink()
+    assert watcher.read(1) == {str(wiki_path / 'index.wiki')}
+
+
+def test_read_with_timeout(watcher):
+    assert watcher.read(0.05) == set()
+
+
+def test_read_with_new_directory(watcher, wiki_path):
+    (wiki_path / 'new').mkdir()
+    (wiki_path / 'new' / 'Page.wiki').write_text('')
+
+    assert collect(watcher, 0.1) == {str(wiki_path / 'new' / 'Page.wiki')}
+
+    (wiki_path / 'new' / 'Other.wiki').write_text('')
+    assert watcher.read(1) == {str(wiki_path / 'new' / 'Other.wiki')}
+
+
+def test_inotify_with_moved_directory(wiki_path):
+    with InotifyWatcher(str(wiki_path), '.wiki') as watcher:
+        (wiki_path / 'dir').rename(wiki_path / 'renamed')
+        assert watcher.read(1) is None
+
+        # Directories are watched again by their new names:
+        (wiki_path / 'renamed' / 'Page.wiki').write_text('')
+        assert watcher.read(1) == {str(wiki_path / 'renamed' / 'Page.wiki')}
+
+
+@mock.patch('ctypes.CDLL', side_effect=OSError)
+def test_open_watcher(mock_cdll, wiki_path, caplog):
+    with open_watcher(str(wiki_path), '.wiki', interval=1) as watcher:
+        assert isinstance(watcher, PollingWatcher)
+    assert 'inotify is not available' in caplog.text
+
+
+def test_open_watcher_with_poll(wiki_path):
+    with open_watcher(str(wiki_path), '.wiki', poll=True) as watcher:
+        assert isinstance(watcher, PollingWatcher)
+
+
+def test_collect():
+    watcher = mock.Mock()
+    watcher.read.side_effect = [{'A'}, {'B'}, set()]
+    assert collect(watcher, 0.1) == {'A', 'B'}
+    assert watcher.read.call_args_list == [mock.call(), mock.call(0.1), mock.call(0.1)]
+
+    watcher.read.side_effect = [{'A'}, None, {'B'}, set()]
+    assert collect(watcher, 0.1) is None
@@ -21,9 +21,15 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import logging
+import os
+import sys
+
 import mock
 import pytest
 
+from vimwiki_cli.editor import InteractiveError
+from vimwiki_cli.settings import ConfigError
 from vimwiki_cli.wiki import *
 
 
@@ -84,6 +90,60 @@ def test_search(mock_cmd, wiki):
                                 open_matches=True)
 
 
+@mock.patch('vimwiki_cli.search.SearchIndex')
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+@pytest.mark.parametrize('wiki_options', [{'path': os.curdir, 'ext': '.md'}])
+@pytest.mark.parametrize('current', [False, True])
+def test_search_without_open(mock_cmd, mock_index, wiki, current):
+    index = mock_index.return_value.__enter__.return_value
+    index.is_current.return_value = current
+    index.search.return_value = iter(['MATCH'])
+
+    assert list(wiki.search('PATTERN', open=False)) == ['MATCH']
+
+    # The index is only updated if a page has been added or removed:
+    mock_index.assert_called_with(os.curdir, '.md')
+    assert index.update.call_count == (0 if current else 1)
+    mock_cmd.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.search.SearchIndex')
+@pytest.mark.parametrize('wiki_options', [{'path': 'MISSING'}])
+def test_search_with_missing_path(mock_index, wiki):
+    with pytest.raises(ConfigError, match='wiki MISSING does not exist'):
+        list(wiki.search('PATTERN', open=False))
+
+    mock_index.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.search.SearchIndex')
+@pytest.mark.parametrize('wiki_options', [{'path': os.curdir}])
+def test_search_with_regex(mock_index, wiki):
+    index = mock_index.return_value.__enter__.return_value
+    index.search_regex.return_value = iter(['MATCH'])
+
+    assert list(wiki.search('PATTERN', open=False, regex=True)) == ['MATCH']
+
+
+@mock.patch('vimwiki_cli.search.SearchIndex')
+@pytest.mark.parametrize('wiki_options', [{'path': os.curdir}])
+def test_search_with_max_count(mock_index, wiki):
+    index = mock_index.return_value.__enter__.return_value
+    index.search.return_value = iter(['MATCH1', 'MATCH2'])
+
+    assert list(wiki.search('PATTERN', open=False, max_count=1)) == ['MATCH1']
+
+
+@mock.patch('vimwiki_cli.search.grep', return_value=iter(['MATCH']))
+@mock.patch('vimwiki_cli.search.SearchIndex')
+@pytest.mark.parametrize('wiki_options', [{'path': os.curdir, 'ext': '.md'}])
+def test_search_without_index(mock_index, mock_grep, wiki):
+    assert list(wiki.search('PATTERN', open=False, index=False, max_count=2)) == ['MATCH']
+
+    mock_grep.assert_called_with(os.curdir, '.md', 'PATTERN', regex=False, max_count=2)
+    mock_index.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
 @pytest.mark.parametrize('args,expected', [
     (('PAGE',), ('VimwikiGoto PAGE', 'VimwikiGenerateLinks ')),
@@ -96,6 +156,18 @@ def test_generate_links(mock_cmd, wiki, args, expected):
                                 interactive=False, write_quit=True)
 
 
+@mock.patch('vimwiki_cli.listing.generate_links')
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown',
+                                           'diary_rel_path': 'journal'}])
+def test_generate_links_with_native(mock_cmd, mock_generate_links, wiki):
+    wiki.generate_links('/dir/PAGE.md', 'PATTERN', engine='native')
+
+    mock_generate_links.assert_called_with('PATH', '.md', 'markdown', 'dir/PAGE', 'PATTERN',
+                                           'journal', None)
+    mock_cmd.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.wiki.DiaryCommand')
 def test_diary_generate_links(mock_cmd, wiki):
     wiki.diary_generate_links()
@@ -104,6 +176,17 @@ def test_diary_generate_links(mock_cmd, wiki):
                                 interactive=False, write_quit=True)
 
 
+@mock.patch('vimwiki_cli.listing.diary_generate_links')
+@mock.patch('vimwiki_cli.wiki.DiaryCommand')
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown',
+                                           'diary_rel_path': 'journal'}])
+def test_diary_generate_links_with_native(mock_cmd, mock_diary_generate_links, wiki):
+    wiki.diary_generate_links(engine='native')
+
+    mock_diary_generate_links.assert_called_with('PATH', '.md', 'markdown', 'journal', None)
+    mock_cmd.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
 @pytest.mark.parametrize('args,expected', [
     (False, 'silent! VimwikiAll2HTML'),
@@ -116,6 +199,222 @@ def test_all_html(mock_cmd, wiki, args, expected):
                                 interactive=False, quit=True)
 
 
+@mock.patch('vimwiki_cli.html.all_html')
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+@pytest.mark.parametrize('wiki_options,expected', [
+    ({'path': 'PATH', 'ext': '.md'},
+     ('PATH', '.md', 'PATH_html', os.path.join('PATH', 'templates'), 'diary')),
+    ({'path': 'PATH', 'path_html': 'HTML', 'template_path': 'TEMPLATES',
+      'diary_rel_path': 'journal'},
+     ('PATH', '.wiki', 'HTML', 'TEMPLATES', 'journal'))
+])
+def test_all_html_with_native(mock_cmd, mock_all_html, wiki, expected):
+    wiki.all_html(True, engine='native', only=('FILE',))
+
+    *args, diary_rel_path = expected
+    mock_all_html.assert_called_with(*args, all=True, only=('FILE',),
+                                     diary_rel_path=diary_rel_path, user_htmls=[])
+    mock_cmd.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis')
+@pytest.mark.parametrize('wiki_options,expected', [
+    ({}, ('~/vimwiki', '.wiki', 'default', 'diary')),
+    ({'count': 2}, ('PATH', '.md', 'markdown', 'journal')),
+    ({'count': 2, 'path': 'OTHER'}, ('OTHER', '.md', 'markdown', 'journal'))
+])
+def test_settings(mock_load_wikis, wiki, expected):
+    mock_load_wikis.return_value = [DEFAULT_WIKI, dict(DEFAULT_WIKI, path='PATH', ext='.md',
+                                                       syntax='markdown',
+                                                       diary_rel_path='journal')]
+
+    assert (wiki.path, wiki.ext, wiki.syntax, wiki.diary_rel_path) == \
+        (os.path.expanduser(expected[0]),) + expected[1:]
+    assert wiki.path_html == os.path.expanduser(expected[0]) + '_html'
+    assert mock_load_wikis.call_count == (1 if wiki.count else 0)
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis')
+@mock.patch('vimwiki_cli.wiki.settings_cached')
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR'}])
+@pytest.mark.parametrize('cached,expected', [
+    (False, '~/vimwiki'),
+    (True, 'PATH')
+])
+def test_settings_without_count(mock_settings_cached, mock_load_wikis, wiki, cached, expected):
+    mock_settings_cached.return_value = cached
+    mock_load_wikis.return_value = [dict(DEFAULT_WIKI, path='PATH'), DEFAULT_WIKI]
+
+    # Like Vimwiki, the first wiki is used once settings are cached:
+    assert wiki.path == os.path.expanduser(expected)
+    mock_settings_cached.assert_called_with('EDITOR')
+    assert mock_load_wikis.call_count == (1 if cached else 0)
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis', return_value=[DEFAULT_WIKI])
+@pytest.mark.parametrize('wiki_options', [{'editor': 'EDITOR', 'count': 2}])
+def test_settings_with_invalid_count(mock_load_wikis, wiki):
+    with pytest.raises(ConfigError):
+        wiki.path
+
+    mock_load_wikis.assert_called_with('EDITOR')
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis')
+@pytest.mark.parametrize('wiki_options,user_htmls,expected', [
+    ({}, None, []),
+    ({'count': 1}, None, []),
+    ({'count': 1}, '404.html, search.html,', ['404.html', 'search.html'])
+])
+def test_user_htmls(mock_load_wikis, wiki, user_htmls, expected):
+    mock_load_wikis.return_value = [dict(DEFAULT_WIKI, user_htmls=user_htmls)]
+
+    assert wiki.user_htmls == expected
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis')
+@pytest.mark.parametrize('wiki_options', [{'count': 1}])
+@pytest.mark.parametrize('list_markers,expected', [
+    (None, None),
+    (['*', '-'], '*')
+])
+def test_bullet(mock_load_wikis, wiki, list_markers, expected):
+    mock_load_wikis.return_value = [dict(DEFAULT_WIKI, list_markers=list_markers)]
+
+    assert wiki.bullet == expected
+
+
+@mock.patch('os.execvp')
+@pytest.mark.parametrize('wiki_options', [{'interactive': False}])
+def test_interactive_disabled(mock_execvp, wiki):
+    with pytest.raises(InteractiveError):
+        wiki.index()
+
+    mock_execvp.assert_not_called()
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = tmp_path / 'wiki'
+    path.mkdir()
+    (path / 'index.wiki').write_text('= Index =\n')
+    (path / 'Page.wiki').write_text('= Page =\n')
+    return Wiki(library=True, track_files=True, editor=sys.executable, path=str(path))
+
+
+def test_library_with_native(library):
+    result = library.generate_links('index', engine='native')
+    assert result.returncode == 0
+    assert result.messages == []
+    assert result.duration >= 0
+    assert result.files == [library.page_filename('index')]
+    assert result.value is True
+
+    # Pages are written only if changed:
+    result = library.generate_links('index', engine='native')
+    assert result.files == []
+    assert result.value is False
+
+
+def test_library_with_native_value(library):
+    result = library.rebuild_tags(engine='native')
+    assert result.files == [os.path.join(library.path, '.vimwiki_tags')]
+    assert result.value == 2
+
+
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+def test_library_with_command(mock_cmd, library):
+    def call():
+        logging.getLogger('vimwiki_cli.editor').error('ERROR')
+        os.remove(library.page_filename('Page'))
+        return 1
+
+    mock_cmd.return_value.interactive = False
+    mock_cmd.return_value.call.side_effect = call
+
+    result = library.rebuild_tags()
+    assert result.returncode == 1
+    assert result.messages == ['ERROR']
+    assert result.files == [library.page_filename('Page')]
+    assert result.value is None
+    mock_cmd.return_value.run.assert_not_called()
+
+
+def test_library_with_editor(library):
+    # The editor is Python, which fails to run the first Ex command:
+    result = library.rebuild_tags()
+    assert result.returncode == 1
+    assert 'NameError' in result.messages[0]
+
+
+def test_library_without_track_files(library):
+    library = library.replace(track_files=False)
+
+    result = library.generate_links('index', engine='native')
+    assert result.files is None
+    assert result.value is True
+
+
+@pytest.mark.parametrize('method,args,expected', [
+    ('search', ('Index', False), ['index']),
+    ('backlinks', ('Page',), ['index']),
+    ('orphans', (), ['Other'])
+])
+def test_library_with_query(library, method, args, expected):
+    with open(library.page_filename('index'), 'a') as f:
+        f.write('[[Page]]\n')
+    with open(library.page_filename('Other'), 'w') as f:
+        f.write('= Other =\n')
+
+    # Queries return a Result whose value is a list rather than an iterator:
+    result = getattr(library, method)(*args)
+    assert result.returncode == 0
+    assert result.files == []
+    assert [value if isinstance(value, str) else value.page
+            for value in result.value] == expected
+
+
+@mock.patch('vimwiki_cli.wiki.load_wikis', return_value=[DEFAULT_WIKI])
+def test_library_with_wikis(mock_load_wikis, library):
+    result = library.wikis(refresh=True)
+    assert result.value == [DEFAULT_WIKI]
+
+    mock_load_wikis.assert_called_with(sys.executable, True)
+
+
+@mock.patch('os.execvp')
+def test_library_with_interactive(mock_execvp, library):
+    with pytest.raises(InteractiveError):
+        library.index()
+
+    mock_execvp.assert_not_called()
+
+
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md'}])
+@pytest.mark.parametrize('page', ['dir/Page', '/dir/Page.md'])
+def test_page_filename(wiki, page):
+    assert wiki.page_filename(page) == os.path.join('PATH', 'dir', 'Page.md')
+
+
+@mock.patch('vimwiki_cli.links.backlinks', return_value=['LINK'])
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown',
+                                           'diary_rel_path': 'journal'}])
+@pytest.mark.parametrize('page', ['dir/Page', '/dir/Page.md'])
+def test_backlinks(mock_backlinks, wiki, page):
+    assert wiki.backlinks(page) == ['LINK']
+
+    mock_backlinks.assert_called_with('PATH', '.md', 'markdown', 'dir/Page', 'journal')
+
+
+@mock.patch('vimwiki_cli.links.orphans', return_value=['PAGE'])
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown',
+                                           'diary_rel_path': 'journal'}])
+def test_orphans(mock_orphans, wiki):
+    assert wiki.orphans() == ['PAGE']
+
+    mock_orphans.assert_called_with('PATH', '.md', 'markdown', 'journal')
+
+
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
 def test_check_links(mock_cmd, wiki):
     wiki.check_links()
@@ -123,6 +422,18 @@ def test_check_links(mock_cmd, wiki):
     mock_cmd.assert_called_with(wiki, 'VimwikiCheckLinks')
 
 
+@mock.patch('vimwiki_cli.links.check_links', return_value=['LINK'])
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown',
+                                           'diary_rel_path': 'journal'}])
+def test_check_links_with_native(mock_cmd, mock_check_links, wiki):
+    assert wiki.check_links(engine='native') == ['LINK']
+
+    mock_check_links.assert_called_with('PATH', '.md', 'markdown',
+                                        diary_rel_path='journal')
+    mock_cmd.assert_not_called()
+
+
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
 @pytest.mark.parametrize('args,expected', [
     (False, 'VimwikiRebuildTags'),
@@ -135,12 +446,37 @@ def test_rebuild_tags(mock_cmd, wiki, args, expected):
                                 interactive=False, quit=True)
 
 
+@mock.patch('vimwiki_cli.metadata.rebuild_tags')
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
-def test_search_tags(mock_cmd, wiki):
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH', 'ext': '.md', 'syntax': 'markdown'}])
+def test_rebuild_tags_with_native(mock_cmd, mock_rebuild_tags, wiki):
+    wiki.rebuild_tags(True, engine='native', only=('FILE',))
+
+    mock_rebuild_tags.assert_called_with('PATH', '.md', 'markdown', all=True, only=('FILE',))
+    mock_cmd.assert_not_called()
+
+
+@mock.patch('vimwiki_cli.metadata.load_tags', return_value={'TAG': []})
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH'}])
+def test_list_tags(mock_load_tags, wiki):
+    assert wiki.list_tags() == {'TAG': []}
+
+    mock_load_tags.assert_called_with('PATH')
+
+
+@mock.patch('vimwiki_cli.metadata.search_tags', return_value=['MATCH'])
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+@pytest.mark.parametrize('wiki_options', [{'path': 'PATH'}])
+def test_search_tags(mock_cmd, mock_search_tags, wiki):
     wiki.search_tags('PATTERN')
 
     mock_cmd.assert_called_with(wiki, 'silent! VimwikiSearchTags PATTERN',
                                 open_matches=True)
+    mock_search_tags.assert_not_called()
+
+    assert wiki.search_tags('PATTERN', open=False) == ['MATCH']
+
+    mock_search_tags.assert_called_with('PATH', 'PATTERN')
 
 
 @mock.patch('vimwiki_cli.wiki.LocalCommand')
@@ -153,3 +489,51 @@ def test_generate_tag_links(mock_cmd, wiki, args, expected):
 
     mock_cmd.assert_called_with(wiki, *expected,
                                 interactive=False, write_quit=True)
+
+
+@mock.patch('vimwiki_cli.wiki.LocalCommand')
+def test_batch(mock_cmd, wiki):
+    mock_cmd.return_value.interactive = False
+
+    with wiki.batch() as batch:
+        wiki.rebuild_tags()
+
+    assert len(batch) == 1
+    mock_cmd.return_value.run.assert_not_called()
+
+    # Commands should run immediately outside of the context:
+    wiki.rebuild_tags()
+    mock_cmd.return_value.run.assert_called_with()
+
+
+def returns(value):
+    """Return a replacement for a coroutine function which returns value."""
+    async def side_effect(*args, **kwargs):
+        return value
+
+    return side_effect
+
+
+@mock.patch('vimwiki_cli.wiki.Server')
+def test_start_server(mock_server, wiki):
+    mock_server.return_value.start.side_effect = returns(True)
+
+    assert wiki.start_server() is True
+
+    mock_server.return_value.start.assert_called_with()
+
+
+@mock.patch('vimwiki_cli.wiki.Server')
+def test_stop_server(mock_server, wiki):
+    mock_server.return_value.stop.side_effect = returns(True)
+
+    assert wiki.stop_server() is True
+
+    mock_server.return_value.stop.assert_called_with()
+
+
+@mock.patch('vimwiki_cli.wiki.Server')
+def test_server_status(mock_server, wiki):
+    mock_server.return_value.status.side_effect = returns('ADDRESS')
+
+    assert wiki.server_status() == 'ADDRESS'
@@ -22,30 +22,65 @@
 # SUCH DAMAGE.
 
 import logging
+import shlex
 import sys
 
 import click
 
-from . import __version__
+from . import __version__, trace
 from .context import *
-from .diary import diary
-from .tags import tags
+from .wiki import Wiki
 
 logger = logging.getLogger(__name__)
 
 
-@click.group(context_settings=CONTEXT_SETTINGS, invoke_without_command=True,
+@click.group(cls=WikiGroup, context_settings=CONTEXT_SETTINGS, invoke_without_command=True,
+             lazy_subcommands={
+                 'config': 'vimwiki_cli.config.config',
+                 'diary': 'vimwiki_cli.diary.diary',
+                 'hook': 'vimwiki_cli.hook.hook',
+                 'server': 'vimwiki_cli.server.server',
+                 'tags': 'vimwiki_cli.tags.tags',
+                 'watch': 'vimwiki_cli.watch.watch'
+             },
              epilog='Report issues to https://github.com/sstallion/vimwiki-cli/issues.')
 @click.option('--editor',
               help='Editor to launch, defaults to $EDITOR or vim.')
-@click.option('--count', type=int,
-              help='Index of wiki to open.')
+@click.option('--count', type=WikiCount(),
+              help='Index of wiki to open, also used to select settings for native commands.  '
+                   'If all, the command is run for each configured wiki.')
+@click.option('--wikis', type=WikiList(),
+              help='Run the command for each wiki in a comma-separated list of indexes.')
+@click.option('--jobs', type=click.IntRange(min=1),
+              help='Number of wikis processed concurrently, defaults to the number of CPUs.')
 @click.option('--select', is_flag=True,
               help='Select wiki from interactive list.')
 @click.option('--open-matches', is_flag=True,
               help='Open search results by default.')
 @click.option('--open-tabs', is_flag=True,
               help='Open pages in a new tab by default.')
+@click.option('--interactive/--no-interactive', default=True,
+              help='Allow commands which open the editor interactively.')
+@click.option('--server', is_flag=True,
+              help='Send non-interactive commands to a running editor server.')
+@click.option('--servername',
+              help='Name of editor server, defaults to VIMWIKI.')
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), metavar='SECONDS',
+              help='Kill the editor if a non-interactive command does not finish in time.')
+@click.option('--path',
+              help='Path of wiki used by native commands, defaults to ~/vimwiki or --count.')
+@click.option('--ext',
+              help='Extension of wiki pages, defaults to .wiki or --count.')
+@click.option('--syntax', type=click.Choice(['default', 'markdown', 'media']),
+              help='Syntax of wiki pages, defaults to default or --count.')
+@click.option('--path-html',
+              help='Path of HTML output used by native commands, defaults to PATH_html.')
+@click.option('--template-path',
+              help='Path of HTML templates used by native commands, defaults to PATH/templates.')
+@click.option('--timings', is_flag=True,
+              help='Write time spent in each phase to standard error on exit.')
+@click.option('--trace', type=click.Path(dir_okay=False), metavar='FILE',
+              help='Write time spent in each phase to FILE as Chrome trace-event JSON.')
 @click.option('-v', '--verbose', is_flag=True,
               help='Increase output verbosity.')
 @click.version_option(message='%(prog)s %(version)s')
@@ -63,19 +98,52 @@ def cli(ctx, *args, **kwargs):
     \b
     VIMWIKI_EDITOR        See --editor.
     VIMWIKI_COUNT         See --count.
+    VIMWIKI_WIKIS         See --wikis.
+    VIMWIKI_JOBS          See --jobs.
     VIMWIKI_SELECT        See --select.
     VIMWIKI_OPEN_MATCHES  See --open-matches.
     VIMWIKI_OPEN_TABS     See --open-tabs.
+    VIMWIKI_INTERACTIVE   See --interactive.
+    VIMWIKI_SERVER        See --server.
+    VIMWIKI_SERVERNAME    See --servername.
+    VIMWIKI_TIMEOUT       See --timeout.
+    VIMWIKI_PATH          See --path.
+    VIMWIKI_EXT           See --ext.
+    VIMWIKI_SYNTAX        See --syntax.
+    VIMWIKI_PATH_HTML     See --path-html.
+    VIMWIKI_TEMPLATE_PATH See --template-path.
+    VIMWIKI_TIMINGS       See --timings.
+    VIMWIKI_TRACE         See --trace.
+
+    Options used by native commands which are not otherwise given are read
+    from the wiki in g:vimwiki_list selected by --count, or the first wiki
+    once settings have been cached; see the config command group.  When
+    --count all or --wikis is given, the command is run concurrently for
+    each wiki with output prefixed by the wiki index; the exit status is the
+    highest of any wiki.
 
     If no command is specified, the wiki index will be opened by default.
     """
     verbose = kwargs.pop('verbose', False)
+    trace.enable(kwargs.pop('timings', False), kwargs.pop('trace', None))
+
     logging.basicConfig(format='%(levelname)s: %(message)s',
                         level=logging.DEBUG if verbose else logging.INFO)
 
     logger.debug('Python %s', sys.version)
     logger.debug('Version %s', __version__)
 
+    wikis = kwargs.pop('wikis', None)
+    jobs = kwargs.pop('jobs', None)
+    if kwargs['count'] == 'all' or wikis:
+        if wikis and kwargs['count'] is not None:
+            raise click.UsageError('--count and --wikis cannot be used together')
+
+        if ctx.invoked_subcommand is None:
+            raise click.UsageError('a command is required with --count all or --wikis')
+
+        ctx.exit(run_wikis(ctx, wikis, jobs))
+
     make_wiki(ctx, *args, **kwargs)
     if ctx.invoked_subcommand is None:
         ctx.invoke(index)
@@ -84,34 +152,161 @@ def cli(ctx, *args, **kwargs):
 @cli.command()
 @click.option('--all', is_flag=True,
               help='Rebuild all files, not just those that are newer.')
+@click.option('--engine', type=click.Choice(Wiki.ENGINES), default=Wiki.DEFAULT_ENGINE,
+              help='Engine used to convert pages, defaults to vim.')
+@click.option('--only', multiple=True, type=click.Path(),
+              help='Convert only PATH; may be given more than once.  Requires the native engine.')
 @pass_wiki
-def all_html(wiki, all):
-    """Convert all wiki pages to HTML."""
-    wiki.all_html(all)
+def all_html(wiki, all, engine, only):
+    """Convert all wiki pages to HTML.
+
+    The native engine converts pages in parallel without starting the editor;
+    it uses the global --path, --ext, --path-html, and --template-path
+    options and supports only the default syntax.  Its output is not checked
+    against VimwikiAll2HTML and may differ in markup and whitespace.
+    """
+    if only and engine != 'native':
+        raise click.UsageError('--only requires --engine native')
+
+    if engine == 'native' and wiki.syntax != 'default':
+        raise click.UsageError('--engine native requires --syntax default')
+
+    wiki.all_html(all, engine, only)
 
 
 @cli.command()
-@pass_wiki
-def check_links(wiki):
-    """Search files and check reachability of links."""
-    wiki.check_links()
+@click.option('-f', '--file', type=click.File(),
+              help='Read operations from FILE, or - for standard input.')
+@click.argument('operations', nargs=-1)
+@click.pass_context
+def batch(ctx, file, operations):
+    """Run OPERATIONS in a single editor session.
+
+    Each operation is a non-interactive command line quoted as a single
+    argument, for example "tags rebuild".  Operations may also be read from
+    FILE, one per line; blank lines and comments starting with # are ignored.
+    The result of each operation is reported once the editor exits.  An
+    operation which fails or exits with a non-zero status before reaching the
+    editor is reported as failed without stopping the remaining operations.
+    """
+    if file is not None:
+        operations += tuple(file)
+
+    wiki = ctx.ensure_object(Wiki)
+    indexes = []
+    with wiki.batch() as queue:
+        for operation in operations:
+            args = shlex.split(operation, comments=True)
+            if not args:
+                continue
+
+            start = len(queue)
+            error = None
+            try:
+                invoke_operation(ctx.parent, args)
+            except ValueError as e:
+                raise click.UsageError('%s: %s' % (operation.strip(), e))
+            except click.UsageError:
+                raise
+            except click.exceptions.Exit as e:
+                if e.exit_code:
+                    error = 'exited with status %d' % e.exit_code
+            except (click.ClickException, ConfigError, InteractiveError) as e:
+                error = str(e)
+
+            indexes.append((operation.strip(), start, len(queue), error))
+
+    results = queue.run()
+
+    failed = False
+    for operation, start, end, error in indexes:
+        errors = [error] if error else []
+        errors.extend(result.error for result in results[start:end] if result.error)
+        if errors:
+            logger.error('%s: %s', operation, '; '.join(errors))
+            failed = True
+        else:
+            click.echo('%s: ok' % operation)
+
+    ctx.exit(1 if failed else 0)
+
+
+def invoke_operation(ctx, args):
+    """Invoke a command line relative to the group context ctx."""
+    name, command, args = ctx.command.resolve_command(ctx, args)
+    if command is batch:
+        raise click.UsageError('batch operations cannot be nested')
+
+    with command.make_context(name, args, parent=ctx) as sub_ctx:
+        command.invoke(sub_ctx)
+
+
+@cli.command()
+@click.argument('page', callback=validate_nonempty, shell_complete=complete_pages)
+@click.pass_context
+def backlinks(ctx, page):
+    """List links to PAGE from other pages.
+
+    Links are printed as PAGE:LINE:TARGET using a link index which is updated
+    when pages are added, removed, or modified.  If no pages link to PAGE,
+    the exit status is 1.
+    """
+    wiki = ctx.ensure_object(Wiki)
+    links = wiki.backlinks(page)
+    for link in links:
+        click.echo('%s:%d:%s' % link)
+
+    if not links:
+        ctx.exit(1)
 
 
 @cli.command()
-@click.argument('page', callback=validate_nonempty)
+@click.option('--engine', type=click.Choice(Wiki.ENGINES), default=Wiki.DEFAULT_ENGINE,
+              help='Engine used to check links, defaults to vim.')
+@click.pass_context
+def check_links(ctx, engine):
+    """Search files and check reachability of links.
+
+    The native engine prints each broken link as PAGE:LINE:TARGET rather than
+    opening the results in the editor; if any links are broken, the exit
+    status is 1.  Only pages which have changed since the last check are
+    scanned.
+    """
+    wiki = ctx.ensure_object(Wiki)
+    if engine != 'native':
+        wiki.check_links()
+        return
+
+    broken = wiki.check_links(engine)
+    for link in broken:
+        click.echo('%s:%d:%s' % link)
+
+    if broken:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.option('--engine', type=click.Choice(Wiki.ENGINES), default=Wiki.DEFAULT_ENGINE,
+              help='Engine used to generate links, defaults to vim.')
+@click.argument('page', callback=validate_nonempty, shell_complete=complete_pages)
 @click.argument('pattern', required=False, default='')
 @pass_wiki
-def generate_links(wiki, page, pattern):
+def generate_links(wiki, engine, page, pattern):
     """Create or update an overview of all pages in PAGE.
 
     An optional PATTERN may be specified to indicate which files to search for
     using a glob path.
+
+    The native engine writes PAGE without starting the editor, and only if
+    the overview would change; PATTERN is matched against page names
+    relative to the wiki root as a Vim glob, where * and ? do not match /
+    and ** matches any number of directories.
     """
-    wiki.generate_links(page, pattern)
+    wiki.generate_links(page, pattern, engine)
 
 
 @cli.command()
-@click.argument('page', callback=validate_nonempty)
+@click.argument('page', callback=validate_nonempty, shell_complete=complete_pages)
 @pass_wiki
 def goto(wiki, page):
     """Open or create PAGE."""
@@ -133,15 +328,59 @@ def index(wiki):
 
 
 @cli.command()
-@click.argument('pattern', callback=validate_nonempty)
 @pass_wiki
-def search(wiki, pattern):
-    """Search wiki for text matching PATTERN."""
-    wiki.search(pattern)
+def orphans(wiki):
+    """List pages which are not linked to from any other page.
+
+    The wiki index is never listed.  Pages are printed one per line using a
+    link index which is updated when pages are added, removed, or modified.
+    """
+    for page in wiki.orphans():
+        click.echo(page)
+
+
+@cli.command()
+@click.option('--open', is_flag=True,
+              help='Open matches in the editor rather than printing them.')
+@click.option('-e', '--regex', is_flag=True,
+              help='Treat PATTERN as a regular expression.')
+@click.option('--index/--no-index', default=True,
+              help='Use the search index rather than scanning pages.')
+@click.option('-m', '--max-count', type=click.IntRange(min=1),
+              help='Stop after printing the given number of matches.')
+@click.argument('pattern', callback=validate_nonempty)
+@click.pass_context
+def search(ctx, open, regex, index, max_count, pattern):
+    """Search wiki for text matching PATTERN.
+
+    Lines containing every word in PATTERN are printed as PAGE:LINE:TEXT using
+    a search index which is updated as pages change.  If --regex is given,
+    lines matching the Python regular expression PATTERN are printed instead;
+    a trigram index limits the pages which must be scanned.  If no lines
+    match, the exit status is 1.
+
+    If --no-index is given, pages are scanned in parallel without updating
+    the search index and matches are printed as they are found.
+
+    If --open is given, matches are opened in the editor instead.
+    """
+    wiki = ctx.ensure_object(Wiki)
+    if open:
+        wiki.search(pattern)
+        return
+
+    if regex:
+        validate_regex(ctx, None, pattern)
+
+    found = False
+    for match in wiki.search(pattern, open=False, regex=regex, index=index,
+                             max_count=max_count):
+        click.echo('%s:%d:%s' % match)
+        found = True
 
+    if not found:
+        ctx.exit(1)
 
-cli.add_command(diary)
-cli.add_command(tags)
 
 if __name__ == '__main__':  # pragma: no cover
     cli()
@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def cache_home():
+    """Return directory used to store cached data."""
+    home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(home, 'vimwiki-cli')
+
+
+def cache_dir(path):
+    """Return directory used to store cached data for the wiki rooted at
+    path, creating it if needed.
+    """
+    key = hashlib.sha1(os.path.realpath(path).encode('utf-8', 'surrogateescape'))
+    dirname = os.path.join(cache_home(), key.hexdigest()[:16])
+    os.makedirs(dirname, exist_ok=True)
+    return dirname
+
+
+def file_hash(filename):
+    """Return hash of the contents of filename."""
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _mode(filename):
+    try:
+        return os.stat(filename).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(filename, data):
+    """Write data to filename such that readers never observe a partially
+    written file.  Text is encoded as UTF-8.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogateescape')
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, temp = tempfile.mkstemp(dir=dirname, prefix='.vimwiki-cli-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp, _mode(filename))
+        os.replace(temp, filename)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def update_file(filename, data):
+    """Write data to filename unless its contents would not change.  Returns
+    True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogateescape')
+
+    try:
+        with open(filename, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    atomic_write(filename, data)
+    return True
+
+
+def load_json(filename, default=None):
+    """Return data loaded from filename, or default if it cannot be read."""
+    try:
+        with open(filename, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.debug('Unable to load %s: %s', filename, e)
+        return default
+
+
+def save_json(filename, data):
+    """Save data to filename."""
+    atomic_write(filename, json.dumps(data, separators=(',', ':')))
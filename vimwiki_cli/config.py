@@ -0,0 +1,52 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import click
+
+from .context import *
+
+
+@click.group()
+def config():
+    """Command group for reading wiki configuration.
+
+    Wiki settings are read from g:vimwiki_list by starting the editor
+    headless and are cached until the user's vimrc changes.  When --count
+    is given, native commands use the settings of the selected wiki unless
+    overridden by the global --path, --ext, and --syntax options.
+    """
+
+
+@config.command('list')
+@click.option('--refresh', is_flag=True,
+              help='Read settings from the editor even if cached.')
+@pass_wiki
+def list_(wiki, refresh):
+    """List configured wikis.
+
+    Each wiki is printed as COUNT, PATH, EXT, and SYNTAX separated by tabs,
+    where COUNT may be given to --count to select the wiki.
+    """
+    for count, settings in enumerate(wiki.wikis(refresh), 1):
+        click.echo('%d\t%s\t%s\t%s' % (count, settings['path'], settings['ext'],
+                                       settings['syntax']))
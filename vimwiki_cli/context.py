@@ -21,10 +21,21 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import importlib
+import logging
+import os
+import re
+import sys
+
 import click
 
+from . import trace
+from .editor import InteractiveError
+from .settings import ConfigError
 from .wiki import Wiki
 
+logger = logging.getLogger(__name__)
+
 CONTEXT_SETTINGS = {
     'auto_envvar_prefix': 'VIMWIKI',
     'default_map': {
@@ -32,16 +43,203 @@ CONTEXT_SETTINGS = {
         'count': Wiki.DEFAULT_COUNT,
         'select': Wiki.DEFAULT_SELECT,
         'open_matches': Wiki.DEFAULT_OPEN_MATCHES,
-        'open_tabs': Wiki.DEFAULT_OPEN_TABS
+        'open_tabs': Wiki.DEFAULT_OPEN_TABS,
+        'interactive': Wiki.DEFAULT_INTERACTIVE,
+        # 'server' is omitted as it would be used as the default_map of the
+        # server command group; the flag defaults to False regardless.
+        'servername': Wiki.DEFAULT_SERVERNAME,
+        'timeout': Wiki.DEFAULT_TIMEOUT,
+        'path': Wiki.DEFAULT_PATH,
+        'ext': Wiki.DEFAULT_EXT,
+        'syntax': Wiki.DEFAULT_SYNTAX,
+        'path_html': Wiki.DEFAULT_PATH_HTML,
+        'template_path': Wiki.DEFAULT_TEMPLATE_PATH
     }
 }
 
 pass_wiki = click.make_pass_decorator(Wiki, ensure=True)
 
+# Global options which are not passed on when a command is run for each of
+# several wikis:
+WIKI_OPTIONS = ('count', 'wikis', 'jobs', 'interactive', 'timings', 'trace')
+
+# Key of ctx.meta holding the arguments given to the group:
+_ARGS = 'vimwiki_cli.args'
+
+
+class WikiCount(click.ParamType):
+    """Index of a wiki, or 'all' to select each configured wiki."""
+    name = 'count'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int) or value == 'all':
+            return value
+
+        try:
+            return int(value)
+        except ValueError:
+            self.fail('%r is not a valid integer or all' % value, param, ctx)
+
+
+class WikiList(click.ParamType):
+    """Comma-separated list of wiki indexes."""
+    name = 'list'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+
+        try:
+            counts = tuple(int(count) for count in value.split(','))
+        except ValueError:
+            self.fail('%r is not a valid list of integers' % value, param, ctx)
+
+        # Duplicates are removed so that no wiki is processed twice:
+        return tuple(sorted(set(counts), key=counts.index))
+
+
+class WikiGroup(click.Group):
+    """Group which loads subcommands from lazy_subcommands, a mapping of
+    command names to 'module.attribute' strings, only once they are needed.
+    Errors reading the wiki configuration, which is also only read once a
+    command needs it, are reported as usage errors.
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        click.Group.__init__(self, *args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(click.Group.list_commands(self, ctx) + list(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            module, _, name = self.lazy_subcommands[cmd_name].rpartition('.')
+            with trace.span('load ' + cmd_name):
+                return getattr(importlib.import_module(module), name)
+
+        return click.Group.get_command(self, ctx, cmd_name)
+
+    def make_context(self, *args, **kwargs):
+        with trace.span('parse'):
+            return click.Group.make_context(self, *args, **kwargs)
+
+    def parse_args(self, ctx, args):
+        # Arguments are kept so that the command may be run for each wiki:
+        ctx.meta[_ARGS] = list(args)
+        return click.Group.parse_args(self, ctx, args)
+
+    def invoke(self, ctx):
+        try:
+            with trace.span('invoke'):
+                return click.Group.invoke(self, ctx)
+        except (ConfigError, InteractiveError) as e:
+            raise click.ClickException(str(e))
+
+    def command_args(self, ctx):
+        """Return arguments given to the group following its options."""
+        _, args, _ = self.make_parser(ctx).parse_args(list(ctx.meta[_ARGS]))
+        return args
+
 
 def make_wiki(ctx, *args, **kwargs):
     """Create Wiki instance as user data and add to context."""
-    ctx.obj = Wiki(**kwargs)
+    with trace.span('make wiki'):
+        ctx.obj = Wiki(**kwargs)
+
+
+def run_wikis(ctx, counts=None, jobs=None):
+    """Run the command given to the group context ctx once for each wiki in
+    counts, or each configured wiki if counts is None, using at most jobs
+    concurrent processes.  Interactive commands are disabled.  Returns the
+    highest exit status.
+    """
+    if counts is None:
+        counts = range(1, len(Wiki(editor=ctx.params['editor']).wikis()) + 1)
+
+    options = []
+    for param in ctx.command.params:
+        value = ctx.params.get(param.name)
+        if param.name in WIKI_OPTIONS or value is None or value is False:
+            continue
+
+        option = max(param.opts, key=len)
+        options.extend([option] if value is True else [option, str(value)])
+
+    # Options read from the environment which select wikis must not be
+    # inherited, otherwise each process would run the command again:
+    prefix = ctx.auto_envvar_prefix + '_'
+    env = {key: value for key, value in os.environ.items()
+           if key not in [prefix + name.upper() for name in WIKI_OPTIONS]}
+
+    args = [sys.executable, '-m', 'vimwiki_cli'] + options + ['--no-interactive']
+    commands = [(count, args + ['--count', str(count)] + ctx.command.command_args(ctx))
+                for count in counts]
+
+    from .parallel import run_each
+
+    statuses = run_each(commands, jobs, env)
+    for count, status in zip(counts, statuses):
+        if status:
+            logger.error('[%d] exited with status %d', count, status)
+        else:
+            click.echo('[%d] ok' % count, err=True)
+
+    return max(statuses, default=0)
+
+
+def _complete_wiki(ctx):
+    # Completion does not invoke the group callback, so the wiki is created
+    # from the global options parsed so far:
+    params = ctx.find_root().params
+    if params.get('count') == 'all' or params.get('wikis'):
+        return None
+
+    wiki = Wiki(**{name: value for name, value in params.items()
+                   if name not in ('wikis', 'jobs', 'timings', 'trace', 'verbose')})
+    return wiki if os.path.isdir(wiki.path) else None
+
+
+def complete_pages(ctx, param, incomplete):
+    """Complete page names of the wiki selected by the global options from
+    the page list cached for the wiki.  A stale list is used as is while it
+    is refreshed in the background, so completion never walks the wiki.
+    """
+    from .pages import cached_pages, list_pages, match_pages, refresh_pages
+
+    try:
+        wiki = _complete_wiki(ctx)
+        if wiki is None:
+            return []
+
+        pages, stale = cached_pages(wiki.path, wiki.ext)
+        if pages is None:
+            pages = list_pages(wiki.path, wiki.ext)
+        elif stale:
+            refresh_pages(wiki.path, wiki.ext)
+    except (ConfigError, OSError):
+        return []
+
+    return match_pages(pages, incomplete)
+
+
+def complete_tags(ctx, param, incomplete):
+    """Complete tag names of the wiki selected by the global options from
+    its tag metadata.
+    """
+    from .metadata import load_tags
+    from .pages import match_pages
+
+    try:
+        wiki = _complete_wiki(ctx)
+        if wiki is None:
+            return []
+
+        tags = load_tags(wiki.path)
+    except (ConfigError, OSError):
+        return []
+
+    return match_pages(sorted(tags), incomplete)
 
 
 def validate_nonempty(ctx, param, value):
@@ -50,3 +248,13 @@ def validate_nonempty(ctx, param, value):
         raise click.BadParameter('value cannot be empty')
 
     return value
+
+
+def validate_regex(ctx, param, value):
+    """Validate parameter is a valid regular expression."""
+    try:
+        re.compile(value)
+    except re.error as e:
+        raise click.BadParameter('invalid regular expression: %s' % e, ctx, param)
+
+    return value
@@ -38,10 +38,16 @@ def diary(ctx):
 
 
 @diary.command()
+@click.option('--engine', type=click.Choice(Wiki.ENGINES), default=Wiki.DEFAULT_ENGINE,
+              help='Engine used to generate links, defaults to vim.')
 @pass_wiki
-def generate_links(wiki):
-    """Create or update an overview of diary pages."""
-    wiki.diary_generate_links()
+def generate_links(wiki, engine):
+    """Create or update an overview of diary pages.
+
+    The native engine scans only the diary directory without starting the
+    editor, and writes the diary index only if the overview would change.
+    """
+    wiki.diary_generate_links(engine)
 
 
 @diary.command(hidden=True)
@@ -21,13 +21,65 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import collections
 import logging
 import os
+import stat
 import subprocess
 import sys
+import tempfile
+import time
+
+from . import trace
 
 logger = logging.getLogger(__name__)
 
+BatchResult = collections.namedtuple('BatchResult', ['command', 'error'])
+
+# Number of lines written by the editor to standard error which are kept to
+# report errors; earlier lines are discarded:
+STDERR_LINES = 100
+
+
+def vim_string(value):
+    """Quote value as a Vim script literal string."""
+    return "'%s'" % value.replace("'", "''")
+
+
+def vim_list(values):
+    """Quote values as a Vim script list of literal strings."""
+    return '[%s]' % ', '.join(vim_string(value) for value in values)
+
+
+def is_neovim(editor):
+    """Return True if editor is Neovim."""
+    return os.path.basename(editor).startswith('nvim')
+
+
+def runtime_dir():
+    """Return directory used for sockets and other runtime files.  Unless
+    XDG_RUNTIME_DIR is set, a directory private to the user is created in
+    the temporary directory; ServerError is raised if it is owned by another
+    user or accessible to others.
+    """
+    path = os.getenv('XDG_RUNTIME_DIR')
+    if path:
+        return path
+
+    # Names in the shared temporary directory can be created by any user,
+    # so the directory is checked rather than trusted:
+    path = os.path.join(tempfile.gettempdir(), 'vimwiki-cli-%d' % os.getuid())
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise ServerError('runtime directory %s is not private' % path)
+
+    return path
+
 
 class Command(object):
     DEFAULT_INTERACTIVE = True
@@ -36,21 +88,22 @@ class Command(object):
     DEFAULT_WRITE_QUIT = False
 
     def __init__(self, wiki, *args, **options):
-        self._wiki = wiki
-        self._options = options
+        with trace.span('make command'):
+            self._wiki = wiki
+            self._options = options
 
-        args = list(args)
-        if self.interactive:
-            if wiki.open_tabs:
-                args.insert(0, '$tabnew')
+            args = list(args)
+            if self.interactive:
+                if wiki.open_tabs:
+                    args.insert(0, '$tabnew')
 
-            if self.open_matches and wiki.open_matches:
-                args.append('lopen')
+                if self.open_matches and wiki.open_matches:
+                    args.append('lopen')
 
-        if self.quit or self.write_quit:
-            args.append('%sq!' % ('w' if self.write_quit else ''))
+            if self.quit or self.write_quit:
+                args.append('%sq!' % ('w' if self.write_quit else ''))
 
-        self._args = args
+            self._args = args
 
     def __repr__(self):
         return '%s(%r, %r, %r)' % (self.__class__.__name__,
@@ -74,6 +127,20 @@ class Command(object):
     def write_quit(self):
         return self._options.get('write_quit', Command.DEFAULT_WRITE_QUIT)
 
+    @property
+    def session_args(self):
+        """Ex commands needed to run this command in a shared editor session.
+        Trailing quit commands are removed so that the session remains open;
+        modified buffers are written instead when write_quit is set.
+        """
+        args = list(self._args)
+        if self.quit or self.write_quit:
+            args.pop()
+            if self.write_quit:
+                args.append('write')
+
+        return args
+
     def run(self):
         """Run command in the editor.  This method does not return as
         interactive commands replace the runing process with the editor and
@@ -81,24 +148,359 @@ class Command(object):
         """
         logger.debug('Running %r' % self)
 
+        if self.interactive:
+            args = self.editor_args()
+            logger.debug('Launching %r' % args)
+
+            # Spans must be written before the process is replaced:
+            trace.finish()
+            os.execvp(args[0], args)
+        else:
+            sys.exit(self.call())
+
+    def call(self):
+        """Run non-interactive command in the editor and return the resulting
+        return code rather than exiting.  Errors are logged.
+        """
+        from . import parallel
+
+        try:
+            return parallel.run(self.execute())
+        except subprocess.TimeoutExpired as e:
+            logger.error('editor timed out after %g seconds' % e.timeout)
+            return 1
+
+    def editor_args(self):
+        """Arguments used to start the editor with this command."""
         args = [self._wiki.editor]
         for arg in self._args:
             args.extend(['-c', arg.strip()])
 
-        logger.debug('Launching %r' % args)
+        return args
+
+    async def execute(self):
+        """Run non-interactive command in the editor, or the editor server if
+        enabled and running.  Returns the resulting return code; errors are
+        logged.  Raises subprocess.TimeoutExpired if the editor does not exit,
+        or the server does not respond, within the timeout of the wiki.
+        """
         if self.interactive:
-            os.execvp(args[0], args)
+            raise ValueError('interactive commands cannot be executed')
+
+        server = Server(self._wiki)
+        if self._wiki.server and await server.running():
+            logger.debug('Sending %r to %s' % (self.session_args, server.address))
+            with trace.span('server', address=server.address):
+                error = await server.execute(self.session_args)
+            if error:
+                logger.error(error)
+
+            return 1 if error else 0
+
+        from . import parallel
+
+        args = self.editor_args()
+        stderr = collections.deque(maxlen=STDERR_LINES)
+        with trace.startuptime() as startuptime:
+            if startuptime is not None:
+                args[1:1] = ['--startuptime', startuptime]
+
+            with trace.span('editor', args=args):
+                returncode = await parallel.execute(args,
+                                                    timeout=self._wiki.timeout,
+                                                    stderr=stderr.append)
+
+        if returncode != 0:
+            logger.error('\n'.join(stderr))
+
+        return returncode
+
+
+class Batch(object):
+    """Queue of non-interactive commands run in a single editor session.
+
+    Each command is wrapped in a try block so that a failure does not prevent
+    subsequent commands from running; buffers are wiped between commands to
+    approximate a fresh editor.
+    """
+
+    def __init__(self, wiki):
+        self._wiki = wiki
+        self._commands = []
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__,
+                               self._wiki,
+                               self._commands)
+
+    def __len__(self):
+        return len(self._commands)
+
+    def add(self, command):
+        """Add command to the batch."""
+        if command.interactive:
+            raise ValueError('interactive commands cannot be batched')
+
+        self._commands.append(command)
+
+    def script(self, results):
+        """Return lines of the Vim script used to run the batch.  The error
+        raised by each command, or an empty string, is written to results.
+        """
+        lines = ['let s:results = []']
+        for command in self._commands:
+            lines.append('try')
+            lines.extend('  ' + arg.strip() for arg in command.session_args)
+            lines.append("  call add(s:results, '')")
+            lines.append('catch')
+            lines.append('  call add(s:results, v:exception)')
+            lines.append('endtry')
+            lines.append('silent! %bwipeout!')
+
+        lines.append('call writefile(s:results, %s)' % vim_string(results))
+        lines.append('qa!')
+        return lines
+
+    async def _send(self, server):
+        results = []
+        for command in self._commands:
+            try:
+                error = await server.execute(command.session_args)
+            except subprocess.TimeoutExpired as e:
+                # Commands are not sent once the server stops responding:
+                error = 'server timed out after %g seconds' % e.timeout
+                results.extend(BatchResult(command, error)
+                               for command in self._commands[len(results):])
+                break
+
+            results.append(BatchResult(command, error or None))
+
+        return results
+
+    def run(self):
+        """Run queued commands in the editor.  Returns a list of BatchResult
+        in the order commands were added; error is None on success.
+        """
+        logger.debug('Running %r' % self)
+        if not self._commands:
+            return []
+
+        from . import parallel
+
+        server = Server(self._wiki)
+        if self._wiki.server and parallel.run(server.running()):
+            with trace.span('server', address=server.address):
+                return parallel.run(self._send(server))
+
+        with tempfile.TemporaryDirectory(prefix='vimwiki-cli-') as tmpdir:
+            script = os.path.join(tmpdir, 'batch.vim')
+            results = os.path.join(tmpdir, 'results')
+            with open(script, 'w') as f:
+                f.write('\n'.join(self.script(results)) + '\n')
+
+            args = [self._wiki.editor, '-S', script]
+
+            stderr = collections.deque(maxlen=STDERR_LINES)
+            with trace.startuptime() as startuptime:
+                if startuptime is not None:
+                    args[1:1] = ['--startuptime', startuptime]
+
+                with trace.span('editor', args=args):
+                    try:
+                        returncode = parallel.run(parallel.execute(args,
+                                                                   timeout=self._wiki.timeout,
+                                                                   stderr=stderr.append))
+                        error = '\n'.join(stderr).strip() or \
+                            'editor exited with status %d' % returncode
+                    except subprocess.TimeoutExpired as e:
+                        error = 'editor timed out after %g seconds' % e.timeout
+
+            try:
+                with open(results) as f:
+                    errors = f.read().splitlines()
+            except FileNotFoundError:
+                errors = []
+
+        # Commands not reported by the editor did not run to completion:
+        if len(errors) < len(self._commands):
+            errors.extend([error] * (len(self._commands) - len(errors)))
+
+        return [BatchResult(command, error or None)
+                for command, error in zip(self._commands, errors)]
+
+
+class ServerError(Exception):
+    pass
+
+
+class InteractiveError(Exception):
+    pass
+
+
+# Runs the editor given by argv[1:] on a pseudo-terminal which is held open
+# and drained until the editor exits, as Vim exits once its input reaches
+# end of file:
+_TERMINAL = """
+import os, pty, subprocess, sys
+master, slave = pty.openpty()
+process = subprocess.Popen(sys.argv[1:], stdin=slave, stdout=slave, stderr=slave)
+os.close(slave)
+try:
+    while os.read(master, 65536):
+        pass
+except OSError:
+    pass
+sys.exit(process.wait())
+"""
+
+
+class Server(object):
+    """Headless editor which is kept running in the background to execute
+    non-interactive commands without paying the cost of editor startup.
+    Vim servers are addressed by name using --servername and run on a
+    pseudo-terminal; Neovim servers listen on a socket in the runtime
+    directory.
+    """
+    DEFAULT_TIMEOUT = 10.0
+
+    SCRIPT = [
+        'function! VimwikiCliExecute(commands) abort',
+        '  try',
+        '    for command in a:commands',
+        '      execute command',
+        '    endfor',
+        "    return ''",
+        '  catch',
+        '    return v:exception',
+        '  finally',
+        '    silent! %bwipeout!',
+        '  endtry',
+        'endfunction'
+    ]
+
+    def __init__(self, wiki):
+        self._wiki = wiki
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__,
+                           self._wiki)
+
+    @property
+    def neovim(self):
+        return is_neovim(self._wiki.editor)
+
+    @property
+    def address(self):
+        if self.neovim:
+            return os.path.join(runtime_dir(),
+                                'vimwiki-cli-%s.sock' % self._wiki.servername.lower())
+
+        return self._wiki.servername
+
+    async def _remote(self, *args):
+        from . import parallel
+
+        option = '--server' if self.neovim else '--servername'
+        args = [self._wiki.editor, option, self.address] + list(args)
+
+        stdout = []
+        stderr = []
+        returncode = await parallel.execute(args,
+                                            timeout=self._wiki.timeout,
+                                            stdout=stdout.append,
+                                            stderr=stderr.append)
+        return returncode, '\n'.join(stdout), '\n'.join(stderr)
+
+    async def expr(self, expression):
+        """Evaluate expression in the server and return the result.  Raises
+        subprocess.TimeoutExpired if the server does not respond within the
+        timeout of the wiki.
+        """
+        returncode, stdout, stderr = await self._remote('--remote-expr', expression)
+        if returncode != 0:
+            raise ServerError(stderr.strip() or 'unable to contact server %s' % self.address)
+
+        return stdout
+
+    async def execute(self, commands):
+        """Execute Ex commands in the server.  Returns the error raised by
+        the editor, or an empty string on success.
+        """
+        return await self.expr('VimwikiCliExecute(%s)' %
+                               vim_list(arg.strip() for arg in commands))
+
+    async def running(self):
+        """Return True if the server is accepting commands."""
+        if self.neovim and not os.path.exists(self.address):
+            return False
+
+        try:
+            return await self.expr('exists("*VimwikiCliExecute")') == '1'
+        except (OSError, ServerError):
+            return False
+
+    async def status(self):
+        """Return the address of the server if it is accepting commands,
+        otherwise None.
+        """
+        return self.address if await self.running() else None
+
+    async def _wait(self, running, timeout):
+        import asyncio
+
+        deadline = time.monotonic() + timeout
+        while await self.running() != running:
+            if time.monotonic() > deadline:
+                raise ServerError('timed out waiting for server %s' % self.address)
+            await asyncio.sleep(0.1)
+
+    async def start(self, timeout=DEFAULT_TIMEOUT):
+        """Start the server unless it is already running.  Returns False if
+        the server was already running.
+        """
+        if await self.running():
+            return False
+
+        # The script is created exclusively so that an existing file cannot
+        # be substituted, and is removed once the server has sourced it:
+        fd, script = tempfile.mkstemp(prefix='vimwiki-cli-server-', suffix='.vim',
+                                      dir=runtime_dir())
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(Server.SCRIPT) + '\n')
+
+        env = None
+        if self.neovim:
+            args = [self._wiki.editor, '--headless', '--listen', self.address, '-S', script]
         else:
-            process = subprocess.Popen(args,
-                                       stdin=subprocess.PIPE,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE)
+            args = [sys.executable, '-c', _TERMINAL,
+                    self._wiki.editor, '--servername', self.address, '-S', script]
+            env = dict(os.environ, TERM='dumb')
 
-            (_, stderr) = process.communicate()
-            if process.returncode != 0:
-                logger.error(stderr.decode(sys.stderr.encoding))
+        logger.debug('Launching %r' % args)
+        try:
+            subprocess.Popen(args,
+                             stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL,
+                             env=env,
+                             start_new_session=True)
+
+            await self._wait(True, timeout)
+        finally:
+            os.unlink(script)
+
+        return True
+
+    async def stop(self, timeout=DEFAULT_TIMEOUT):
+        """Stop the server if running.  Returns False if the server was not
+        running.
+        """
+        if not await self.running():
+            return False
 
-            sys.exit(process.returncode)
+        await self._remote('--remote-send', '<C-\\><C-N>:qa!<CR>')
+        await self._wait(False, timeout)
+        return True
 
 
 class GlobalCommand(Command):
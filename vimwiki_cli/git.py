@@ -0,0 +1,299 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import contextlib
+import logging
+import os
+import shutil
+import subprocess
+
+from . import trace
+
+logger = logging.getLogger(__name__)
+
+# Directory within the git directory holding changes set aside by
+# keep_index():
+UNSTAGED_DIR = 'vimwiki-unstaged'
+
+# Values accepted by git for boolean configuration options:
+_TRUE = ('true', 'yes', 'on', '1')
+_FALSE = ('false', 'no', 'off', '0', '')
+
+
+class GitError(Exception):
+    """Raised when git exits with an error."""
+
+    def __init__(self, message, returncode=None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+def git(*args, input=None):
+    """Run git with args and return its standard output as bytes.  If input
+    is given, it is written to standard input.  Raises GitError if git exits
+    with a non-zero status.
+    """
+    args = ['git'] + list(args)
+    stdin = {'input': input} if input is not None else {'stdin': subprocess.DEVNULL}
+
+    logger.debug('Launching %r' % args)
+    with trace.span('git', args=args):
+        process = subprocess.run(args,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE,
+                                 **stdin)
+
+    if process.returncode != 0:
+        error = os.fsdecode(process.stderr).strip()
+        raise GitError(error or 'git exited with status %d' % process.returncode,
+                       process.returncode)
+
+    return process.stdout
+
+
+def get_config(section):
+    """Return a dict of the options in section, read in a single call.  Keys
+    are lowercase option names without the section; options given without a
+    value map to None.  Later values take precedence.
+    """
+    try:
+        output = git('config', '-z', '--get-regexp', r'^%s\.' % section)
+    except GitError as e:
+        # No options are set in section:
+        if e.returncode == 1:
+            return {}
+        raise
+
+    config = {}
+    for entry in filter(None, os.fsdecode(output).split('\0')):
+        key, newline, value = entry.partition('\n')
+        config[key[len(section) + 1:]] = value if newline else None
+
+    return config
+
+
+def config_bool(value):
+    """Return value of a boolean option from get_config() as interpreted by
+    git.  Options given without a value are true.
+    """
+    if value is None:
+        return True
+
+    if value.lower() in _TRUE:
+        return True
+
+    if value.lower() in _FALSE:
+        return False
+
+    try:
+        return int(value) != 0
+    except ValueError:
+        raise GitError('bad boolean config value %r' % value)
+
+
+def toplevel():
+    """Return absolute path of the top-level directory of the working tree."""
+    return os.fsdecode(git('rev-parse', '--show-toplevel')).rstrip('\n')
+
+
+def staged_files(path):
+    """Return a list of (status, filename) for each file staged for commit in
+    the working tree rooted at path.  Status is A, D, M, or T; renames are
+    reported as a deletion and an addition.
+    """
+    output = git('diff', '--cached', '--name-status', '--no-renames', '--diff-filter=ADMT',
+                 '-z')
+    fields = os.fsdecode(output).split('\0')
+    return [(status, os.path.join(path, filename))
+            for status, filename in zip(fields[0::2], fields[1::2])]
+
+
+def _inside(path, filenames):
+    # Files outside the working tree cannot be passed to git as pathspecs:
+    root = os.path.join(os.path.realpath(path), '')
+    return [filename for filename in map(os.path.realpath, filenames)
+            if filename.startswith(root) or filename == root[:-1]]
+
+
+def git_dir():
+    """Return absolute path of the git directory."""
+    return os.path.abspath(os.fsdecode(git('rev-parse', '--git-dir')).rstrip('\n'))
+
+
+def unstaged_files(path, paths):
+    """Return (modified, untracked) for files below paths in the working
+    tree rooted at path.  modified is a sorted list of files with changes
+    not staged for commit, and untracked a sorted list of files which are
+    neither in the index nor ignored.
+    """
+    paths = _inside(path, paths)
+    if not paths:
+        return [], []
+
+    modified = git('diff', '--name-only', '--no-renames', '-z', '--', *paths)
+    untracked = git('ls-files', '-z', '--others', '--exclude-standard', '--full-name', '--',
+                    *paths)
+    return tuple(sorted(os.path.join(path, filename)
+                        for filename in filter(None, os.fsdecode(output).split('\0')))
+                 for output in (modified, untracked))
+
+
+@contextlib.contextmanager
+def keep_index(path, paths):
+    """Context manager which sets aside changes below paths in the working
+    tree rooted at path which are not staged for commit, including untracked
+    files, so that the working tree matches the index.  Changes are restored
+    on exit; if they cannot be, GitError is raised naming the directory in
+    which they were saved.
+    """
+    modified, untracked = unstaged_files(path, paths)
+    if not modified and not untracked:
+        yield
+        return
+
+    saved = os.path.join(git_dir(), UNSTAGED_DIR)
+    if os.path.exists(saved):
+        raise GitError('%s exists; restore or remove changes saved by a previous run' % saved)
+
+    patch = os.path.join(saved, 'unstaged.patch')
+    os.makedirs(os.path.join(saved, 'untracked'))
+    with open(patch, 'wb') as f:
+        if modified:
+            f.write(git('diff', '--binary', '--no-color', '--no-ext-diff', '--no-textconv',
+                        '--src-prefix=a/', '--dst-prefix=b/', '--', *modified))
+
+    logger.debug('Saving unstaged changes to %s', saved)
+    if modified:
+        git('checkout', '--', *modified)
+    for filename in untracked:
+        target = os.path.join(saved, 'untracked', os.path.relpath(filename, path))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(filename, target)
+
+    try:
+        yield
+    finally:
+        try:
+            for filename in untracked:
+                if os.path.lexists(filename):
+                    raise GitError('%s was created while untracked files were set aside'
+                                   % filename)
+
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                shutil.move(os.path.join(saved, 'untracked', os.path.relpath(filename, path)),
+                            filename)
+
+            if os.path.getsize(patch):
+                git('-C', path, 'apply', '--binary', '--whitespace=nowarn', patch)
+        except (OSError, GitError) as e:
+            raise GitError('unable to restore unstaged changes saved in %s: %s' % (saved, e))
+
+        shutil.rmtree(saved)
+
+
+def add(path, filenames):
+    """Stage changes to filenames in the working tree rooted at path,
+    including removals.  Files outside the working tree or ignored by git
+    are skipped rather than treated as an error.
+    """
+    filenames = _inside(path, filenames)
+    if not filenames:
+        return
+
+    output = git('ls-files', '-z', '--cached', '--others', '--exclude-standard', '--',
+                 *filenames)
+    filenames = sorted(set(filter(None, os.fsdecode(output).split('\0'))))
+    if filenames:
+        git('add', '--all', '--', *filenames)
+
+
+def ls_files(path):
+    """Return a dict mapping filename to (mode, object) for each file in the
+    index under path.  Filenames are relative to the top-level directory of
+    the working tree; unmerged files are omitted.
+    """
+    output = git('ls-files', '--stage', '--full-name', '-z', '--', path)
+    entries = {}
+    for entry in filter(None, os.fsdecode(output).split('\0')):
+        info, _, filename = entry.partition('\t')
+        mode, obj, stage = info.split()
+        if stage == '0':
+            entries[filename] = (mode, obj)
+
+    return entries
+
+
+def hash_object(data):
+    """Write data to the object store and return the name of the blob."""
+    return os.fsdecode(git('hash-object', '-w', '--stdin', input=data)).strip()
+
+
+def update_index(entries):
+    """Update the index with entries, a list of (mode, object, filename)
+    where filename is relative to the top-level directory of the working
+    tree.  The working tree is not modified.
+    """
+    data = ''.join('%s %s\t%s\0' % entry for entry in entries)
+    if data:
+        git('update-index', '-z', '--index-info', input=os.fsencode(data))
+
+
+class CatFile(object):
+    """Reader of objects from the object store using a single long-lived
+    git cat-file process.  Instances must be used as a context manager.
+    """
+
+    def __init__(self):
+        self._process = None
+
+    def __repr__(self):
+        return '%s()' % self.__class__.__name__
+
+    def __enter__(self):
+        args = ['git', 'cat-file', '--batch']
+
+        logger.debug('Launching %r' % args)
+        self._process = subprocess.Popen(args,
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.stdin.close()
+        self._process.stdout.close()
+        self._process.wait()
+
+    def read(self, obj):
+        """Return contents of obj as bytes.  Raises GitError if obj does not
+        exist.
+        """
+        self._process.stdin.write(obj.encode() + b'\n')
+        self._process.stdin.flush()
+
+        header = self._process.stdout.readline().split()
+        if len(header) != 3:
+            raise GitError('%s: object not found' % obj)
+
+        data = self._process.stdout.read(int(header[2]))
+        self._process.stdout.read(1)  # trailing newline
+        return data
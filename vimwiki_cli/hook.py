@@ -0,0 +1,311 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import functools
+import itertools
+import logging
+import os
+import shlex
+
+import click
+
+from . import git
+from .context import *
+
+logger = logging.getLogger(__name__)
+
+# Step of the pre-commit hook; outputs are the files staged once all steps
+# succeed.  Steps run by the editor are identified by the vim engine:
+Step = collections.namedtuple('Step', ['name', 'engine', 'run', 'outputs'])
+
+# Engine of steps run against the index by --index-only:
+INDEX_ENGINE = 'index'
+
+
+@click.group()
+def hook():
+    """Command group for Git hooks.
+
+    Hooks are configured using vimwiki.* options read from git config; see
+    the README for a list of options.
+    """
+
+
+@hook.command()
+@click.option('--engine', type=click.Choice(Wiki.ENGINES),
+              help='Engine used for steps which support it, defaults to vimwiki.engine or vim.')
+@click.option('--index-only', is_flag=True,
+              help='Read pages from and write results to the index, defaults to '
+                   'vimwiki.indexonly.')
+@click.pass_context
+def pre_commit(ctx, engine, index_only):
+    """Update generated pages before commit.
+
+    Pages are read from the wiki selected by the global options or
+    vimwiki.options, or the repository itself if no wiki is selected.  Each
+    step enabled in git config is run only if pages staged for commit
+    affect its output: links are generated when pages are added or removed,
+    diary links when diary pages change, and tags and HTML when any page
+    changes.  Steps using the editor are run in a single editor session.
+    Changes which are not staged for commit, including untracked pages, are
+    set aside while steps run so that pages are read as staged, and the
+    files written by each step are staged once all steps succeed.  If a
+    file written by a step has unstaged changes, the hook fails instead.
+
+    With --index-only, staged pages are read from the object store and
+    results are written to the index without starting the editor; generated
+    files in the working tree are only updated if they have no unstaged
+    changes.  Tag links and HTML are not supported in this mode.
+    """
+    try:
+        config = git.get_config('vimwiki')
+        wiki = ctx.ensure_object(Wiki)
+        if config.get('options'):
+            wiki = parse_options(ctx, config['options'])
+
+        engine = engine or config.get('engine') or Wiki.DEFAULT_ENGINE
+        if engine not in Wiki.ENGINES:
+            raise click.UsageError('invalid vimwiki.engine %r' % engine)
+
+        # Unless a wiki is selected, the repository is assumed to be the wiki:
+        path = git.toplevel()
+        if not wiki.has_option('path') and not wiki.has_option('count'):
+            wiki = wiki.replace(path=path)
+
+        files = git.staged_files(path)
+        pages = staged_pages(wiki, files)
+        if not pages:
+            if any(filename.endswith(wiki.ext) for _, filename in files):
+                logger.warning('No pages staged for commit are in the wiki at %s; '
+                               'set vimwiki.options to select the wiki', wiki.path)
+            return
+
+        if index_only or config_enabled(config, 'indexonly'):
+            from .staged import StagedWiki
+
+            with StagedWiki(wiki.path, wiki.ext, path) as staged:
+                steps = index_steps(wiki, config, pages, staged)
+                if report(run_steps(wiki, steps)):
+                    staged.commit()
+                    return
+        else:
+            steps = pre_commit_steps(wiki, config, engine, pages)
+            outputs = [filename for step in steps for filename in step.outputs]
+            if not check_outputs(path, outputs):
+                ctx.exit(1)
+
+            with git.keep_index(path, [wiki.path]):
+                succeeded = report(run_steps(wiki, steps))
+                if succeeded:
+                    git.add(path, outputs)
+
+            if succeeded:
+                return
+
+        ctx.exit(1)
+    except git.GitError as e:
+        raise click.ClickException(str(e))
+
+
+def parse_options(ctx, options):
+    """Return Wiki for the global options given in options as a string."""
+    root = ctx.find_root()
+    command = click.Command(root.info_name, params=root.command.params,
+                            context_settings=root.command.context_settings)
+    try:
+        with command.make_context(root.info_name, shlex.split(options)) as sub_ctx:
+            kwargs = dict(sub_ctx.params)
+    except click.UsageError as e:
+        raise click.UsageError('invalid vimwiki.options: %s' % e.message, ctx)
+
+    for key in ('verbose', 'timings', 'trace'):
+        kwargs.pop(key, None)
+
+    return Wiki(**kwargs)
+
+
+def config_enabled(config, key):
+    """Return True if the boolean option key is set in config."""
+    return key in config and git.config_bool(config[key])
+
+
+def staged_pages(wiki, files):
+    """Return a dict mapping each page of wiki staged for commit to its
+    status, given a list of (status, filename) from git.staged_files().
+    """
+    from .pages import page_name
+
+    root = os.path.join(os.path.realpath(wiki.path), '')
+    return {page_name(root, filename, wiki.ext): status
+            for status, filename in files
+            if filename.startswith(root) and filename.endswith(wiki.ext)}
+
+
+def check_outputs(path, outputs):
+    """Return True if none of outputs, files or directories written by
+    steps, have changes which are not staged for commit in the working tree
+    rooted at path; otherwise each such file is reported.  Staging these
+    files would commit changes the user did not stage.
+    """
+    outputs = [os.path.realpath(output) for output in outputs]
+    modified, untracked = git.unstaged_files(path, outputs)
+
+    dirty = [filename for filename in modified + untracked
+             if any(filename == output or filename.startswith(os.path.join(output, ''))
+                    for output in outputs)]
+    for filename in dirty:
+        logger.error('%s has changes not staged for commit; stage or stash them first',
+                     os.path.relpath(filename))
+
+    return not dirty
+
+
+def affected(config, pages, diary_rel_path):
+    """Return a list of the steps enabled in config which are affected by
+    pages, a dict returned by staged_pages().  Diary pages are those in the
+    diary directory diary_rel_path.
+    """
+    from .pages import is_diary_page
+
+    added_or_removed = bool(set(pages.values()) & {'A', 'D'})
+    diary_changed = any(is_diary_page(page, diary_rel_path) for page in pages)
+    steps = [('generatelinks', added_or_removed),
+             ('generatediarylinks', diary_changed),
+             ('rebuildtags', bool(pages)),
+             ('generatetaglinks', bool(pages)),
+             ('allhtml', bool(pages))]
+
+    return [key for key, changed in steps if changed and config_enabled(config, key)]
+
+
+def pre_commit_steps(wiki, config, engine, pages):
+    """Return a list of Step enabled in config which are affected by pages
+    staged for commit.  Steps which the engine does not support are run in
+    the editor.
+    """
+    from .listing import DIARY_INDEX
+    from .metadata import METADATA_FILE
+
+    links_page = config.get('linkspage') or 'index'
+    tag_links_page = config.get('taglinkspage') or 'index'
+    html_engine = engine if wiki.syntax == 'default' else Wiki.DEFAULT_ENGINE
+    only = [wiki.page_filename(page) for page in pages] if engine == 'native' else ()
+
+    steps = {
+        'generatelinks': Step('generate-links ' + links_page, engine,
+                              functools.partial(wiki.generate_links, links_page,
+                                                engine=engine),
+                              [wiki.page_filename(links_page)]),
+        'generatediarylinks': Step('diary generate-links', engine,
+                                   functools.partial(wiki.diary_generate_links, engine=engine),
+                                   [wiki.page_filename(wiki.diary_rel_path + '/' + DIARY_INDEX)]),
+        'rebuildtags': Step('tags rebuild', engine,
+                            functools.partial(wiki.rebuild_tags, engine=engine, only=only),
+                            [os.path.join(wiki.path, METADATA_FILE)]),
+        'generatetaglinks': Step('tags generate-links ' + tag_links_page, Wiki.DEFAULT_ENGINE,
+                                 functools.partial(wiki.generate_tag_links, tag_links_page),
+                                 [wiki.page_filename(tag_links_page)]),
+        'allhtml': Step('all-html', html_engine,
+                        functools.partial(wiki.all_html, engine=html_engine),
+                        [wiki.path_html])
+    }
+
+    return [steps[key] for key in affected(config, pages, wiki.diary_rel_path)]
+
+
+def index_steps(wiki, config, pages, staged):
+    """Return a list of Step enabled in config which are affected by pages
+    staged for commit, run against staged, a StagedWiki.  Raises
+    click.UsageError if a step requires the working tree.
+    """
+    from . import staged as index
+
+    links_page = config.get('linkspage') or 'index'
+    steps = {
+        'generatelinks': Step('generate-links ' + links_page, INDEX_ENGINE,
+                              functools.partial(index.generate_links, staged, wiki.syntax,
+                                                links_page,
+                                                diary_rel_path=wiki.diary_rel_path,
+                                                bullet=wiki.bullet), []),
+        'generatediarylinks': Step('diary generate-links', INDEX_ENGINE,
+                                   functools.partial(index.diary_generate_links, staged,
+                                                     wiki.syntax, wiki.diary_rel_path,
+                                                     wiki.bullet), []),
+        'rebuildtags': Step('tags rebuild', INDEX_ENGINE,
+                            functools.partial(index.rebuild_tags, staged, wiki.syntax,
+                                              list(pages)), [])
+    }
+
+    keys = affected(config, pages, wiki.diary_rel_path)
+    for key in keys:
+        if key not in steps:
+            raise click.UsageError('vimwiki.%s is not supported with --index-only' % key)
+
+    return [steps[key] for key in keys]
+
+
+def run_steps(wiki, steps):
+    """Run steps in order and return a list of (step, error) where error is
+    None on success.  Consecutive steps using the editor are run in a
+    single editor session.
+    """
+    results = []
+    for engine, group in itertools.groupby(steps, key=lambda step: step.engine):
+        if engine != 'vim':
+            for step in group:
+                try:
+                    step.run()
+                    results.append((step, None))
+                except (OSError, git.GitError) as e:
+                    results.append((step, str(e)))
+            continue
+
+        indexes = []
+        with wiki.batch() as queue:
+            for step in group:
+                start = len(queue)
+                step.run()
+                indexes.append((step, start, len(queue)))
+
+        batch_results = queue.run()
+        for step, start, end in indexes:
+            errors = [result.error for result in batch_results[start:end] if result.error]
+            results.append((step, '; '.join(errors) or None))
+
+    return results
+
+
+def report(results):
+    """Report the result of each step.  Returns True if all steps
+    succeeded.
+    """
+    succeeded = True
+    for step, error in results:
+        if error:
+            logger.error('%s: %s', step.name, error)
+            succeeded = False
+        else:
+            click.echo('%s: ok' % step.name)
+
+    return succeeded
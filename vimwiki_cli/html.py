@@ -0,0 +1,704 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import datetime
+import functools
+import hashlib
+import html
+import logging
+import os
+import re
+
+from .cache import atomic_write, cache_dir, load_json, save_json, update_file
+from .pages import DIARY_REL_PATH, diff_pages, iter_pages, map_pages, select_pages
+from .syntax import get_syntax, read_lines
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'html.json'
+MANIFEST_VERSION = 2
+
+TEMPLATE_DEFAULT = 'default'
+TEMPLATE_EXT = '.tpl'
+CSS_NAME = 'style.css'
+
+# Template used if no template file is found; this matches the template
+# built into Vimwiki:
+DEFAULT_TEMPLATE = """\
+<!DOCTYPE html>
+<html>
+<head>
+<link rel="Stylesheet" type="text/css" href="%root_path%%css%">
+<title>%title%</title>
+<meta http-equiv="Content-Type" content="text/html; charset=%encoding%">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+</head>
+<body>
+<div class="content">
+%content%
+</div>
+</body>
+</html>
+"""
+
+# Stylesheet written to the output directory if one does not already exist:
+DEFAULT_CSS = """\
+body {font-family: Tahoma, Geneva, sans-serif; margin: 1em 2em 1em 2em; font-size: 100%; \
+line-height: 130%;}
+h1, h2, h3, h4, h5, h6 {font-family: Trebuchet MS, Helvetica, sans-serif; font-weight: bold; \
+line-height:100%; margin-top: 1.5em; margin-bottom: 0.5em;}
+h1 {font-size: 2em; color: #000000;}
+h2 {font-size: 1.8em; color: #404040;}
+h3 {font-size: 1.6em; color: #707070;}
+h4 {font-size: 1.4em; color: #909090;}
+h5 {font-size: 1.2em; color: #989898;}
+h6 {font-size: 1em; color: #9c9c9c;}
+p, pre, blockquote, table, ul, ol, dl {margin-top: 1em; margin-bottom: 1em;}
+ul ul, ul ol, ol ol, ol ul {margin-top: 0.5em; margin-bottom: 0.5em;}
+li {margin: 0.3em auto;}
+ul {margin-left: 2em; padding-left: 0.5em;}
+dt {font-weight: bold;}
+img {border: none;}
+pre {border-left: 5px solid #dcdcdc; background-color: #f5f5f5; padding-left: 1em; \
+font-family: Monaco, Andale Mono, Courier New, monospace; font-size: 0.8em; border-radius: 6px;}
+p > a {color: white; text-decoration: none; font-size: 0.7em; padding: 3px 6px; \
+border-radius: 3px; background-color: #1e90ff; text-transform: uppercase; font-weight: bold;}
+p > a:hover {color: #dcdcdc; background-color: #484848;}
+li > a {color: #1e90ff; font-weight: bold; text-decoration: none;}
+li > a:hover {color: #ff4500;}
+blockquote {color: #686868; font-size: 0.8em; line-height: 120%; padding: 0.8em; \
+border-left: 5px solid #dcdcdc;}
+th, td {border: 1px solid #ccc; padding: 0.3em;}
+th {background-color: #f0f0f0;}
+hr {border: none; border-top: 1px solid #ccc; width: 100%;}
+del {text-decoration: line-through; color: #777777;}
+.toc li {list-style-type: none;}
+.todo {font-weight: bold; background-color: #f0ece8; color: #a03020;}
+.justleft {text-align: left;}
+.justright {text-align: right;}
+.justcenter {text-align: center;}
+.center {margin-left: auto; margin-right: auto;}
+.tag {background-color: #eeeeee; font-family: monospace; padding: 2px;}
+.header a {text-decoration: none; color: inherit;}
+.done0:before {content: '\\2592\\2592\\2592\\2592'; color: SkyBlue;}
+.done1:before {content: '\\2588\\2592\\2592\\2592'; color: SkyBlue;}
+.done2:before {content: '\\2588\\2588\\2592\\2592'; color: SkyBlue;}
+.done3:before {content: '\\2588\\2588\\2588\\2592'; color: SkyBlue;}
+.done4:before {content: '\\2588\\2588\\2588\\2588'; color: SkyBlue;}
+.rejected:before {content: '\\2716\\2716\\2716\\2716'; color: SkyBlue;}
+.done0, .done1, .done2, .done3, .done4, .rejected {list-style: none;}
+"""
+
+# A bare %date renders the date of conversion, in which case dated is set:
+Document = collections.namedtuple('Document', ['content', 'title', 'date', 'dated', 'template',
+                                               'nohtml'])
+
+HtmlOptions = collections.namedtuple('HtmlOptions', ['path_html', 'templates', 'ext',
+                                                     'diary_rel_path'])
+
+# HTML tags which may be used in wiki pages without being escaped:
+VALID_HTML_TAGS = ('b', 'i', 's', 'u', 'sub', 'sup', 'kbd', 'br', 'hr')
+
+# Symbols used for list item checkboxes, in order of progress:
+LISTSYMS = ' .oOX'
+LISTSYM_REJECTED = '-'
+
+TODO_KEYWORDS = ('TODO', 'DONE', 'STARTED', 'FIXME', 'FIXED', 'XXX')
+
+# Regular expressions are translated from those used by Vimwiki for the
+# default syntax (see autoload/vimwiki/vars.vim and html.vim):
+_SYNTAX = get_syntax('default')
+_VALID_HTML_TAG = re.compile(r'&lt;(/?(?:%s)\b[^&]*?)&gt;' % '|'.join(VALID_HTML_TAGS))
+_INLINE = re.compile('|'.join([
+    r'(?P<code>`(?P<code_text>[^`]+)`)',
+    r'(?P<math>(?<![\\$])\$(?P<math_text>[^$`]+)\$)',
+    r'(?P<wikilink>\[\[(?P<link_target>[^\]|]*)(?:\|(?P<link_desc>.*?))?\]\])',
+    r'(?P<transclusion>\{\{(?P<src>[^}|]*)(?:\|(?P<alt>[^}|]*))?(?:\|(?P<style>[^}]*))?\}\})',
+    r'(?P<url>\b(?:(?:https?|ftp|file)://|mailto:|www\.)[^\s<>"]*[^\s<>"\'.,;:!?)\]])',
+    r'(?P<tag>%s)' % _SYNTAX.tag.pattern.replace('((', '(?:(', 1),
+    r'(?P<todo>\b(?:%s)\b)' % '|'.join(TODO_KEYWORDS),
+    r'(?P<strong>(?<!\w)\*(?P<strong_text>[^*`\s](?:[^*`]*[^*`\s])?)\*(?!\w))',
+    r'(?P<em>(?<!\w)_(?P<em_text>[^_`\s](?:[^_`]*[^_`\s])?)_(?!\w))',
+    r'(?P<del>~~(?P<del_text>[^~`]+)~~)',
+    r'(?P<sup>\^(?P<sup_text>[^^`]+)\^)',
+    r'(?P<sub>,,(?P<sub_text>[^,`]+),,)'
+]))
+_SCHEME = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+_PLACEHOLDER = re.compile(r'^\s*%(nohtml|title|date|template)(?:\s+(.*?))?\s*$')
+_COMMENT = re.compile(r'^\s*%%')
+_PRE_START = re.compile(r'^\s*\{\{\{(.*)$')
+_MATH_START = re.compile(r'^\s*\{\{\$(?:%(.*)%)?\s*$')
+_MATH_END = re.compile(r'^\s*\}\}\$\s*$')
+_HR = re.compile(r'^-{4,}\s*$')
+_LIST = re.compile(r'^(\s*)([-*#]|\d+[.)]|[a-zA-Z]\))\s+(?:\[([^\]])\](?:\s+|$))?(.*)$')
+_DEFINITION = re.compile(r'^(.*?)::(?:\s+(.*))?$')
+_TABLE = re.compile(r'^\s*\|.*\|\s*$')
+_TABLE_CELL = re.compile(r'\|(?![^\[]*\]\])')
+_TABLE_SEPARATOR = re.compile(r'^\s*:?-+:?\s*$')
+_QUOTE = re.compile(r'^(?:\s{4,}|\t)(\S.*)$')
+_TEMPLATE_VAR = re.compile(r'%(title|date|root_path|wiki_path|css|encoding|content)%')
+
+
+def escape(text):
+    """Escape text for use in HTML, leaving valid HTML tags intact."""
+    text = html.escape(text, quote=False)
+    if '&lt;' in text:
+        text = _VALID_HTML_TAG.sub(r'<\1>', text)
+
+    return text
+
+
+def _url(target, root_path, suffix='.html', diary_rel_path=DIARY_REL_PATH):
+    if target.startswith('diary:'):
+        target = '/%s/%s' % (diary_rel_path, target[len('diary:'):])
+    elif target.startswith('local:') or target.startswith('file:'):
+        return target.split(':', 1)[1]
+    elif _SCHEME.match(target):
+        return target
+
+    page, sep, anchor = target.partition('#')
+    if page.startswith('/'):
+        page = root_path + page.lstrip('/')
+    if page and not page.endswith('/'):
+        page += suffix
+
+    return page + sep + anchor
+
+
+def _image(src, alt=None, style=None, root_path='', diary_rel_path=DIARY_REL_PATH):
+    attrs = ' src="%s"' % html.escape(_url(src.strip(), root_path, '', diary_rel_path))
+    if alt:
+        attrs += ' alt="%s"' % html.escape(alt)
+    if style:
+        attrs += ' style="%s"' % html.escape(style)
+
+    return '<img%s />' % attrs
+
+
+def _render(match, root_path, diary_rel_path):
+    kind = match.lastgroup
+    if kind == 'code':
+        return '<code>%s</code>' % html.escape(match.group('code_text'), quote=False)
+    elif kind == 'math':
+        return '\\(%s\\)' % html.escape(match.group('math_text'), quote=False)
+    elif kind == 'wikilink':
+        target = match.group('link_target').strip()
+        desc = match.group('link_desc')
+        desc = inline(desc, root_path, diary_rel_path) if desc else escape(target)
+        url = _url(target, root_path, diary_rel_path=diary_rel_path)
+        return '<a href="%s">%s</a>' % (html.escape(url), desc)
+    elif kind == 'transclusion':
+        return _image(match.group('src'), match.group('alt'), match.group('style'), root_path,
+                      diary_rel_path)
+    elif kind == 'url':
+        url = match.group('url')
+        href = 'http://' + url if url.startswith('www.') else url
+        return '<a href="%s">%s</a>' % (html.escape(href), escape(url))
+    elif kind == 'tag':
+        return ' '.join('<span id="%s" class="tag">%s</span>' % (html.escape(tag), escape(tag))
+                        for tag in match.group(kind).strip(':').split(':'))
+    elif kind == 'todo':
+        return '<span class="todo">%s</span>' % match.group(kind)
+
+    text = inline(match.group(kind + '_text'), root_path, diary_rel_path)
+    return '<{0}>{1}</{0}>'.format(kind, text)
+
+
+def inline(text, root_path='', diary_rel_path=DIARY_REL_PATH):
+    """Convert inline markup in text to HTML.  Links to pages relative to the
+    wiki root are prefixed with root_path, and diary links refer to pages in
+    diary_rel_path.
+    """
+    result = []
+    pos = 0
+    for match in _INLINE.finditer(text):
+        result.append(escape(text[pos:match.start()]))
+        result.append(_render(match, root_path, diary_rel_path))
+        pos = match.end()
+
+    result.append(escape(text[pos:]))
+    return ''.join(result)
+
+
+class _Converter(object):
+    def __init__(self, page, diary_rel_path):
+        self.page = page
+        self.root_path = '../' * page.count('/')
+        self.diary_rel_path = diary_rel_path
+        self.output = []
+        self.placeholders = {}
+        self.paragraph = []
+        self.quote = []
+        self.table = []
+        self.lists = []
+        self.definitions = False
+        self.headers = []
+        self.pre = None
+
+    def inline(self, text):
+        return inline(text, self.root_path, self.diary_rel_path)
+
+    def close_paragraph(self):
+        if self.paragraph:
+            self.output.append('<p>')
+            self.output.extend(self.inline(line) for line in self.paragraph)
+            self.output.append('</p>')
+            self.paragraph = []
+
+    def close_quote(self):
+        if self.quote:
+            self.output.append('<blockquote>')
+            self.output.extend(self.inline(line) for line in self.quote)
+            self.output.append('</blockquote>')
+            self.quote = []
+
+    def close_lists(self, indent=-1):
+        while self.lists and self.lists[-1][0] > indent:
+            self.output.append('</li>')
+            self.output.append('</%s>' % self.lists.pop()[1])
+
+    def close_definitions(self):
+        if self.definitions:
+            self.output.append('</dl>')
+            self.definitions = False
+
+    def close_table(self):
+        if not self.table:
+            return
+
+        rows = [[cell.strip() for cell in _TABLE_CELL.split(line.strip()[1:-1])]
+                for line in self.table]
+        header = 0
+        for i, row in enumerate(rows):
+            if all(_TABLE_SEPARATOR.match(cell) for cell in row):
+                header = i
+                del rows[i]
+                break
+
+        # Cells are [text, colspan, rowspan]; cells spanned by another cell
+        # are replaced by None:
+        grid = []
+        for row in rows:
+            cells = []
+            for col, text in enumerate(row):
+                if text == '>' and cells:
+                    left = next((cell for cell in reversed(cells) if cell), None)
+                    if left:
+                        left[1] += 1
+                        cells.append(None)
+                        continue
+                elif text == '\\/' and grid:
+                    above = next((r[col] for r in reversed(grid)
+                                  if col < len(r) and r[col]), None)
+                    if above:
+                        above[2] += 1
+                        cells.append(None)
+                        continue
+                cells.append([text, 1, 1])
+            grid.append(cells)
+
+        center = self.table[0][:1].isspace()
+        self.output.append('<table class="center">' if center else '<table>')
+        for i, cells in enumerate(grid):
+            if header and i == 0:
+                self.output.append('<thead>')
+            elif i == header:
+                self.output.append('<tbody>')
+
+            self.output.append('<tr>')
+            tag = 'th' if i < header else 'td'
+            for cell in filter(None, cells):
+                text, colspan, rowspan = cell
+                attrs = ''
+                if colspan > 1:
+                    attrs += ' colspan="%d"' % colspan
+                if rowspan > 1:
+                    attrs += ' rowspan="%d"' % rowspan
+                self.output.append('<{0}{1}>{2}</{0}>'.format(tag, attrs, self.inline(text)))
+            self.output.append('</tr>')
+
+            if header and i == header - 1:
+                self.output.append('</thead>')
+        if len(grid) > header:
+            self.output.append('</tbody>')
+
+        self.output.append('</table>')
+        self.table = []
+
+    def close_blocks(self):
+        self.close_paragraph()
+        self.close_quote()
+        self.close_table()
+        self.close_lists()
+        self.close_definitions()
+
+    def header(self, match, centered):
+        level = len(match.group(1))
+        text = match.group(2).strip()
+        del self.headers[level - 1:]
+        self.headers.extend([''] * (level - 1 - len(self.headers)))
+        self.headers.append(text)
+
+        anchor = html.escape('-'.join(filter(None, self.headers)))
+        self.output.append('<div id="{0}"><h{1} id="{2}" class="header{3}">'
+                           '<a href="#{0}">{4}</a></h{1}></div>'.format(
+                               anchor, level, html.escape(text),
+                               ' justcenter' if centered else '', self.inline(text)))
+
+    def list_item(self, match):
+        indent = len(match.group(1).expandtabs())
+        marker, checkbox, text = match.group(2, 3, 4)
+        tag = 'ul' if marker in ('-', '*') else 'ol'
+
+        self.close_lists(indent)
+        if self.lists and self.lists[-1][0] == indent:
+            self.output.append('</li>')
+            if self.lists[-1][1] != tag:
+                self.output.append('</%s>' % self.lists.pop()[1])
+
+        if not self.lists or self.lists[-1][0] < indent:
+            self.output.append('<%s>' % tag)
+            self.lists.append((indent, tag))
+
+        attrs = ''
+        if checkbox == LISTSYM_REJECTED:
+            attrs = ' class="rejected"'
+        elif checkbox is not None and checkbox in LISTSYMS:
+            attrs = ' class="done%d"' % LISTSYMS.index(checkbox)
+        self.output.append('<li%s>%s' % (attrs, self.inline(text)))
+
+    def definition(self, match):
+        term, definition = match.groups()
+        if not self.definitions:
+            self.output.append('<dl>')
+            self.definitions = True
+        if term.strip():
+            self.output.append('<dt>%s</dt>' % self.inline(term.strip()))
+        if definition:
+            self.output.append('<dd>%s</dd>' % self.inline(definition.strip()))
+
+    def line(self, line):
+        if self.pre is not None:
+            end = _SYNTAX.pre_end if self.pre == 'pre' else _MATH_END
+            if end.match(line):
+                self.output.append('</pre>' if self.pre == 'pre' else '\\]')
+                self.pre = None
+            else:
+                self.output.append(html.escape(line, quote=False))
+            return
+
+        match = _PLACEHOLDER.match(line)
+        if match:
+            self.placeholders[match.group(1)] = match.group(2) or ''
+            return
+        elif _COMMENT.match(line):
+            return
+
+        if not line.strip():
+            self.close_blocks()
+            return
+
+        match = _PRE_START.match(line)
+        if match:
+            self.close_blocks()
+            attrs = match.group(1).strip()
+            self.output.append('<pre %s>' % attrs if attrs else '<pre>')
+            self.pre = 'pre'
+            return
+
+        match = _MATH_START.match(line)
+        if match:
+            self.close_blocks()
+            self.output.append('\\[')
+            self.pre = 'math'
+            return
+
+        match = _SYNTAX.header.match(line)
+        if match:
+            self.close_blocks()
+            self.header(match, line[:1].isspace())
+            return
+
+        if _HR.match(line):
+            self.close_blocks()
+            self.output.append('<hr />')
+            return
+
+        if _TABLE.match(line):
+            self.close_paragraph()
+            self.close_quote()
+            self.close_lists()
+            self.close_definitions()
+            self.table.append(line)
+            return
+        self.close_table()
+
+        match = _LIST.match(line)
+        if match:
+            self.close_paragraph()
+            self.close_quote()
+            self.close_definitions()
+            self.list_item(match)
+            return
+
+        indent = len(line) - len(line.lstrip())
+        if self.lists and indent > self.lists[-1][0]:
+            self.output.append(self.inline(line.strip()))
+            return
+        self.close_lists()
+
+        match = _DEFINITION.match(line)
+        if match:
+            self.close_paragraph()
+            self.close_quote()
+            self.definition(match)
+            return
+        self.close_definitions()
+
+        match = _QUOTE.match(line)
+        if match:
+            self.close_paragraph()
+            self.quote.append(match.group(1))
+            return
+        self.close_quote()
+
+        self.paragraph.append(line.strip())
+
+    def convert(self, lines):
+        for line in lines:
+            self.line(line)
+
+        if self.pre is not None:
+            self.output.append('</pre>' if self.pre == 'pre' else '\\]')
+        self.close_blocks()
+
+        placeholders = self.placeholders
+        title = placeholders.get('title') or self.page.rsplit('/', 1)[-1]
+        date = placeholders.get('date')
+        dated = date == ''
+        if dated:
+            date = datetime.date.today().isoformat()
+
+        return Document(content=self.output,
+                        title=title,
+                        date=date or '',
+                        dated=dated,
+                        template=placeholders.get('template') or TEMPLATE_DEFAULT,
+                        nohtml='nohtml' in placeholders)
+
+
+def convert(lines, page, diary_rel_path=DIARY_REL_PATH):
+    """Convert lines of page written in the default syntax to HTML.  Returns
+    a Document containing the converted lines and placeholder values.
+    """
+    return _Converter(page, diary_rel_path).convert(lines)
+
+
+def read_templates(template_path):
+    """Return a mapping of template name to text for the templates found in
+    template_path.
+    """
+    templates = {}
+    try:
+        names = os.listdir(template_path)
+    except FileNotFoundError:
+        return templates
+
+    for name in names:
+        if name.endswith(TEMPLATE_EXT):
+            with open(os.path.join(template_path, name), encoding='utf-8') as f:
+                templates[name[:-len(TEMPLATE_EXT)]] = f.read()
+
+    return templates
+
+
+def template_hash(templates, name):
+    """Return hash of the text of template name."""
+    text = templates.get(name, DEFAULT_TEMPLATE)
+    return hashlib.sha1(text.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+def render_page(document, page, ext, template):
+    """Return HTML for page by substituting document into template."""
+    values = {
+        'title': html.escape(document.title, quote=False),
+        'date': document.date,
+        'root_path': '../' * page.count('/'),
+        'wiki_path': page + ext,
+        'css': CSS_NAME,
+        'encoding': 'utf-8',
+        'content': '\n'.join(document.content)
+    }
+    return _TEMPLATE_VAR.sub(lambda match: values[match.group(1)], template)
+
+
+def html_filename(path_html, page):
+    """Return filename of the HTML file for page."""
+    return os.path.join(path_html, *page.split('/')) + '.html'
+
+
+def convert_file(item, options):
+    """Convert an item of (page, filename) to HTML.  Returns (template,
+    written, date), where template is the name of the template used or None
+    if the page is excluded from conversion by %nohtml, written is set if
+    the HTML file was modified, and date is the date rendered for a bare
+    %date or None.
+    """
+    page, filename = item
+    document = convert(read_lines(filename), page, options.diary_rel_path)
+    if document.nohtml:
+        return None, False, None
+
+    template = options.templates.get(document.template)
+    if template is None:
+        logger.debug('Template %s not found, using default template', document.template)
+        template = DEFAULT_TEMPLATE
+
+    output = html_filename(options.path_html, page)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    written = update_file(output, render_page(document, page, options.ext, template))
+    return document.template, written, document.date if document.dated else None
+
+
+def _delete_html_file(filename):
+    logger.debug('Deleting %s', filename)
+    try:
+        os.unlink(filename)
+    except FileNotFoundError:
+        pass
+
+
+def _delete_html_files(path_html, pages, user_htmls=()):
+    for root, dirs, files in os.walk(path_html):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if not name.endswith('.html') or name.startswith('.') or name in user_htmls:
+                continue
+            filename = os.path.join(root, name)
+            page = os.path.relpath(filename, path_html)[:-len('.html')].replace(os.sep, '/')
+            if page not in pages:
+                _delete_html_file(filename)
+
+
+def load_manifest(path, ext, path_html, diary_rel_path=DIARY_REL_PATH):
+    """Return manifest of converted files for the wiki rooted at path.  The
+    manifest maps each page to the stat and content hash of its file when
+    last converted along with the name and hash of the template used and
+    the date rendered for a bare %date.
+    """
+    manifest = load_json(os.path.join(cache_dir(path), MANIFEST_FILE), {})
+    if manifest.get('version') != MANIFEST_VERSION or \
+            manifest.get('ext') != ext or manifest.get('path_html') != path_html or \
+            manifest.get('diary_rel_path') != diary_rel_path:
+        return None
+
+    return manifest['files']
+
+
+def save_manifest(path, ext, path_html, files, diary_rel_path=DIARY_REL_PATH):
+    save_json(os.path.join(cache_dir(path), MANIFEST_FILE), {
+        'version': MANIFEST_VERSION,
+        'ext': ext,
+        'path_html': path_html,
+        'diary_rel_path': diary_rel_path,
+        'files': files
+    })
+
+
+def _is_stale(page, entry, templates, path_html, today):
+    if entry['template'] is None:
+        return False
+
+    # Pages with a bare %date are converted again once the date changes:
+    return entry['template_hash'] != template_hash(templates, entry['template']) or \
+        entry['date'] not in (None, today) or \
+        not os.path.exists(html_filename(path_html, page))
+
+
+def all_html(path, ext, path_html, template_path, all=False, only=(), jobs=None,
+             diary_rel_path=DIARY_REL_PATH, user_htmls=()):
+    """Convert pages of the wiki rooted at path to HTML in path_html.  Unless
+    all is set, only pages whose content or template has changed since the
+    last conversion are converted.  HTML files whose content would not
+    change are left untouched, and HTML files without a corresponding page
+    are deleted unless named in user_htmls.  If only is given, no other
+    files are considered.  Returns the number of pages converted.
+    """
+    files = load_manifest(path, ext, path_html, diary_rel_path)
+    modified = files is None
+    if files is None:
+        files = {}
+
+    os.makedirs(path_html, exist_ok=True)
+    if only:
+        pages, missing = select_pages(path, ext, only)
+        for page in missing:
+            filename = html_filename(path_html, page)
+            if os.path.basename(filename) not in user_htmls:
+                _delete_html_file(filename)
+    else:
+        pages = dict(iter_pages(path, ext))
+        missing = set(files) - set(pages)
+        _delete_html_files(path_html, pages, user_htmls)
+
+    for page in missing & set(files):
+        del files[page]
+        modified = True
+
+    known = {page: (entry['stat'], entry['hash']) for page, entry in files.items()}
+    changed, touched = diff_pages(pages, known, jobs)
+    for page, (stat, _) in touched.items():
+        files[page]['stat'] = stat
+
+    templates = read_templates(template_path)
+    today = datetime.date.today().isoformat()
+    stale = set(changed)
+    stale.update(page for page, entry in files.items()
+                 if page in pages and (all or _is_stale(page, entry, templates, path_html,
+                                                        today)))
+
+    logger.debug('Converting %d of %d pages in %s', len(stale), len(pages), path)
+    items = [(page, pages[page]) for page in sorted(stale)]
+    options = HtmlOptions(path_html=path_html, templates=templates, ext=ext,
+                          diary_rel_path=diary_rel_path)
+    results = map_pages(functools.partial(convert_file, options=options), items, jobs)
+
+    converted = written = 0
+    for (page, _), (template, page_written, date) in zip(items, results):
+        stat, digest = changed.get(page) or (files[page]['stat'], files[page]['hash'])
+        files[page] = {'stat': stat, 'hash': digest, 'template': template,
+                       'template_hash': template and template_hash(templates, template),
+                       'date': date}
+        converted += template is not None
+        written += page_written
+
+    css = os.path.join(path_html, CSS_NAME)
+    if not os.path.exists(css):
+        atomic_write(css, DEFAULT_CSS)
+
+    if modified or stale or touched:
+        save_manifest(path, ext, path_html, files, diary_rel_path)
+
+    logger.debug('Wrote %d of %d converted pages', written, converted)
+    return converted
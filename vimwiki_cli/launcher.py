@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import os
+import sys
+
+ENVVAR_PREFIX = 'VIMWIKI_'
+
+# Set by shell completion scripts, which are answered by the CLI:
+COMPLETE_VAR = '_VIMWIKI_COMPLETE'
+
+# Interactive commands which only replace the running process with the
+# editor are launched without loading the command line interface, so that
+# opening the editor is not delayed by importing click or native commands.
+# Editor arguments must match those built by GlobalCommand:
+FAST_COMMANDS = {
+    (): 'VimwikiIndex',
+    ('diary',): 'VimwikiDiaryIndex',
+    ('diary', 'today'): 'VimwikiMakeDiaryNote',
+    ('diary', 'tomorrow'): 'VimwikiMakeTomorrowDiaryNote',
+    ('diary', 'yesterday'): 'VimwikiMakeYesterdayDiaryNote'
+}
+
+_TRUE = ('1', 'true', 't', 'yes', 'y', 'on')
+_FALSE = ('', '0', 'false', 'f', 'no', 'n', 'off')
+
+
+def _getenv(name):
+    # Empty environment variables are ignored, as by click:
+    return os.getenv(ENVVAR_PREFIX + name) or None
+
+
+def _flag(name):
+    value = (_getenv(name) or '').strip().lower()
+    if value not in _TRUE + _FALSE:
+        raise ValueError('invalid flag: %s' % value)
+
+    return value in _TRUE
+
+
+def fast_args(args):
+    """Return editor arguments for the command line args if it names one of
+    FAST_COMMANDS, otherwise None.  Only the global options which affect
+    these commands are supported; any other option, or an invalid value, is
+    left to the command line interface to handle.
+    """
+    try:
+        editor = _getenv('EDITOR') or os.getenv('EDITOR', 'vim')
+        count = _getenv('COUNT')
+        count = int(count) if count is not None else None
+        select = _flag('SELECT')
+        open_tabs = _flag('OPEN_TABS')
+        if _flag('VERBOSE') or _flag('TIMINGS') or _getenv('TRACE') or _getenv('WIKIS'):
+            return None
+
+        if os.getenv(COMPLETE_VAR):
+            return None
+
+        # Interactive commands are disabled, which the CLI reports:
+        if _getenv('INTERACTIVE') is not None and not _flag('INTERACTIVE'):
+            return None
+
+        args = list(args)
+        while args and args[0].startswith('-'):
+            option, equals, value = args.pop(0).partition('=')
+            if option in ('--editor', '--count'):
+                if not equals:
+                    value = args.pop(0)
+
+                if option == '--editor':
+                    editor = value
+                else:
+                    count = int(value)
+
+            elif option == '--select' and not equals:
+                select = True
+            elif option == '--open-tabs' and not equals:
+                open_tabs = True
+            else:
+                return None
+    except (IndexError, ValueError):
+        return None
+
+    command = FAST_COMMANDS.get(tuple(args))
+    if command is None:
+        return None
+
+    if count is not None:
+        commands = ['%s %d' % (command, count)]
+    elif select:
+        commands = ['VimwikiUISelect', command]
+    else:
+        commands = [command]
+
+    if open_tabs:
+        commands.insert(0, '$tabnew')
+
+    args = [editor]
+    for command in commands:
+        args.extend(['-c', command])
+
+    return args
+
+
+def main():
+    """Entry point of the vimwiki command."""
+    args = fast_args(sys.argv[1:])
+    if args is None:
+        from . import trace
+        with trace.span('import'):
+            from .__main__ import cli
+        cli()
+    else:
+        os.execvp(args[0], args)
@@ -0,0 +1,316 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import functools
+import logging
+import os
+import posixpath
+import re
+import sqlite3
+
+from .cache import cache_dir
+from .pages import (DIARY_REL_PATH, diff_pages, dirs_unchanged, files_unchanged, map_pages,
+                    scan_pages)
+from .syntax import get_syntax, read_lines
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'links.db'
+INDEX_VERSION = 3
+
+# Name of the page at the root of the wiki, which is never an orphan:
+INDEX_PAGE = 'index'
+
+Link = collections.namedtuple('Link', ['page', 'lineno', 'target'])
+
+# Links are resolved to one of the following kinds; links to other wikis,
+# URLs, and anchors within the same page are not resolved:
+PAGE = 'page'
+DIRECTORY = 'directory'
+FILE = 'file'
+
+_SCHEME = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+_INTERWIKI = re.compile(r'^(?:wiki\d+:|wn\.[^:]*:)')
+_CODE = re.compile(r'`[^`]*`')
+
+
+def resolve(target, page, ext, diary_rel_path=DIARY_REL_PATH):
+    """Return (kind, name) for a link to target from page, or None if the
+    link does not refer to a file within the wiki.  Pages and directories
+    are named relative to the wiki root, and diary links are resolved to
+    pages in diary_rel_path.
+    """
+    target = target.strip()
+    if target.startswith('diary:'):
+        target = '/%s/%s' % (diary_rel_path, target[len('diary:'):])
+    elif target.startswith('file:') or target.startswith('local:'):
+        filename = os.path.expanduser(target.split(':', 1)[1])
+        if not os.path.isabs(filename):
+            filename = posixpath.normpath(posixpath.join(posixpath.dirname(page), filename))
+        return FILE, filename
+    elif target.startswith('//'):
+        return FILE, target[1:]
+    elif _INTERWIKI.match(target) or _SCHEME.match(target):
+        return None
+
+    target = target.partition('#')[0]
+    if not target:
+        return None
+
+    if target.startswith('/'):
+        name = target.lstrip('/')
+    else:
+        name = posixpath.join(posixpath.dirname(page), target)
+    if target.endswith('/'):
+        return DIRECTORY, posixpath.normpath(name)
+    if ext and name.endswith(ext):
+        name = name[:-len(ext)]
+
+    return PAGE, posixpath.normpath(name)
+
+
+def scan_links(lines, page, syntax, ext, diary_rel_path=DIARY_REL_PATH):
+    """Return a list of (lineno, target, kind, name) for each distinct link
+    found in lines of page which refers to a file within the wiki.
+    """
+    links = []
+    resolved = {}
+    preformatted = False
+
+    for lineno, line in enumerate(lines, 1):
+        # Ignore preformatted text:
+        if preformatted:
+            preformatted = not syntax.pre_end.match(line)
+            continue
+        if syntax.pre_start.match(line):
+            preformatted = True
+            continue
+
+        if '[' not in line:
+            continue
+
+        # Links to the same target are only reported once per line:
+        targets = {next(filter(None, match.groups())): None
+                   for match in syntax.link.finditer(_CODE.sub('', line))}
+        for target in targets:
+            if target not in resolved:
+                resolved[target] = resolve(target, page, ext, diary_rel_path)
+            if resolved[target] is not None:
+                links.append((lineno, target) + resolved[target])
+
+    return links
+
+
+def scan_file(item, syntax='default', ext='', diary_rel_path=DIARY_REL_PATH):
+    """Return (page, links) for an item of (page, filename)."""
+    page, filename = item
+    return page, scan_links(read_lines(filename), page, get_syntax(syntax), ext,
+                            diary_rel_path)
+
+
+class LinkIndex(object):
+    """Persistent index of the links between pages in a wiki.  The index is
+    stored in an SQLite database in the cache directory and is updated
+    incrementally as pages change.
+    """
+
+    SCHEMA = [
+        'CREATE TABLE settings (ext TEXT, syntax TEXT, diary_rel_path TEXT)',
+        'CREATE TABLE files (id INTEGER PRIMARY KEY, page TEXT UNIQUE, '
+        'size INTEGER, mtime INTEGER, hash TEXT)',
+        'CREATE TABLE links (id INTEGER, lineno INTEGER, target TEXT, '
+        'kind TEXT, name TEXT)',
+        'CREATE INDEX links_id ON links (id)',
+        'CREATE INDEX links_name ON links (name, kind)',
+        'CREATE TABLE dirs (prefix TEXT PRIMARY KEY, mtime INTEGER)'
+    ]
+
+    def __init__(self, path, ext, syntax, diary_rel_path=DIARY_REL_PATH):
+        self._path = path
+        self._ext = ext
+        self._syntax = syntax
+        self._diary_rel_path = diary_rel_path
+
+        self._db = sqlite3.connect(os.path.join(cache_dir(path), INDEX_FILE))
+        # The index can always be rebuilt, so durability is not required:
+        self._db.execute('PRAGMA synchronous = OFF')
+        (version,) = self._db.execute('PRAGMA user_version').fetchone()
+        settings = (ext, syntax, diary_rel_path)
+        if version != INDEX_VERSION or \
+                self._db.execute('SELECT * FROM settings').fetchone() != settings:
+            self._create()
+
+    def __repr__(self):
+        return '%s(%r, %r, %r, %r)' % (self.__class__.__name__,
+                                       self._path,
+                                       self._ext,
+                                       self._syntax,
+                                       self._diary_rel_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create(self):
+        with self._db:
+            tables = self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            for (name,) in tables.fetchall():
+                self._db.execute('DROP TABLE %s' % name)
+            for statement in LinkIndex.SCHEMA:
+                self._db.execute(statement)
+            self._db.execute('INSERT INTO settings VALUES (?, ?, ?)',
+                             (self._ext, self._syntax, self._diary_rel_path))
+            self._db.execute('PRAGMA user_version = %d' % INDEX_VERSION)
+
+    def close(self):
+        self._db.close()
+
+    def update(self, jobs=None):
+        """Update index for pages which have changed since the last update.
+        Returns the number of pages scanned.
+        """
+        pages, dirs = scan_pages(self._path, self._ext)
+        ids = {}
+        known = {}
+        for id, page, size, mtime, digest in self._db.execute('SELECT * FROM files'):
+            ids[page] = id
+            known[page] = ((size, mtime), digest)
+
+        changed, touched = diff_pages(pages, known, jobs)
+        removed = [(ids[page],) for page in known if page not in pages or page in changed]
+
+        logger.debug('Scanning %d of %d pages in %s', len(changed), len(pages), self._path)
+        with self._db:
+            for table in ('files', 'links'):
+                self._db.executemany('DELETE FROM %s WHERE id = ?' % table, removed)
+            self._db.execute('DELETE FROM dirs')
+            self._db.executemany('INSERT INTO dirs VALUES (?, ?)', dirs.items())
+            self._db.executemany('UPDATE files SET size = ?, mtime = ? WHERE id = ?',
+                                 [(stat[0], stat[1], ids[page])
+                                  for page, (stat, _) in touched.items()])
+
+            items = [(page, pages[page]) for page in changed]
+            scan = functools.partial(scan_file, syntax=self._syntax, ext=self._ext,
+                                     diary_rel_path=self._diary_rel_path)
+            for page, links in map_pages(scan, items, jobs):
+                (size, mtime), digest = changed[page]
+                id = self._db.execute('INSERT INTO files (page, size, mtime, hash) '
+                                      'VALUES (?, ?, ?, ?)',
+                                      (page, size, mtime, digest)).lastrowid
+                self._db.executemany('INSERT INTO links VALUES (?, ?, ?, ?, ?)',
+                                     [(id,) + link for link in links])
+
+        return len(changed)
+
+    def is_current(self):
+        """Return True if no page has been added, removed, or modified since
+        the last update.  The mtime of each directory shows whether pages
+        were added or removed, and the stat of each known page whether it
+        was modified; no directory is walked and no page is read.
+        """
+        dirs = dict(self._db.execute('SELECT * FROM dirs'))
+        if not dirs or not dirs_unchanged(self._path, dirs):
+            return False
+
+        stats = {page: (size, mtime)
+                 for page, size, mtime in self._db.execute('SELECT page, size, mtime FROM files')}
+        return files_unchanged(self._path, self._ext, stats)
+
+    def _exists(self, kind, name):
+        if kind == FILE:
+            return os.path.exists(os.path.join(self._path, name))
+        return os.path.isdir(os.path.join(self._path, name))
+
+    def broken(self):
+        """Yield Link for each link to a page, directory, or file which does
+        not exist, in order of page and line number.
+        """
+        cursor = self._db.execute('SELECT files.page, links.lineno, links.target, '
+                                  'links.kind, links.name FROM links JOIN files USING (id) '
+                                  'WHERE links.kind != ? OR links.name NOT IN '
+                                  '(SELECT page FROM files) '
+                                  'ORDER BY files.page, links.lineno', (PAGE,))
+        for page, lineno, target, kind, name in cursor:
+            if kind == PAGE or not self._exists(kind, name):
+                yield Link(page, lineno, target)
+
+    def backlinks(self, page):
+        """Yield Link for each link to page from another page, in order of
+        page and line number.
+        """
+        cursor = self._db.execute('SELECT files.page, links.lineno, links.target '
+                                  'FROM links JOIN files USING (id) '
+                                  'WHERE links.name = ? AND links.kind = ? AND files.page != ? '
+                                  'ORDER BY files.page, links.lineno', (page, PAGE, page))
+        for row in cursor:
+            yield Link(*row)
+
+    def orphans(self):
+        """Yield each page which is not linked to from any other page, in
+        order of page.  The index page is never an orphan.
+        """
+        cursor = self._db.execute('SELECT page FROM files WHERE page != ? AND NOT EXISTS '
+                                  '(SELECT 1 FROM links WHERE links.name = files.page '
+                                  'AND links.kind = ? AND links.id != files.id) '
+                                  'ORDER BY page', (INDEX_PAGE, PAGE))
+        for (page,) in cursor:
+            yield page
+
+
+def _updated_index(path, ext, syntax, diary_rel_path):
+    # Queries only rescan the wiki once a page has been added, removed, or
+    # modified; walking and hashing every page would dominate the cost of
+    # the query:
+    index = LinkIndex(path, ext, syntax, diary_rel_path)
+    if not index.is_current():
+        index.update()
+
+    return index
+
+
+def backlinks(path, ext, syntax, page, diary_rel_path=DIARY_REL_PATH):
+    """Return a list of Link for each link to page from another page in the
+    wiki rooted at path.
+    """
+    with _updated_index(path, ext, syntax, diary_rel_path) as index:
+        return list(index.backlinks(page))
+
+
+def orphans(path, ext, syntax, diary_rel_path=DIARY_REL_PATH):
+    """Return a list of pages in the wiki rooted at path which are not
+    linked to from any other page.
+    """
+    with _updated_index(path, ext, syntax, diary_rel_path) as index:
+        return list(index.orphans())
+
+
+def check_links(path, ext, syntax, jobs=None, diary_rel_path=DIARY_REL_PATH):
+    """Return a list of Link for each broken link in the wiki rooted at path.
+    Only pages which have changed since the last check are scanned.
+    """
+    with LinkIndex(path, ext, syntax, diary_rel_path) as index:
+        index.update(jobs)
+        return list(index.broken())
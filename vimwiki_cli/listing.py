@@ -0,0 +1,320 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import itertools
+import os
+import posixpath
+import re
+
+from .cache import cache_dir, load_json, save_json, update_file
+from .pages import DIARY_REL_PATH, is_diary_page, list_pages
+from .syntax import get_syntax, read_lines
+
+LINKS_HEADER = 'Generated Links'
+
+DIARY_HEADER = 'Diary'
+DIARY_INDEX = 'diary'
+DIARY_MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                'August', 'September', 'October', 'November', 'December']
+
+DIARY_FILE = 'diary.json'
+DIARY_VERSION = 1
+
+# Captions are read from the first header found within this many lines of
+# the top of a page:
+MAX_SCAN_FOR_CAPTION = 5
+
+# Templates are translated from those used by Vimwiki for each supported
+# syntax (see autoload/vimwiki/vars.vim):
+HEADER_CHARS = {
+    'default': '=',
+    'markdown': '#',
+    'media': '='
+}
+
+LINK_TEMPLATES = {
+    'default': ('[[{url}]]', '[[{url}|{description}]]'),
+    'markdown': ('[{url}]({url})', '[{description}]({url})'),
+    'media': ('[[{url}]]', '[[{url}|{description}]]')
+}
+
+# Lists are generated using the first of the list markers configured for
+# each wiki, which default to those used by Vimwiki for each syntax:
+DEFAULT_BULLETS = {
+    'default': '-',
+    'markdown': '-',
+    'media': '*'
+}
+
+_LIST_ITEM = re.compile(r'^(\s*)(?:[-*#+]|\d+[.)])\s')
+_GLOB = re.compile(r'\*\*/|\*\*|\*|\?|\[!?\]?[^]]*\]')
+_DIARY_DATE = re.compile(r'^(\d{4})-(0[1-9]|1[0-2])-\d\d')
+
+
+def format_header(text, level, syntax):
+    """Return header of level formatted for syntax."""
+    chars = HEADER_CHARS.get(syntax, HEADER_CHARS['default']) * level
+    if chars[0] == '#':
+        return '%s %s' % (chars, text)
+
+    return '%s %s %s' % (chars, text, chars)
+
+
+def default_bullet(syntax):
+    """Return the list marker used by Vimwiki for syntax."""
+    return DEFAULT_BULLETS.get(syntax, DEFAULT_BULLETS['default'])
+
+
+def format_link(url, syntax, description=None):
+    """Return link to url formatted for syntax."""
+    templates = LINK_TEMPLATES.get(syntax, LINK_TEMPLATES['default'])
+    template = templates[0] if description is None else templates[1]
+    return template.format(url=url, description=description)
+
+
+def update_listing(lines, header, generate, syntax, content=_LIST_ITEM, default=None):
+    """Return lines with the listing following header replaced by the lines
+    returned by generate, which is called with the list margin.  Blank lines
+    and lines matching content following header belong to the listing.  If
+    header is not found, the listing is inserted before the line at index
+    default, or appended.  This is a translation of
+    vimwiki#base#update_listing_in_buffer().
+    """
+    header = format_header(header, 1, syntax)
+    header_regex = re.compile(r'^(\s*)%s\s*$' % re.escape(header))
+
+    start = next((i for i, line in enumerate(lines) if header_regex.match(line)), None)
+    indent = margin = ''
+    separator = []
+    if start is None:
+        start = end = len(lines) if default is None else default
+
+        # Listings inserted below other lines are preceded by a blank line:
+        if start > 0:
+            separator = ['']
+    else:
+        # The indentation of an existing header is kept:
+        indent = header_regex.match(lines[start]).group(1)
+        end = start + 1
+        while end < len(lines) and (not lines[end].strip() or content.match(lines[end])):
+            end += 1
+
+        # Existing lists are indented by the list margin; reuse it so that
+        # listings generated by the editor are not reformatted:
+        for line in lines[start + 1:end]:
+            match = _LIST_ITEM.match(line)
+            if match:
+                margin = match.group(1)
+                break
+
+    listing = separator + [indent + header] + generate(margin)
+    if end < len(lines) and lines[end].strip():
+        listing.append('')
+
+    return lines[:start] + listing + lines[end:]
+
+
+def glob_regex(pattern):
+    """Return regular expression matching page names against the glob
+    pattern as Vim's globpath() matches files: * and ? do not match /,
+    while ** matches any number of directories.
+    """
+    def translate(match):
+        token = match.group(0)
+        if token == '**/':
+            return '(?:.*/)?'
+        if token == '**':
+            return '.*'
+        if token == '*':
+            return '[^/]*'
+        if token == '?':
+            return '[^/]'
+        if token.startswith('[!'):
+            return '[^/' + token[2:-1].replace('\\', '\\\\') + ']'
+        return '[' + token[1:-1].replace('\\', '\\\\') + ']'
+
+    parts = []
+    position = 0
+    for match in _GLOB.finditer(pattern):
+        parts.append(re.escape(pattern[position:match.start()]))
+        parts.append(translate(match))
+        position = match.end()
+    parts.append(re.escape(pattern[position:]))
+
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def update_page(path, ext, page, update):
+    """Apply update to the lines of page, creating the page if it does not
+    exist.  The page is written only if its content changes.  Returns True
+    if the page was written.
+    """
+    filename = os.path.join(path, *page.split('/')) + ext
+    try:
+        lines = read_lines(filename)
+    except FileNotFoundError:
+        lines = []
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    return update_file(filename, ''.join(line + '\n' for line in update(lines)))
+
+
+def update_links(pages, syntax, page, pattern='', diary_rel_path=DIARY_REL_PATH, bullet=None):
+    """Return a function which updates lines of page with an overview of
+    pages matching the glob pattern, given as to Vim's globpath().  Pages in
+    diary_rel_path are excluded.  Links are listed using bullet, or the
+    default list marker for syntax.
+    """
+    bullet = bullet or default_bullet(syntax)
+    dirname = posixpath.dirname(page) or '.'
+    regex = glob_regex(pattern or '**/*')
+    links = sorted(posixpath.relpath(name, dirname) for name in pages
+                   if regex.match(name)
+                   if not is_diary_page(name, diary_rel_path))
+
+    def generate(margin):
+        return ['%s%s %s' % (margin, bullet, format_link(link, syntax)) for link in links]
+
+    return lambda lines: update_listing(lines, LINKS_HEADER, generate, syntax)
+
+
+def generate_links(path, ext, syntax, page, pattern='', diary_rel_path=DIARY_REL_PATH,
+                   bullet=None):
+    """Create or update an overview of all pages matching the glob pattern
+    in page.  Pages in diary_rel_path are excluded.  Returns True if page
+    was written.
+    """
+    return update_page(path, ext, page, update_links(list_pages(path, ext), syntax, page,
+                                                     pattern, diary_rel_path, bullet))
+
+
+def find_caption(lines, syntax):
+    """Return text of the first header near the top of lines, or an empty
+    string if there is none.
+    """
+    for line in itertools.islice(lines, MAX_SCAN_FOR_CAPTION):
+        match = syntax.header.match(line.rstrip('\r\n'))
+        if match:
+            return match.group(2).strip()
+
+    return ''
+
+
+def read_caption(filename, syntax):
+    """Return text of the first header near the top of filename, or an empty
+    string if there is none.
+    """
+    with open(filename, encoding='utf-8', errors='surrogateescape') as f:
+        return find_caption(f, syntax)
+
+
+def is_diary_entry(name):
+    """Return True if name is the file or page name of a diary entry."""
+    return _DIARY_DATE.match(name) is not None
+
+
+def diary_captions(path, ext, syntax, diary_rel_path=DIARY_REL_PATH):
+    """Return a mapping of diary page name to caption for each diary page
+    named by date.  Only the diary directory diary_rel_path is scanned, and
+    captions are cached so that only new or modified pages are read.
+    """
+    filename = os.path.join(cache_dir(path), DIARY_FILE)
+    cached = load_json(filename, {})
+    settings = {'ext': ext, 'syntax': syntax, 'diary_rel_path': diary_rel_path}
+    known = {}
+    if cached.get('version') == DIARY_VERSION and \
+            all(cached.get(key) == value for key, value in settings.items()):
+        known = cached['entries']
+
+    entries = {}
+    try:
+        it = os.scandir(os.path.join(path, diary_rel_path))
+    except FileNotFoundError:
+        return {}
+
+    with it:
+        for entry in it:
+            if not entry.name.endswith(ext) or not is_diary_entry(entry.name):
+                continue
+            name = entry.name[:-len(ext)]
+            st = entry.stat()
+            stat = [st.st_size, st.st_mtime_ns]
+            if name in known and known[name][0] == stat:
+                entries[name] = known[name]
+            else:
+                entries[name] = [stat, read_caption(entry.path, get_syntax(syntax))]
+
+    if entries != known:
+        save_json(filename, dict(settings, version=DIARY_VERSION, entries=entries))
+
+    return {name: caption for name, (_, caption) in entries.items()}
+
+
+def update_diary_links(captions, syntax, bullet=None):
+    """Return a function which updates lines of the diary index with an
+    overview of diary pages, given a mapping of diary page name to caption.
+    Pages are grouped by year and month in descending order and listed
+    using bullet, or the default list marker for syntax.  This is a
+    translation of vimwiki#diary#generate_diary_section().
+    """
+    bullet = bullet or default_bullet(syntax)
+    years = {}
+    for name in captions:
+        year, month = _DIARY_DATE.match(name).groups()
+        years.setdefault(year, {}).setdefault(month, []).append(name)
+
+    def generate(margin):
+        lines = []
+        for year in sorted(years, reverse=True):
+            if lines:
+                lines.append('')
+            lines.append(format_header(year, 2, syntax))
+
+            for month in sorted(years[year], reverse=True):
+                lines.append('')
+                lines.append(format_header(DIARY_MONTHS[int(month) - 1], 3, syntax))
+                if syntax == 'markdown':
+                    lines.append('')
+
+                # Pages without a caption are linked without a description,
+                # except in Markdown where links always have one:
+                for name in sorted(years[year][month], reverse=True):
+                    caption = captions[name] or (name if syntax == 'markdown' else None)
+                    link = format_link(name, syntax, caption)
+                    lines.append('%s%s %s' % (margin, bullet, link))
+
+        return lines
+
+    # Headers generated for each year and month belong to the listing:
+    content = re.compile('%s|%s' % (get_syntax(syntax).header.pattern, _LIST_ITEM.pattern))
+    return lambda lines: update_listing(lines, DIARY_HEADER, generate, syntax, content, 0)
+
+
+def diary_generate_links(path, ext, syntax, diary_rel_path=DIARY_REL_PATH, bullet=None):
+    """Create or update an overview of diary pages in the diary index of
+    the diary directory diary_rel_path.  Returns True if the diary index
+    was written.
+    """
+    captions = diary_captions(path, ext, syntax, diary_rel_path)
+    return update_page(path, ext, diary_rel_path + '/' + DIARY_INDEX,
+                       update_diary_links(captions, syntax, bullet))
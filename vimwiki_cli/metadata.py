@@ -0,0 +1,284 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import functools
+import logging
+import os
+import re
+
+from .cache import cache_dir, load_json, save_json, update_file
+from .pages import diff_pages, file_stat, iter_pages, map_pages, select_pages
+from .syntax import get_syntax, read_lines
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = '.vimwiki_tags'
+METADATA_VERSION = '0.2'
+
+MANIFEST_FILE = 'tags.json'
+MANIFEST_VERSION = 1
+
+TAG_INDEX_FILE = 'tag-index.json'
+TAG_INDEX_VERSION = 1
+
+# Tags found within this many lines of the top of a page or a header are
+# associated with the page or header rather than standing on their own:
+PROXIMITY_LINES = 2
+
+Tag = collections.namedtuple('Tag', ['name', 'lineno', 'link'])
+
+Location = collections.namedtuple('Location', ['page', 'lineno', 'link'])
+
+
+def scan_tags(lines, page, syntax):
+    """Return a list of Tag found in lines of page.  This is a translation
+    of s:scan_tags() in autoload/vimwiki/tags.vim.
+    """
+    tags = []
+    anchors = [''] * 7
+    anchor = ''
+    header_lineno = -2 * PROXIMITY_LINES
+    preformatted = False
+
+    for lineno, line in enumerate(lines, 1):
+        # Ignore preformatted text:
+        if preformatted:
+            preformatted = not syntax.pre_end.match(line)
+            continue
+        if syntax.pre_start.match(line):
+            preformatted = True
+            continue
+
+        match = syntax.header.match(line)
+        if match:
+            header_lineno = lineno
+            header = match.group(2).strip()
+            level = len(match.group(1))
+            anchors[level - 1] = header
+            for i in range(level, 7):
+                anchors[i] = ''
+
+            anchor = '#'.join([a for a in anchors[:level - 1] if a] + [header])
+            continue  # tags are not allowed in headers
+
+        if ':' not in line:
+            continue
+
+        for match in syntax.tag.finditer(line):
+            for name in match.group(1).split(':'):
+                if not name:
+                    continue
+                if lineno <= PROXIMITY_LINES and header_lineno < 0:
+                    link = page
+                elif lineno <= header_lineno + PROXIMITY_LINES:
+                    link = page + '#' + anchor
+                else:
+                    link = page + '#' + name
+                tags.append(Tag(name, lineno, link))
+
+    return tags
+
+
+def scan_file(item, syntax='default'):
+    """Return (page, tags) for an item of (page, filename)."""
+    page, filename = item
+    return page, scan_tags(read_lines(filename), page, get_syntax(syntax))
+
+
+_ESCAPES = {'\\': '\\\\', '\t': '\\t', '\r': '\\r', '\n': '\\n'}
+_UNESCAPES = {v[1]: k for k, v in _ESCAPES.items()}
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+
+
+def _escape(value):
+    return value.translate(_ESCAPE_TABLE)
+
+
+def _unescape(value):
+    return re.sub(r'\\(.)', lambda m: _UNESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def format_metadata(metadata, ext):
+    """Return lines of a tag metadata file for metadata, a mapping of page
+    to a list of Tag.  This is a translation of s:write_tags_metadata().
+    """
+    entries = []
+    for page, tags in metadata.items():
+        for tag in tags:
+            entries.append('%s\t%s%s\t%d;"\tvimwiki:%s' % (
+                tag.name, page, ext, tag.lineno, _escape(page + '\t' + tag.link)))
+
+    return [
+        '!_TAG_FILE_FORMAT\t2',
+        '!_TAG_FILE_SORTED\t1',
+        '!_TAG_OUTPUT_MODE\tvimwiki-tags',
+        '!_TAG_PROGRAM_AUTHOR\tVimwiki',
+        '!_TAG_PROGRAM_NAME\tVimwiki Tags',
+        '!_TAG_PROGRAM_URL\thttps://github.com/vimwiki/vimwiki',
+        '!_TAG_PROGRAM_VERSION\t' + METADATA_VERSION
+    ] + sorted(entries)
+
+
+def parse_metadata(lines):
+    """Return a mapping of page to a list of Tag parsed from lines of a tag
+    metadata file.  This is a translation of s:load_tags_metadata().
+    """
+    metadata = {}
+    for line in lines:
+        if line.startswith('!_TAG_'):
+            continue
+
+        fields = line.split('\t', 3)
+        if len(fields) != 4 or not fields[3].startswith('vimwiki:'):
+            logger.warning('Ignoring malformed tag metadata: %r', line)
+            continue
+
+        page, _, link = _unescape(fields[3][len('vimwiki:'):]).partition('\t')
+        lineno = int(fields[2].split(';', 1)[0])
+        metadata.setdefault(page, []).append(Tag(fields[0], lineno, link))
+
+    return metadata
+
+
+def read_metadata(path):
+    """Return tag metadata for the wiki rooted at path, or an empty mapping
+    if tag metadata has not been built.
+    """
+    try:
+        return parse_metadata(read_lines(os.path.join(path, METADATA_FILE)))
+    except FileNotFoundError:
+        return {}
+
+
+def load_tags(path):
+    """Return a mapping of tag name to a sorted list of Location for the
+    wiki rooted at path, or an empty mapping if tag metadata has not been
+    built.  The mapping is cached until the metadata file changes, whether
+    it was rebuilt natively or by Vimwiki.
+    """
+    try:
+        stat = file_stat(os.path.join(path, METADATA_FILE))
+    except FileNotFoundError:
+        return {}
+
+    filename = os.path.join(cache_dir(path), TAG_INDEX_FILE)
+    cached = load_json(filename, {})
+    if cached.get('version') == TAG_INDEX_VERSION and cached.get('stat') == stat:
+        return {name: [Location(*location) for location in locations]
+                for name, locations in cached['tags'].items()}
+
+    tags = {}
+    for page, page_tags in read_metadata(path).items():
+        for tag in page_tags:
+            tags.setdefault(tag.name, []).append(Location(page, tag.lineno, tag.link))
+
+    for locations in tags.values():
+        locations.sort()
+
+    save_json(filename, {'version': TAG_INDEX_VERSION, 'stat': stat, 'tags': tags})
+    return tags
+
+
+def search_tags(path, pattern):
+    """Return a sorted list of (name, Location) for each tag of the wiki
+    rooted at path whose name matches the regular expression pattern.
+    """
+    regex = re.compile(pattern)
+    return sorted((name, location)
+                  for name, locations in load_tags(path).items() if regex.fullmatch(name)
+                  for location in locations)
+
+
+def load_manifest(path, ext, syntax):
+    """Return manifest of scanned files for the wiki rooted at path.  The
+    manifest maps each page to the stat and content hash of its file when
+    last scanned along with the tags found.
+    """
+    manifest = load_json(os.path.join(cache_dir(path), MANIFEST_FILE), {})
+    if manifest.get('version') != MANIFEST_VERSION or \
+            manifest.get('ext') != ext or manifest.get('syntax') != syntax:
+        return None
+
+    return manifest['files']
+
+
+def save_manifest(path, ext, syntax, files):
+    save_json(os.path.join(cache_dir(path), MANIFEST_FILE), {
+        'version': MANIFEST_VERSION,
+        'ext': ext,
+        'syntax': syntax,
+        'files': files
+    })
+
+
+def rebuild_tags(path, ext, syntax, all=True, only=(), jobs=None):
+    """Rebuild tag metadata for the wiki rooted at path.  Unless all is set,
+    only pages whose content has changed since the last rebuild are scanned
+    and merged into the existing metadata.  If only is given, no other files
+    are considered.  Returns the number of pages scanned.
+    """
+    files = None if all else load_manifest(path, ext, syntax)
+    modified = files is None
+    if files is None:
+        files = {}
+        if only:
+            # Seed manifest from metadata built by another engine:
+            files = {page: {'stat': None, 'hash': None, 'tags': [list(tag) for tag in tags]}
+                     for page, tags in read_metadata(path).items()}
+
+    if only:
+        pages, missing = select_pages(path, ext, only)
+    else:
+        pages = dict(iter_pages(path, ext))
+        missing = set(files) - set(pages)
+
+    for page in missing & set(files):
+        del files[page]
+        modified = True
+
+    known = {page: (entry['stat'], entry['hash']) for page, entry in files.items()}
+    changed, touched = diff_pages(pages, known, jobs)
+    for page, (stat, _) in touched.items():
+        files[page]['stat'] = stat
+
+    logger.debug('Scanning %d of %d pages in %s', len(changed), len(pages), path)
+    items = [(page, pages[page]) for page in changed]
+    for page, tags in map_pages(functools.partial(scan_file, syntax=syntax), items, jobs):
+        stat, digest = changed[page]
+        files[page] = {'stat': stat, 'hash': digest, 'tags': [list(tag) for tag in tags]}
+
+    filename = os.path.join(path, METADATA_FILE)
+    if modified or changed or not os.path.exists(filename):
+        metadata = {page: [Tag(*tag) for tag in entry['tags']] for page, entry in files.items()}
+        write_metadata(filename, format_metadata(metadata, ext))
+
+    if modified or changed or touched:
+        save_manifest(path, ext, syntax, files)
+
+    return len(changed)
+
+
+def write_metadata(filename, lines):
+    """Write lines of a tag metadata file to filename unless unchanged."""
+    return update_file(filename, ''.join(line + '\n' for line in lines))
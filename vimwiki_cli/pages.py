@@ -0,0 +1,298 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import bisect
+import concurrent.futures
+import itertools
+import os
+import re
+import subprocess
+import sys
+
+from .cache import cache_dir, file_hash, load_json, save_json
+
+PAGES_FILE = 'pages.json'
+PAGES_VERSION = 1
+
+# Directory containing diary pages, relative to the wiki root:
+DIARY_REL_PATH = 'diary'
+
+# Inputs smaller than this are processed serially as the cost of starting a
+# process pool outweighs any benefit:
+PARALLEL_THRESHOLD = 64
+
+# Rebuilds the page list of the wiki rooted at argv[1] with extension argv[2]:
+_REFRESH = 'import sys; from vimwiki_cli.pages import list_pages; list_pages(*sys.argv[1:])'
+
+
+def page_name(path, filename, ext):
+    """Return page name of filename relative to the wiki root path."""
+    name = os.path.relpath(filename, path)
+    if ext and name.endswith(ext):
+        name = name[:-len(ext)]
+
+    return name.replace(os.sep, '/')
+
+
+def _walk(path):
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        prefix = page_name(path, root, '') + '/' if root != path else ''
+        yield root, prefix, sorted(name for name in files if not name.startswith('.'))
+
+
+def iter_pages(path, ext):
+    """Yield (page, filename) for each page in the wiki rooted at path.
+    Hidden files and directories are ignored.
+    """
+    for root, prefix, files in _walk(path):
+        for name in files:
+            if name.endswith(ext):
+                yield prefix + name[:-len(ext)], os.path.join(root, name)
+
+
+def _dir_mtime(dirname):
+    try:
+        return os.stat(dirname).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def scan_pages(path, ext):
+    """Return (pages, dirs) for the wiki rooted at path.  pages maps each
+    page to its filename, and dirs maps the prefix of each directory to its
+    mtime, which changes whenever a file in it is added, removed, or
+    replaced.  Hidden files and directories are ignored.
+    """
+    pages = {}
+    dirs = {}
+    for root, prefix, files in _walk(path):
+        dirs[prefix] = _dir_mtime(root)
+        for name in files:
+            if name.endswith(ext):
+                pages[prefix + name[:-len(ext)]] = os.path.join(root, name)
+
+    return pages, dirs
+
+
+def dirs_unchanged(path, dirs):
+    """Return True if no directory in dirs, as returned by scan_pages(), has
+    been modified since.
+    """
+    return all(_dir_mtime(os.path.join(path, prefix)) == mtime
+               for prefix, mtime in dirs.items())
+
+
+def files_unchanged(path, ext, stats):
+    """Return True if no page in stats, a mapping of page to stat as
+    returned by file_stat(), has been modified or removed since.  Unlike
+    diff_pages(), the wiki is not walked and no file is read.
+    """
+    for page, stat in stats.items():
+        try:
+            if file_stat(os.path.join(path, *page.split('/')) + ext) != list(stat):
+                return False
+        except FileNotFoundError:
+            return False
+
+    return True
+
+
+def _load_pages(path, ext):
+    cached = load_json(os.path.join(cache_dir(path), PAGES_FILE), {})
+    if cached.get('version') == PAGES_VERSION and cached.get('ext') == ext:
+        return cached
+
+    return None
+
+
+def list_pages(path, ext):
+    """Return a sorted list of pages in the wiki rooted at path.  The list is
+    cached along with the mtime of each directory, and is only rebuilt once
+    a file or directory is added to or removed from the wiki.
+    """
+    cached = _load_pages(path, ext)
+    if cached and dirs_unchanged(path, cached['dirs']):
+        return cached['pages']
+
+    pages, dirs = scan_pages(path, ext)
+    pages = sorted(pages)
+    save_json(os.path.join(cache_dir(path), PAGES_FILE),
+              {'version': PAGES_VERSION, 'ext': ext, 'dirs': dirs, 'pages': pages})
+    return pages
+
+
+def cached_pages(path, ext):
+    """Return (pages, stale) for the page list cached by list_pages without
+    walking the wiki rooted at path.  pages is None if no list is cached,
+    and stale is True if a directory has changed since it was cached.
+    """
+    cached = _load_pages(path, ext)
+    if cached is None:
+        return None, True
+
+    return cached['pages'], not dirs_unchanged(path, cached['dirs'])
+
+
+def refresh_pages(path, ext):
+    """Rebuild the page list cached by list_pages in a background process
+    which outlives the caller.
+    """
+    subprocess.Popen([sys.executable, '-c', _REFRESH, path, ext],
+                     stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+
+def match_pages(pages, incomplete):
+    """Return pages from the sorted list pages which start with incomplete.
+    If none do, pages containing each character of incomplete in order,
+    ignoring case, are returned instead.
+    """
+    if not incomplete:
+        return list(pages)
+
+    start = bisect.bisect_left(pages, incomplete)
+    matches = list(itertools.takewhile(lambda page: page.startswith(incomplete),
+                                       itertools.islice(pages, start, None)))
+    if matches:
+        return matches
+
+    # Pages are matched in a single pass over all names, which are folded to
+    # lower case once as matching each character case-insensitively is far
+    # slower; each character skips ahead to its next occurrence, so no
+    # backtracking is needed:
+    names = '\n'.join(pages).lower()
+    pattern = re.compile('^' + ''.join('[^\n%s]*%s' % (c, c)
+                                       for c in map(re.escape, incomplete.lower())),
+                         re.MULTILINE)
+    matches = []
+    index = offset = 0
+    for match in pattern.finditer(names):
+        index += names.count('\n', offset, match.start())
+        offset = match.start()
+        matches.append(pages[index])
+
+    return matches
+
+
+def is_diary_page(page, diary_rel_path=DIARY_REL_PATH):
+    """Return True if page is in the diary directory diary_rel_path."""
+    dirname, _, _ = page.rpartition('/')
+    return dirname == diary_rel_path
+
+
+def select_pages(path, ext, filenames):
+    """Return (pages, missing) for filenames which are pages of the wiki
+    rooted at path.  pages maps page to filename for files which exist, and
+    missing is a set of pages whose files do not exist.
+    """
+    pages = {}
+    missing = set()
+    root = os.path.join(os.path.abspath(path), '')
+    for filename in map(os.path.abspath, filenames):
+        if filename.startswith(root) and filename.endswith(ext):
+            page = page_name(path, filename, ext)
+            if os.path.exists(filename):
+                pages[page] = filename
+            else:
+                missing.add(page)
+
+    return pages, missing
+
+
+def file_stat(filename):
+    """Return stat of filename used to detect modification."""
+    st = os.stat(filename)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def snapshot(*paths):
+    """Return a mapping of filename to stat for each file below paths.
+    Hidden files are included, but hidden directories are not.
+    """
+    files = {}
+    for path in paths:
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in names:
+                filename = os.path.join(root, name)
+                try:
+                    files[filename] = file_stat(filename)
+                except FileNotFoundError:
+                    pass
+
+    return files
+
+
+def changed_files(before, after):
+    """Return a sorted list of filenames which were added, removed, or
+    modified between snapshots before and after.
+    """
+    return sorted(filename for filename in set(before) | set(after)
+                  if before.get(filename) != after.get(filename))
+
+
+def _hash_file(filename):
+    return file_hash(filename) if os.path.exists(filename) else None
+
+
+def diff_pages(pages, known, jobs=None):
+    """Compare pages, a mapping of page to filename, against known, a mapping
+    of page to (stat, hash) recorded when each page was last processed.
+
+    Files whose stat is unchanged are assumed to be unchanged; otherwise the
+    content hash is compared, which survives checkouts and fresh clones.
+    Returns (changed, touched), each a mapping of page to (stat, hash):
+    changed pages must be processed again, while touched pages have new
+    stat but unchanged content.
+    """
+    stats = {page: file_stat(filename) for page, filename in pages.items()}
+    candidates = [page for page in pages
+                  if page not in known or list(known[page][0] or ()) != stats[page]]
+
+    hashes = map_pages(_hash_file, [pages[page] for page in candidates], jobs)
+    changed = {}
+    touched = {}
+    for page, digest in zip(candidates, hashes):
+        if page in known and known[page][1] == digest:
+            touched[page] = (stats[page], digest)
+        else:
+            changed[page] = (stats[page], digest)
+
+    return changed, touched
+
+
+def map_pages(func, items, jobs=None):
+    """Return a list of func applied to each of items.  Large inputs are
+    spread across a pool of jobs worker processes.
+    """
+    items = list(items)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(items) < PARALLEL_THRESHOLD:
+        return [func(item) for item in items]
+
+    chunksize = max(1, len(items) // (jobs * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+
+import click
+
+logger = logging.getLogger(__name__)
+
+# Size of reads from process output; longer lines are split:
+_CHUNK_SIZE = 65536
+
+
+def _echo(prefix, err, line):
+    click.echo(prefix + line, err=err)
+
+
+def _line(callback, data):
+    if callback is not None:
+        callback(data.decode('utf-8', 'replace').rstrip('\r'))
+
+
+async def _copy(stream, callback):
+    pending = b''
+    while True:
+        data = await stream.read(_CHUNK_SIZE)
+        if not data:
+            break
+
+        lines = (pending + data).split(b'\n')
+        pending = lines.pop()
+        if len(pending) >= _CHUNK_SIZE:
+            lines.append(pending)
+            pending = b''
+
+        for line in lines:
+            _line(callback, line)
+
+    if pending:
+        _line(callback, pending)
+
+
+def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def execute(args, timeout=None, stdout=None, stderr=None, env=None):
+    """Run args in a new process group, calling stdout and stderr with each
+    line of output as it is received; output is discarded if the callback is
+    None.  Returns the exit status of the process.  If the process does not
+    exit within timeout seconds, or the caller is cancelled, the process
+    group is killed; subprocess.TimeoutExpired is raised on timeout.
+    """
+    logger.debug('Launching %r' % args)
+    process = await asyncio.create_subprocess_exec(*args,
+                                                   stdin=subprocess.DEVNULL,
+                                                   stdout=subprocess.PIPE,
+                                                   stderr=subprocess.PIPE,
+                                                   env=env,
+                                                   start_new_session=True)
+    try:
+        await asyncio.wait_for(asyncio.gather(_copy(process.stdout, stdout),
+                                              _copy(process.stderr, stderr),
+                                              process.wait()), timeout)
+    except asyncio.TimeoutError:
+        raise subprocess.TimeoutExpired(args, timeout)
+    finally:
+        if process.returncode is None:
+            _kill(process)
+            await process.wait()
+
+    return process.returncode
+
+
+async def gather(coroutines, jobs=None):
+    """Await coroutines, running at most jobs at once, or one per CPU by
+    default.  Returns a list of results in the order of coroutines.
+    """
+    semaphore = asyncio.Semaphore(jobs or os.cpu_count())
+
+    async def limit(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return list(await asyncio.gather(*(limit(coroutine) for coroutine in coroutines)))
+
+
+def run(coroutine):
+    """Run coroutine in a new event loop and return its result."""
+    return asyncio.run(coroutine)
+
+
+async def _run(label, args, env):
+    prefix = '[%s] ' % label
+    return await execute(args,
+                         stdout=lambda line: _echo(prefix, False, line),
+                         stderr=lambda line: _echo(prefix, True, line),
+                         env=env)
+
+
+def run_each(commands, jobs=None, env=None):
+    """Run commands, a list of (label, args), using at most jobs concurrent
+    processes, or one per CPU by default.  Each line of output is prefixed
+    with the label of its command as it is received.  Returns a list of
+    exit statuses in the order of commands.
+    """
+    return run(gather([_run(label, args, env) for label, args in commands], jobs))
@@ -0,0 +1,401 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import mmap
+import os
+import re
+import sqlite3
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+from .cache import cache_dir
+from .pages import (diff_pages, dirs_unchanged, files_unchanged, iter_pages, map_pages,
+                    scan_pages)
+from .syntax import read_lines, split_lines
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'search.db'
+INDEX_VERSION = 3
+
+# Number of pages scanned by each task when searching without an index:
+GREP_CHUNK_SIZE = 32
+
+Match = collections.namedtuple('Match', ['page', 'lineno', 'text'])
+
+_TERM = re.compile(r'\w+')
+
+# Intersections are limited to avoid exceeding SQLITE_MAX_COMPOUND_SELECT;
+# any subset of the required trigrams still yields a valid query:
+MAX_INTERSECT = 64
+
+_REPEATS = tuple(getattr(sre_parse, name) for name in
+                 ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') if hasattr(sre_parse, name))
+
+
+def terms(text):
+    """Return the set of search terms in text."""
+    return set(_TERM.findall(text.lower()))
+
+
+def trigrams(text):
+    """Return the set of trigrams within lines of text, ignoring case."""
+    text = text.lower()
+    grams = set(map(''.join, zip(text, text[1:], text[2:])))
+    return set(trigram for trigram in grams if '\n' not in trigram)
+
+
+def scan_page(item):
+    """Return (page, lines, trigrams) for an item of (page, filename), where
+    lines is a list of (lineno, text, terms) for each line containing search
+    terms and trigrams is the set of trigrams found within lines.
+    """
+    page, filename = item
+    lines = []
+    page_lines = read_lines(filename)
+    for lineno, text in enumerate(page_lines, 1):
+        line_terms = terms(text)
+        if line_terms:
+            lines.append((lineno, text, sorted(line_terms)))
+
+    return page, lines, sorted(trigrams('\n'.join(page_lines)))
+
+
+# Trigram queries are either None, which matches any page, a trigram, or a
+# tuple of ('and' | 'or', [query, ...]).  This is a simplified form of the
+# analysis described in https://swtch.com/~rsc/regexp/regexp4.html.
+
+def _and(queries):
+    queries = [query for query in queries if query is not None]
+    if not queries:
+        return None
+
+    return queries[0] if len(queries) == 1 else ('and', queries[:MAX_INTERSECT])
+
+
+def _or(queries):
+    if not queries or None in queries:
+        return None
+
+    return queries[0] if len(queries) == 1 else ('or', queries)
+
+
+def _analyze(parsed):
+    queries = []
+    literal = []
+
+    def flush():
+        queries.append(_and(sorted(trigrams(''.join(literal)))))
+        del literal[:]
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            literal.append(chr(av))
+            continue
+        elif op is sre_parse.AT:
+            continue  # anchors do not consume characters
+
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            queries.append(_analyze(av[-1]))
+        elif op is sre_parse.BRANCH:
+            queries.append(_or([_analyze(branch) for branch in av[1]]))
+        elif op in _REPEATS and av[0] > 0:
+            queries.append(_analyze(av[2]))
+
+    flush()
+    return _and(queries)
+
+
+def trigram_query(pattern):
+    """Return trigram query which must be satisfied by any line matching the
+    regular expression pattern.
+    """
+    return _analyze(sre_parse.parse(pattern))
+
+
+def _sql(query):
+    if isinstance(query, str):
+        return 'SELECT id FROM trigrams WHERE trigram = ?', [query]
+
+    op, queries = query
+    subqueries = [_sql(subquery) for subquery in queries]
+    sql = (' INTERSECT ' if op == 'and' else ' UNION ').join(
+        'SELECT id FROM (%s)' % subquery for subquery, _ in subqueries)
+    return sql, [param for _, params in subqueries for param in params]
+
+
+class SearchIndex(object):
+    """Persistent index of the pages in a wiki.  An inverted index maps each
+    term to the lines in which it appears, and a trigram index maps each
+    trigram to the pages in which it appears, which is used to narrow the
+    pages that must be scanned for a regular expression.  The index is
+    stored in an SQLite database in the cache directory and is updated
+    incrementally as pages change.
+    """
+
+    SCHEMA = [
+        'CREATE TABLE files (id INTEGER PRIMARY KEY, page TEXT UNIQUE, '
+        'size INTEGER, mtime INTEGER, hash TEXT)',
+        'CREATE TABLE lines (id INTEGER, lineno INTEGER, text TEXT, '
+        'PRIMARY KEY (id, lineno)) WITHOUT ROWID',
+        'CREATE TABLE postings (term TEXT, id INTEGER, lineno INTEGER, '
+        'PRIMARY KEY (term, id, lineno)) WITHOUT ROWID',
+        'CREATE INDEX postings_id ON postings (id)',
+        'CREATE TABLE trigrams (trigram TEXT, id INTEGER, '
+        'PRIMARY KEY (trigram, id)) WITHOUT ROWID',
+        'CREATE INDEX trigrams_id ON trigrams (id)',
+        'CREATE TABLE dirs (prefix TEXT PRIMARY KEY, mtime INTEGER)'
+    ]
+
+    def __init__(self, path, ext):
+        self._path = path
+        self._ext = ext
+
+        self._db = sqlite3.connect(os.path.join(cache_dir(path), INDEX_FILE))
+        # The index can always be rebuilt, so durability is not required:
+        self._db.execute('PRAGMA synchronous = OFF')
+        (version,) = self._db.execute('PRAGMA user_version').fetchone()
+        if version != INDEX_VERSION:
+            self._create()
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__,
+                               self._path,
+                               self._ext)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create(self):
+        with self._db:
+            tables = self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            for (name,) in tables.fetchall():
+                self._db.execute('DROP TABLE %s' % name)
+            for statement in SearchIndex.SCHEMA:
+                self._db.execute(statement)
+            self._db.execute('PRAGMA user_version = %d' % INDEX_VERSION)
+
+    def close(self):
+        self._db.close()
+
+    def _remove(self, ids):
+        for table in ('files', 'lines', 'postings', 'trigrams'):
+            self._db.executemany('DELETE FROM %s WHERE id = ?' % table, ids)
+
+    def update(self, jobs=None):
+        """Update index for pages which have changed since the last update.
+        Returns the number of pages scanned.
+        """
+        pages, dirs = scan_pages(self._path, self._ext)
+        ids = {}
+        known = {}
+        for id, page, size, mtime, digest in self._db.execute('SELECT * FROM files'):
+            ids[page] = id
+            known[page] = ((size, mtime), digest)
+
+        changed, touched = diff_pages(pages, known, jobs)
+        removed = [page for page in known if page not in pages or page in changed]
+
+        logger.debug('Scanning %d of %d pages in %s', len(changed), len(pages), self._path)
+        with self._db:
+            self._remove([(ids[page],) for page in removed])
+            self._db.execute('DELETE FROM dirs')
+            self._db.executemany('INSERT INTO dirs VALUES (?, ?)', dirs.items())
+            self._db.executemany('UPDATE files SET size = ?, mtime = ? WHERE id = ?',
+                                 [(stat[0], stat[1], ids[page])
+                                  for page, (stat, _) in touched.items()])
+
+            items = [(page, pages[page]) for page in changed]
+            for page, lines, page_trigrams in map_pages(scan_page, items, jobs):
+                (size, mtime), digest = changed[page]
+                id = self._db.execute('INSERT INTO files (page, size, mtime, hash) '
+                                      'VALUES (?, ?, ?, ?)',
+                                      (page, size, mtime, digest)).lastrowid
+                self._db.executemany('INSERT INTO lines VALUES (?, ?, ?)',
+                                     [(id, lineno, text) for lineno, text, _ in lines])
+                self._db.executemany('INSERT INTO postings VALUES (?, ?, ?)',
+                                     [(term, id, lineno) for lineno, _, line_terms in lines
+                                      for term in line_terms])
+                self._db.executemany('INSERT INTO trigrams VALUES (?, ?)',
+                                     [(trigram, id) for trigram in page_trigrams])
+
+        return len(changed)
+
+    def is_current(self):
+        """Return True if no page has been added, removed, or modified since
+        the last update.  The mtime of each directory shows whether pages
+        were added or removed, and the stat of each known page whether it
+        was modified; no directory is walked and no page is read.
+        """
+        dirs = dict(self._db.execute('SELECT * FROM dirs'))
+        if not dirs or not dirs_unchanged(self._path, dirs):
+            return False
+
+        stats = {page: (size, mtime)
+                 for page, size, mtime in self._db.execute('SELECT page, size, mtime FROM files')}
+        return files_unchanged(self._path, self._ext, stats)
+
+    def search(self, pattern):
+        """Yield Match for each line containing all terms in pattern, in
+        order of page and line number.
+        """
+        query_terms = sorted(terms(pattern))
+        if not query_terms:
+            return
+
+        subquery = 'SELECT id, lineno FROM postings WHERE term = ?'
+        query = ' INTERSECT '.join([subquery] * len(query_terms))
+        cursor = self._db.execute('SELECT files.page, lines.lineno, lines.text FROM lines '
+                                  'JOIN (%s) USING (id, lineno) JOIN files USING (id) '
+                                  'ORDER BY files.page, lines.lineno' % query,
+                                  query_terms)
+        for row in cursor:
+            yield Match(*row)
+
+    def candidates(self, pattern):
+        """Return sorted list of pages which may contain lines matching the
+        regular expression pattern.
+        """
+        query = trigram_query(pattern)
+        if query is None:
+            cursor = self._db.execute('SELECT page FROM files ORDER BY page')
+        else:
+            sql, params = _sql(query)
+            cursor = self._db.execute('SELECT page FROM files WHERE id IN (%s) '
+                                      'ORDER BY page' % sql, params)
+
+        return [page for (page,) in cursor]
+
+    def search_regex(self, pattern):
+        """Yield Match for each line matching the regular expression pattern,
+        in order of page and line number.  Only pages containing the trigrams
+        required by pattern are scanned.
+        """
+        regex = re.compile(pattern)
+        for page in self.candidates(pattern):
+            filename = os.path.join(self._path, *page.split('/')) + self._ext
+            for lineno, text in enumerate(read_lines(filename), 1):
+                if regex.search(text):
+                    yield Match(page, lineno, text)
+
+
+def _matcher(pattern, regex):
+    if regex:
+        return re.compile(pattern).search
+
+    query_terms = terms(pattern)
+    return lambda text: query_terms <= terms(text)
+
+
+def _prefilter(query, data):
+    # Literals are only checked if ASCII, as case cannot be folded in bytes;
+    # any other literal is assumed to be present:
+    if query is None:
+        return True
+    elif isinstance(query, str):
+        try:
+            literal = query.encode('ascii')
+        except UnicodeEncodeError:
+            return True
+        return re.search(re.escape(literal), data, re.IGNORECASE) is not None
+
+    op, queries = query
+    results = (_prefilter(subquery, data) for subquery in queries)
+    return all(results) if op == 'and' else any(results)
+
+
+def grep_pages(items, pattern, regex=False, max_count=None):
+    """Return a list of Match for lines matching pattern in items of (page,
+    filename).  Files are memory-mapped and only decoded if they contain the
+    literals required by pattern.
+    """
+    match = _matcher(pattern, regex)
+    query = trigram_query(pattern) if regex else _and(sorted(terms(pattern)))
+
+    matches = []
+    for page, filename in items:
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if not _prefilter(query, data):
+                    continue
+                text = data[:].decode('utf-8', 'surrogateescape')
+
+        for lineno, line in enumerate(split_lines(text), 1):
+            if match(line):
+                matches.append(Match(page, lineno, line))
+                if len(matches) == max_count:
+                    return matches
+
+    return matches
+
+
+def grep(path, ext, pattern, regex=False, max_count=None, jobs=None):
+    """Yield Match for lines matching pattern in the wiki rooted at path
+    without using an index.  Pages are scanned by a pool of jobs worker
+    processes; matches are yielded in order of page as soon as they are
+    found, and scanning stops once max_count matches have been yielded.
+    """
+    pages = list(iter_pages(path, ext))
+    chunks = [pages[i:i + GREP_CHUNK_SIZE] for i in range(0, len(pages), GREP_CHUNK_SIZE)]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(chunks) == 1:
+        results = (grep_pages(chunk, pattern, regex, max_count) for chunk in chunks)
+        yield from itertools.islice(itertools.chain.from_iterable(results), max_count)
+        return
+
+    count = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Only a bounded number of tasks are submitted ahead of the task
+        # whose results are being yielded, so that stopping early does not
+        # require waiting for the entire wiki to be scanned:
+        pending = collections.deque()
+        chunks = iter(chunks)
+        try:
+            while True:
+                for chunk in itertools.islice(chunks, 2 * jobs - len(pending)):
+                    pending.append(executor.submit(grep_pages, chunk, pattern, regex, max_count))
+                if not pending:
+                    break
+
+                for match in pending.popleft().result():
+                    yield match
+                    count += 1
+                    if count == max_count:
+                        return
+        finally:
+            for future in pending:
+                future.cancel()
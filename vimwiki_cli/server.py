@@ -0,0 +1,83 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import subprocess
+
+import click
+
+from .context import *
+from .editor import ServerError
+
+
+@click.group()
+def server():
+    """Command group for managing the editor server.
+
+    The editor server is a headless editor kept running in the background.
+    When --server is given, non-interactive commands are sent to the server
+    rather than starting a new editor.  Vim must be built with +clientserver.
+    """
+
+
+@server.command()
+@pass_wiki
+def start(wiki):
+    """Start editor server."""
+    try:
+        if not wiki.start_server():
+            click.echo('Server is already running')
+    except (OSError, ServerError) as e:
+        raise click.ClickException(str(e))
+    except subprocess.TimeoutExpired as e:
+        raise click.ClickException('server timed out after %g seconds' % e.timeout)
+
+
+@server.command()
+@click.pass_context
+def status(ctx):
+    """Show status of editor server."""
+    try:
+        address = ctx.ensure_object(Wiki).server_status()
+    except (OSError, ServerError) as e:
+        raise click.ClickException(str(e))
+    except subprocess.TimeoutExpired as e:
+        raise click.ClickException('server timed out after %g seconds' % e.timeout)
+
+    if address is None:
+        click.echo('Server is not running')
+        ctx.exit(1)
+
+    click.echo('Server is running at %s' % address)
+
+
+@server.command()
+@pass_wiki
+def stop(wiki):
+    """Stop editor server."""
+    try:
+        if not wiki.stop_server():
+            click.echo('Server is not running')
+    except (OSError, ServerError) as e:
+        raise click.ClickException(str(e))
+    except subprocess.TimeoutExpired as e:
+        raise click.ClickException('server timed out after %g seconds' % e.timeout)
@@ -0,0 +1,205 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import logging
+import os
+import subprocess
+import tempfile
+
+from . import trace
+from .cache import cache_home, file_hash, load_json, save_json
+from .editor import is_neovim, vim_list, vim_string
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE = 'config.json'
+SETTINGS_VERSION = 3
+
+DEFAULT_TIMEOUT = 10.0
+
+# Settings read from each g:vimwiki_list entry along with the defaults used
+# by Vimwiki; None indicates the value is derived from the wiki path.  The
+# user_htmls setting is global, and is copied into each entry:
+DEFAULT_WIKI = {
+    'path': os.path.join('~', 'vimwiki'),
+    'ext': '.wiki',
+    'syntax': 'default',
+    'path_html': None,
+    'template_path': None,
+    'diary_rel_path': 'diary',
+    'list_markers': None,
+    'user_htmls': None
+}
+
+
+class ConfigError(Exception):
+    pass
+
+
+def vimrc_files(editor):
+    """Return filenames which may hold the user's editor configuration.  The
+    files need not exist; creating one also invalidates cached settings.
+    """
+    filenames = []
+    if os.getenv('MYVIMRC'):
+        filenames.append(os.getenv('MYVIMRC'))
+
+    if is_neovim(editor):
+        config = os.getenv('XDG_CONFIG_HOME') or os.path.join('~', '.config')
+        filenames.append(os.path.join(config, 'nvim', 'init.vim'))
+        filenames.append(os.path.join(config, 'nvim', 'init.lua'))
+    else:
+        filenames.append(os.path.join('~', '.vimrc'))
+        filenames.append(os.path.join('~', '.vim', 'vimrc'))
+
+    return [os.path.expanduser(filename) for filename in filenames]
+
+
+def _stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _hash(filename):
+    try:
+        return file_hash(filename)
+    except OSError:
+        return None
+
+
+def query_wikis(editor, timeout=DEFAULT_TIMEOUT):
+    """Start editor headless and return the entries of g:vimwiki_list with
+    the settings in DEFAULT_WIKI filled in.
+    """
+    # Only settings used by the CLI are encoded as entries may also hold
+    # values such as Funcrefs which cannot be represented in JSON:
+    keys = vim_string('index(%s, v:key) >= 0' % vim_list(DEFAULT_WIKI))
+    with tempfile.TemporaryDirectory(prefix='vimwiki-cli-') as tmpdir:
+        script = os.path.join(tmpdir, 'config.vim')
+        output = os.path.join(tmpdir, 'config.json')
+        with open(script, 'w') as f:
+            f.write('\n'.join([
+                "let s:wikis = deepcopy(get(g:, 'vimwiki_list', []))",
+                'if empty(s:wikis) | let s:wikis = [{}] | endif',
+                'call map(s:wikis, {_, wiki -> filter(wiki, %s)})' % keys,
+                "call map(s:wikis, {_, wiki -> extend(wiki, "
+                "{'user_htmls': get(g:, 'vimwiki_user_htmls', '')})})",
+                'call writefile([json_encode(s:wikis)], %s)' % vim_string(output),
+                'qa!'
+            ]) + '\n')
+
+        # Output is discarded as the editor waits for input at the hit-enter
+        # prompt if the vimrc reports an error on a redirected stderr:
+        args = [editor, '-S', script]
+
+        with trace.startuptime() as startuptime:
+            if startuptime is not None:
+                args[1:1] = ['--startuptime', startuptime]
+
+            logger.debug('Launching %r' % args)
+            try:
+                with trace.span('editor', args=args):
+                    process = subprocess.run(args,
+                                             stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL,
+                                             timeout=timeout)
+            except subprocess.TimeoutExpired:
+                raise ConfigError('timed out reading g:vimwiki_list')
+
+        wikis = load_json(output)
+
+    if not isinstance(wikis, list):
+        raise ConfigError('unable to read g:vimwiki_list: editor exited with status %d' %
+                          process.returncode)
+
+    # Vimwiki uses a single wiki with default settings if none are given:
+    return [dict(DEFAULT_WIKI, **{key: _setting_value(value)
+                                  for key, value in wiki.items()
+                                  if isinstance(value, (str, list))})
+            for wiki in wikis or [{}]]
+
+
+def _setting_value(value):
+    # Paths are given with or without a trailing separator, while lists
+    # such as list_markers hold strings:
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)] or None
+
+    return value.rstrip('/') or None
+
+
+def settings_cached(editor):
+    """Return True if settings have been read from editor and cached, even
+    if since made stale by a change to the user's vimrc.
+    """
+    data = load_json(os.path.join(cache_home(), SETTINGS_FILE), {})
+    return data.get('editor') == editor
+
+
+def load_wikis(editor, refresh=False):
+    """Return settings of each wiki configured in g:vimwiki_list.  Settings
+    are cached until the user's vimrc changes, so that the editor is only
+    started if refresh is set or the cache is stale.
+    """
+    filename = os.path.join(cache_home(), SETTINGS_FILE)
+    stamps = {vimrc: _stamp(vimrc) for vimrc in vimrc_files(editor)}
+
+    data = load_json(filename, {})
+    if not refresh and data.get('version') == SETTINGS_VERSION and \
+            data.get('editor') == editor and data.get('stamps') == stamps:
+        logger.debug('Using cached settings from %s', filename)
+        return data['wikis']
+
+    # Files whose mtime changed are hashed so that touching a vimrc does not
+    # start the editor:
+    hashes = {vimrc: _hash(vimrc) for vimrc in stamps}
+    if refresh or data.get('version') != SETTINGS_VERSION or \
+            data.get('editor') != editor or data.get('hashes') != hashes:
+        data = {
+            'version': SETTINGS_VERSION,
+            'editor': editor,
+            'hashes': hashes,
+            'wikis': query_wikis(editor)
+        }
+
+    data['stamps'] = stamps
+    os.makedirs(cache_home(), exist_ok=True)
+    save_json(filename, data)
+    return data['wikis']
+
+
+def select_wiki(wikis, count):
+    """Return settings of the wiki selected by count.  Like Vimwiki, counts
+    start at 1, and 0 selects the first wiki.
+    """
+    index = max(count - 1, 0)
+    if index >= len(wikis):
+        raise ConfigError('wiki %d is not configured; %d wiki%s found in g:vimwiki_list' %
+                          (count, len(wikis), '' if len(wikis) == 1 else 's'))
+
+    return wikis[index]
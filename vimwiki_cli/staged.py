@@ -0,0 +1,200 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import logging
+import os
+
+from . import git
+from .cache import update_file
+from .listing import (DIARY_INDEX, MAX_SCAN_FOR_CAPTION, find_caption, is_diary_entry,
+                      update_diary_links, update_links)
+from .metadata import METADATA_FILE, format_metadata, parse_metadata, scan_tags
+from .pages import DIARY_REL_PATH, is_diary_page, page_name
+from .syntax import get_syntax, split_lines
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODE = '100644'
+
+
+def _encode(lines):
+    return ''.join(line + '\n' for line in lines).encode('utf-8', 'surrogateescape')
+
+
+class StagedWiki(object):
+    """Pages of the wiki rooted at path as staged in the index of the working
+    tree rooted at toplevel.  Files are read from the object store using a
+    single git cat-file process, and files written are held in memory until
+    commit() adds them to the index.  Instances must be used as a context
+    manager.
+    """
+
+    def __init__(self, path, ext, toplevel):
+        self.path = os.path.realpath(path)
+        self.ext = ext
+        self._toplevel = toplevel
+        self._cat_file = git.CatFile()
+        self._entries = None
+        self._written = {}
+
+    def __repr__(self):
+        return '%s(%r, %r, %r)' % (self.__class__.__name__,
+                                   self.path,
+                                   self.ext,
+                                   self._toplevel)
+
+    def __enter__(self):
+        self._entries = {os.path.join(self._toplevel, filename): entry
+                         for filename, entry in git.ls_files(self.path).items()}
+        self._cat_file.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cat_file.__exit__(*exc_info)
+
+    def page_filename(self, page):
+        """Return filename of page in the wiki."""
+        return os.path.join(self.path, *page.split('/')) + self.ext
+
+    def pages(self):
+        """Return a sorted list of pages in the index.  Hidden files and
+        directories are ignored as they are in the working tree.
+        """
+        pages = set()
+        for filename in list(self._entries) + list(self._written):
+            page = page_name(self.path, filename, '')
+            if page.endswith(self.ext) and not any(name.startswith('.')
+                                                   for name in page.split('/')):
+                pages.add(page[:-len(self.ext)])
+
+        return sorted(pages)
+
+    def read_lines(self, filename):
+        """Return lines of filename as staged, or None if filename is not in
+        the index.
+        """
+        if filename in self._written:
+            data = self._written[filename]
+        elif filename in self._entries:
+            data = self._cat_file.read(self._entries[filename][1])
+        else:
+            return None
+
+        return split_lines(data.decode('utf-8', 'surrogateescape'))
+
+    def write_lines(self, filename, lines):
+        """Write lines to filename unless its staged contents would not
+        change.  Returns True if the file was written.
+        """
+        data = _encode(lines)
+        current = self.read_lines(filename)
+        if current is not None and _encode(current) == data:
+            return False
+
+        self._written[filename] = data
+        return True
+
+    def update_page(self, page, update):
+        """Apply update to the lines of page, creating the page if it is not
+        in the index.  Returns True if the page was written.
+        """
+        filename = self.page_filename(page)
+        return self.write_lines(filename, update(self.read_lines(filename) or []))
+
+    def commit(self):
+        """Add files written to the index.  Files in the working tree are
+        updated only if they match the previously staged contents, so that
+        unstaged changes are preserved.  This method must be called within
+        the context.  Returns a list of files written.
+        """
+        entries = []
+        for filename, data in sorted(self._written.items()):
+            mode, obj = self._entries.get(filename, (DEFAULT_MODE, None))
+            entries.append((mode, git.hash_object(data),
+                            os.path.relpath(filename, self._toplevel)))
+
+            try:
+                with open(filename, 'rb') as f:
+                    clean = obj is not None and f.read() == self._cat_file.read(obj)
+            except FileNotFoundError:
+                clean = obj is None
+
+            if clean:
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                update_file(filename, data)
+            else:
+                logger.debug('Leaving unstaged changes to %s', filename)
+
+        git.update_index(entries)
+        written, self._written = sorted(self._written), {}
+        return written
+
+
+def generate_links(staged, syntax, page, pattern='', diary_rel_path=DIARY_REL_PATH,
+                   bullet=None):
+    """Create or update an overview of all staged pages matching the glob
+    pattern in page.  Pages in diary_rel_path are excluded.  Returns True
+    if page was written.
+    """
+    return staged.update_page(page, update_links(staged.pages(), syntax, page, pattern,
+                                                 diary_rel_path, bullet))
+
+
+def diary_generate_links(staged, syntax, diary_rel_path=DIARY_REL_PATH, bullet=None):
+    """Create or update an overview of staged diary pages in the diary index
+    of the diary directory diary_rel_path.  Returns True if the diary index
+    was written.
+    """
+    captions = {}
+    for page in staged.pages():
+        name = page.rpartition('/')[2]
+        if is_diary_page(page, diary_rel_path) and is_diary_entry(name):
+            lines = staged.read_lines(staged.page_filename(page))
+            captions[name] = find_caption(lines[:MAX_SCAN_FOR_CAPTION], get_syntax(syntax))
+
+    return staged.update_page(diary_rel_path + '/' + DIARY_INDEX,
+                              update_diary_links(captions, syntax, bullet))
+
+
+def rebuild_tags(staged, syntax, pages=None):
+    """Rebuild tag metadata for the given staged pages, or all staged pages
+    if pages is None or tag metadata is not staged.  Pages which are not
+    staged are removed from the metadata.  Returns True if the metadata was
+    written.
+    """
+    filename = os.path.join(staged.path, METADATA_FILE)
+    lines = staged.read_lines(filename)
+    if pages is None or lines is None:
+        metadata = {}
+        pages = staged.pages()
+    else:
+        metadata = parse_metadata(lines)
+
+    for page in pages:
+        lines = staged.read_lines(staged.page_filename(page))
+        if lines is None:
+            metadata.pop(page, None)
+        else:
+            metadata[page] = scan_tags(lines, page, get_syntax(syntax))
+
+    return staged.write_lines(filename, format_metadata(metadata, staged.ext))
@@ -0,0 +1,77 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import collections
+import re
+
+Syntax = collections.namedtuple('Syntax', ['name', 'header', 'tag', 'link',
+                                           'pre_start', 'pre_end'])
+
+# Regular expressions are translated from those used by Vimwiki for each
+# supported syntax (see autoload/vimwiki/vars.vim):
+_TAG = re.compile(r"(?:^|(?<=\s)):((?:[^:'\s]+:)+)(?=\s|$)")
+_WIKILINK = r'\[\[([^\]|]+)(?:\|.*?)?\]\]'
+
+SYNTAXES = {
+    'default': Syntax(name='default',
+                      header=re.compile(r'^\s*(={1,6})([^=].*[^=])\1\s*$'),
+                      tag=_TAG,
+                      link=re.compile(_WIKILINK),
+                      pre_start=re.compile(r'^\s*\{\{\{'),
+                      pre_end=re.compile(r'^\s*\}\}\}\s*$')),
+    'markdown': Syntax(name='markdown',
+                       header=re.compile(r'^\s*(#{1,6})([^#].*)$'),
+                       tag=_TAG,
+                       link=re.compile(_WIKILINK + r'|(?<!!)\[[^\]]*\]\(([^)\s]+)[^)]*\)'),
+                       pre_start=re.compile(r'^\s*```'),
+                       pre_end=re.compile(r'^\s*```\s*$')),
+    'media': Syntax(name='media',
+                    header=re.compile(r'^\s*(={1,6})([^=].*[^=])\1\s*$'),
+                    tag=_TAG,
+                    link=re.compile(_WIKILINK),
+                    pre_start=re.compile(r'^\s*<pre>'),
+                    pre_end=re.compile(r'^\s*</pre>\s*$'))
+}
+
+
+def get_syntax(name):
+    """Return Syntax for name, falling back to the default syntax."""
+    return SYNTAXES.get(name, SYNTAXES['default'])
+
+
+def split_lines(data):
+    """Split data into lines in the same manner as readfile()."""
+    if data.startswith('\ufeff'):
+        data = data[1:]
+
+    lines = data.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+
+    return [line[:-1] if line.endswith('\r') else line for line in lines]
+
+
+def read_lines(filename):
+    """Read lines from filename in the same manner as readfile()."""
+    with open(filename, encoding='utf-8', errors='surrogateescape', newline='') as f:
+        return split_lines(f.read())
@@ -32,8 +32,8 @@ def tags():
 
 
 @tags.command()
-@click.argument('page', callback=validate_nonempty)
-@click.argument('tags', nargs=-1)
+@click.argument('page', callback=validate_nonempty, shell_complete=complete_pages)
+@click.argument('tags', nargs=-1, shell_complete=complete_tags)
 @pass_wiki
 def generate_links(wiki, page, tags):
     """Create or update an overview of all tags in PAGE.
@@ -44,18 +44,71 @@ def generate_links(wiki, page, tags):
     wiki.generate_tag_links(page, tags)
 
 
+@tags.command('list')
+@click.option('-l', '--long', is_flag=True,
+              help='Print the number of locations of each tag.')
+@click.pass_context
+def list_tags(ctx, long):
+    """List tags found in the wiki.
+
+    Tag names are printed one per line from the tag metadata, which is read
+    without starting the editor.  If no tags are found, the exit status is
+    1.  This command requires tag metadata built using the rebuild
+    subcommand.
+    """
+    wiki = ctx.ensure_object(Wiki)
+    tags = wiki.list_tags()
+    for name in sorted(tags):
+        click.echo('%s\t%d' % (name, len(tags[name])) if long else name)
+
+    if not tags:
+        ctx.exit(1)
+
+
 @tags.command()
 @click.option('--all', is_flag=True,
               help='Rebuild all files, not just those that are newer.')
+@click.option('--engine', type=click.Choice(Wiki.ENGINES), default=Wiki.DEFAULT_ENGINE,
+              help='Engine used to rebuild tag metadata, defaults to vim.')
+@click.option('--only', multiple=True, type=click.Path(),
+              help='Rebuild only PATH; may be given more than once.  Requires the native engine.')
 @pass_wiki
-def rebuild(wiki, all):
-    """Rebuild tag metadata."""
-    wiki.rebuild_tags(all)
+def rebuild(wiki, all, engine, only):
+    """Rebuild tag metadata.
+
+    The native engine scans pages without starting the editor and writes the
+    same metadata file as Vimwiki; it uses the global --path, --ext, and
+    --syntax options to locate pages.  Pages are only scanned if their
+    content has changed since the last rebuild, regardless of mtime.
+    """
+    if only and engine != 'native':
+        raise click.UsageError('--only requires --engine native')
+
+    wiki.rebuild_tags(all, engine, only)
 
 
 @tags.command()
-@click.argument('pattern', callback=validate_nonempty)
-@pass_wiki
-def search(wiki, pattern):
-    """Search wiki for tags matching PATTERN."""
-    wiki.search_tags(pattern)
+@click.option('--print', 'print_', is_flag=True,
+              help='Print matches rather than opening them in the editor.')
+@click.argument('pattern', callback=validate_nonempty, shell_complete=complete_tags)
+@click.pass_context
+def search(ctx, print_, pattern):
+    """Search wiki for tags matching PATTERN.
+
+    If --print is given, each tag whose name matches the Python regular
+    expression PATTERN is printed as PAGE:LINE:TAG from the tag metadata
+    without starting the editor.  If no tags match, the exit status is 1.
+    """
+    wiki = ctx.ensure_object(Wiki)
+    if not print_:
+        wiki.search_tags(pattern)
+        return
+
+    validate_regex(ctx, None, pattern)
+
+    matches = wiki.search_tags(pattern, open=False)
+    for name, location in matches:
+        click.echo('%s:%d:%s' % (location.page, location.lineno, name))
+
+    if not matches:
+        ctx.exit(1)
@@ -0,0 +1,221 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import atexit
+import collections
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+Span = collections.namedtuple('Span', ['name', 'category', 'start', 'duration', 'depth', 'args'])
+
+# Spans are recorded before tracing is enabled so that startup, such as
+# importing and parsing arguments, can be reported; they are only written
+# once tracing is enabled.  Times are relative to when this module was
+# imported:
+_origin = time.perf_counter()
+_spans = []
+_depth = 0
+_timings = False
+_trace = None
+_finished = False
+
+# Categories of spans; editor spans are read from --startuptime output:
+CLI = 'cli'
+EDITOR = 'editor'
+
+# Number of spans kept until tracing is enabled; later spans are discarded
+# so that processes which never enable tracing, such as library users, do
+# not accumulate them:
+MAX_PENDING_SPANS = 64
+
+# Number of editor spans listed in the summary:
+SUMMARY_EDITOR_SPANS = 10
+
+# Lines of --startuptime output, either "clock self+sourced self: sourcing
+# script" or "clock elapsed: event":
+_STARTUPTIME = re.compile(r'^(\d+\.\d+)\s+(\d+\.\d+)(?:\s+\d+\.\d+)?:\s+(.*?)\s*$')
+
+
+def enable(timings=False, trace=None):
+    """Enable tracing.  If timings is set, a summary is written to standard
+    error on exit; if trace is given, spans are written to the named file
+    as Chrome trace-event JSON.
+    """
+    global _timings, _trace
+    if not (timings or trace):
+        return
+
+    if not enabled():
+        atexit.register(finish)
+
+    _timings = _timings or timings
+    _trace = _trace or trace
+
+
+def enabled():
+    """Return True if tracing is enabled."""
+    return bool(_timings or _trace)
+
+
+def reset():
+    """Disable tracing and discard recorded spans."""
+    global _origin, _depth, _timings, _trace, _finished
+    _origin = time.perf_counter()
+    _spans.clear()
+    _depth = 0
+    _timings = False
+    _trace = None
+    _finished = False
+
+
+def add_span(name, start, duration, category=CLI, depth=None, **args):
+    """Record a span which began at start, given by time.perf_counter(),
+    and lasted for duration seconds.  Unless tracing is enabled, at most
+    MAX_PENDING_SPANS are kept.
+    """
+    if not enabled() and len(_spans) >= MAX_PENDING_SPANS:
+        return
+
+    _spans.append(Span(name, category, start - _origin, duration,
+                       _depth if depth is None else depth, args))
+
+
+@contextlib.contextmanager
+def span(name, category=CLI, **args):
+    """Record a span lasting for the duration of the context."""
+    global _depth
+    start = time.perf_counter()
+    depth = _depth
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth = depth
+        add_span(name, start, time.perf_counter() - start, category, depth, **args)
+
+
+def read_startuptime(filename, start):
+    """Record editor spans from --startuptime output written to filename by
+    an editor started at start.
+    """
+    try:
+        with open(filename, errors='replace') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return
+
+    for line in lines:
+        match = _STARTUPTIME.match(line)
+        if match:
+            clock, elapsed, event = match.groups()
+            clock, elapsed = float(clock) / 1000, float(elapsed) / 1000
+            add_span(event, start + clock - elapsed, elapsed, EDITOR, 0)
+
+
+@contextlib.contextmanager
+def startuptime():
+    """Yield a filename to pass to the editor using --startuptime if tracing
+    is enabled, otherwise None.  The editor should be started within the
+    context; its output is recorded as editor spans once the context exits.
+    """
+    if not enabled():
+        yield None
+        return
+
+    with tempfile.TemporaryDirectory(prefix='vimwiki-cli-') as tmpdir:
+        filename = os.path.join(tmpdir, 'startuptime.log')
+        start = time.perf_counter()
+        yield filename
+        read_startuptime(filename, start)
+
+
+def summary():
+    """Return lines of a table summarizing recorded spans.  CLI spans are
+    listed in order, followed by the slowest editor spans.
+    """
+    cli = sorted((span for span in _spans if span.category == CLI), key=lambda span: span.start)
+    editor = sorted((span for span in _spans if span.category == EDITOR),
+                    key=lambda span: span.duration, reverse=True)[:SUMMARY_EDITOR_SPANS]
+
+    rows = [('  ' * span.depth + span.name, span) for span in cli]
+    if editor:
+        rows.append(('Slowest editor events:', None))
+        rows.extend(('  ' + span.name, span) for span in editor)
+
+    width = max([len(name) for name, _ in rows] + [4])
+    lines = ['%-*s  %10s  %10s' % (width, 'Span', 'Start (ms)', 'Time (ms)')]
+    for name, span in rows:
+        if span is None:
+            lines.append(name)
+        else:
+            lines.append('%-*s  %10.1f  %10.1f' % (width, name, span.start * 1000,
+                                                   span.duration * 1000))
+
+    return lines
+
+
+def trace_events():
+    """Return recorded spans as Chrome trace-event JSON.  Editor spans are
+    shown as a separate thread.
+    """
+    pid = os.getpid()
+    tids = {CLI: 0, EDITOR: 1}
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+               'args': {'name': category}}
+              for category, tid in tids.items()]
+    for span in _spans:
+        events.append({
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': round(span.start * 1e6, 3),
+            'dur': round(span.duration * 1e6, 3),
+            'pid': pid,
+            'tid': tids[span.category],
+            'args': span.args
+        })
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def finish():
+    """Write recorded spans if tracing is enabled.  This is called on exit,
+    and must be called before the process is replaced by the editor.
+    """
+    global _finished
+    if _finished or not enabled():
+        return
+
+    _finished = True
+    if _timings:
+        sys.stderr.write('\n'.join(summary()) + '\n')
+        sys.stderr.flush()
+
+    if _trace:
+        with open(_trace, 'w') as f:
+            json.dump(trace_events(), f, default=str)
@@ -0,0 +1,162 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import functools
+import logging
+import os
+
+import click
+
+from .context import *
+from .editor import ServerError
+from .watcher import PollingWatcher, collect, open_watcher
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for further changes before updating, so that a burst of
+# saves is handled at once:
+DEFAULT_DEBOUNCE = 0.2
+
+
+@click.command()
+@click.option('--tags/--no-tags', default=True,
+              help='Update tag metadata of changed pages.')
+@click.option('--links/--no-links', default=True,
+              help='Update links in --links-page when pages are added or removed, and in '
+                   'the diary index when diary pages change.')
+@click.option('--links-page', default='index', metavar='PAGE',
+              help='Page in which links are updated, defaults to index.')
+@click.option('--html/--no-html', default=None,
+              help='Convert changed pages to HTML, defaults to on for the default syntax.')
+@click.option('--debounce', type=click.FloatRange(min=0), default=DEFAULT_DEBOUNCE,
+              metavar='SECONDS',
+              help='Wait for further changes before updating, defaults to %g.' %
+                   DEFAULT_DEBOUNCE)
+@click.option('--poll', is_flag=True,
+              help='Poll for changes rather than using inotify.')
+@click.option('--interval', type=click.FloatRange(min=0, min_open=True),
+              default=PollingWatcher.DEFAULT_INTERVAL, metavar='SECONDS',
+              help='Time between polls, defaults to %g.' % PollingWatcher.DEFAULT_INTERVAL)
+@pass_wiki
+def watch(wiki, tags, links, links_page, html, debounce, poll, interval):
+    """Update generated files as pages change.
+
+    Pages are watched using inotify, or by polling if inotify is not
+    available.  Once changes stop for --debounce seconds, tag metadata and
+    HTML are updated for changed pages only, and links are updated when
+    pages are added or removed.  Files are brought up to date when watching
+    starts.  All updates use native engines, so the editor is never started;
+    the global --path, --ext, --syntax, --path-html, and --template-path
+    options are used to locate files.
+    """
+    if html is None:
+        html = wiki.syntax == 'default'
+    elif html and wiki.syntax != 'default':
+        raise click.UsageError('--html requires --syntax default')
+
+    if not os.path.isdir(wiki.path):
+        raise click.UsageError('wiki path %s does not exist' % wiki.path)
+
+    update = Updater(wiki, tags, links, links_page, html)
+    try:
+        with open_watcher(wiki.path, wiki.ext, poll, interval) as watcher:
+            report(update(None))
+            while True:
+                report(update(collect(watcher, debounce)))
+    except KeyboardInterrupt:
+        pass
+
+
+class Updater(object):
+    """Callable which updates files generated from the pages of wiki, given
+    a set of filenames of changed pages, or None if any page may have
+    changed.  Returns a list of (name, error) for each update, where error
+    is None on success; an update which fails does not prevent the others.
+    """
+
+    def __init__(self, wiki, tags=True, links=True, links_page='index', html=True):
+        self._wiki = wiki
+        self._tags = tags
+        self._links = links
+        self._links_page = links_page
+        self._html = html
+        self._pages = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__,
+                           self._wiki)
+
+    def steps(self, filenames):
+        """Return a list of (name, function) updating files affected by
+        filenames.
+        """
+        from .pages import is_diary_page, list_pages, page_name
+
+        wiki = self._wiki
+        pages = set(list_pages(wiki.path, wiki.ext))
+        added_or_removed = pages != self._pages
+        self._pages = pages
+
+        if filenames is None:
+            only = ()
+            changed = pages
+        else:
+            only = sorted(filenames)
+            changed = [page_name(wiki.path, filename, wiki.ext) for filename in only]
+
+        steps = []
+        if self._links and added_or_removed:
+            steps.append(('generate-links ' + self._links_page,
+                          functools.partial(wiki.generate_links, self._links_page,
+                                            engine='native')))
+        if self._links and any(is_diary_page(page, wiki.diary_rel_path) for page in changed):
+            steps.append(('diary generate-links',
+                          functools.partial(wiki.diary_generate_links, engine='native')))
+        if self._tags:
+            steps.append(('tags rebuild',
+                          functools.partial(wiki.rebuild_tags, engine='native', only=only)))
+        if self._html:
+            steps.append(('all-html',
+                          functools.partial(wiki.all_html, engine='native', only=only)))
+
+        return steps
+
+    def __call__(self, filenames):
+        results = []
+        for name, function in self.steps(filenames):
+            try:
+                function()
+                results.append((name, None))
+            except (OSError, ConfigError, ServerError, click.ClickException) as e:
+                results.append((name, str(e)))
+
+        return results
+
+
+def report(results):
+    """Report the result of each update."""
+    for name, error in results:
+        if error:
+            logger.error('%s: %s', name, error)
+        else:
+            click.echo('%s: ok' % name)
@@ -0,0 +1,253 @@
+# Copyright (C) 2026 Steven Stallion <sstallion@gmail.com>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR AND CONTRIBUTORS ``AS IS' AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY
+# OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+
+import ctypes
+import logging
+import os
+import select
+import struct
+import time
+
+from .pages import changed_files, snapshot
+
+logger = logging.getLogger(__name__)
+
+# Events of inotify(7) used to detect changes to pages:
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+# Header of each event read from an inotify file descriptor:
+_EVENT = struct.Struct('iIII')
+
+_BUFFER_SIZE = 65536
+
+
+def _is_page(filename, ext):
+    name = os.path.basename(filename)
+    return name.endswith(ext) and not name.startswith('.')
+
+
+class InotifyWatcher(object):
+    """Watcher of pages in the wiki rooted at path using inotify(7).  Each
+    directory is watched, other than hidden directories.  Raises OSError if
+    inotify is not available or directories cannot be watched.  Instances
+    should be used as a context manager.
+    """
+
+    def __init__(self, path, ext):
+        self._path = path
+        self._ext = ext
+        self._fd = None
+        self._dirs = {}
+        try:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            self._libc.inotify_init1
+        except (AttributeError, OSError):
+            raise OSError('inotify is not available')
+
+        self._watch()
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__,
+                               self._path,
+                               self._ext)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _error(self, filename=None):
+        error = ctypes.get_errno()
+        return OSError(error, os.strerror(error), filename)
+
+    def _watch(self):
+        self.close()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            self._fd = None
+            raise self._error()
+
+        self._dirs = {}
+        try:
+            self._add(self._path)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, dirname):
+        # Returns pages found in directories which are added, as they may
+        # have been written before the watch was added:
+        pages = set()
+        for root, dirs, files in os.walk(dirname):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                raise self._error(root)
+
+            self._dirs[wd] = root
+            pages.update(os.path.join(root, name) for name in files
+                         if _is_page(name, self._ext))
+
+        return pages
+
+    def _events(self):
+        try:
+            data = os.read(self._fd, _BUFFER_SIZE)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            yield wd, mask, name
+
+    def read(self, timeout=None):
+        """Wait for pages to change for up to timeout seconds, or until they
+        change if timeout is None.  Returns a set of filenames of pages which
+        were added, removed, or modified, which is empty if none changed
+        before the timeout, or None if any page may have changed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                break
+
+            rescan = False
+            for wd, mask, name in self._events():
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                elif mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                elif wd in self._dirs and not name.startswith('.'):
+                    filename = os.path.join(self._dirs[wd], name)
+                    if not mask & IN_ISDIR:
+                        if _is_page(filename, self._ext):
+                            changed.add(filename)
+                    elif mask & IN_MOVED_FROM:
+                        # Pages within the directory are not reported:
+                        rescan = True
+                    elif mask & (IN_CREATE | IN_MOVED_TO):
+                        changed.update(self._add(filename))
+
+            if rescan:
+                logger.debug('Watching %s again', self._path)
+                self._watch()
+                return None
+
+        return changed
+
+
+class PollingWatcher(object):
+    """Watcher of pages in the wiki rooted at path which compares the stat
+    of each page every interval seconds.  Instances should be used as a
+    context manager.
+    """
+    DEFAULT_INTERVAL = 0.5
+
+    def __init__(self, path, ext, interval=DEFAULT_INTERVAL):
+        self._path = path
+        self._ext = ext
+        self._interval = interval
+        self._files = self._scan()
+
+    def __repr__(self):
+        return '%s(%r, %r, %r)' % (self.__class__.__name__,
+                                   self._path,
+                                   self._ext,
+                                   self._interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def _scan(self):
+        return {filename: stat for filename, stat in snapshot(self._path).items()
+                if _is_page(filename, self._ext)}
+
+    def read(self, timeout=None):
+        """Wait for pages to change for up to timeout seconds, or until they
+        change if timeout is None.  Returns a set of filenames of pages which
+        were added, removed, or modified, which is empty if none changed
+        before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            time.sleep(self._interval if remaining is None else min(self._interval, remaining))
+
+            files = self._scan()
+            changed = set(changed_files(self._files, files))
+            self._files = files
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+def open_watcher(path, ext, poll=False, interval=PollingWatcher.DEFAULT_INTERVAL):
+    """Return a watcher of pages in the wiki rooted at path, which uses
+    inotify unless poll is set or inotify is not available.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(path, ext)
+        except OSError as e:
+            logger.warning('Polling for changes: %s', e)
+
+    return PollingWatcher(path, ext, interval)
+
+
+def collect(watcher, debounce):
+    """Wait for pages to change, then collect further changes until none
+    are made for debounce seconds.  Returns a set of filenames of changed
+    pages, or None if any page may have changed.
+    """
+    changed = watcher.read()
+    while True:
+        more = watcher.read(debounce)
+        if more == set():
+            return changed
+
+        changed = None if changed is None or more is None else changed | more
@@ -21,9 +21,33 @@
 # OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 
+import collections
+import contextlib
+import itertools
+import logging
 import os
+import time
 
-from .editor import Command, GlobalCommand, LocalCommand, DiaryCommand
+from .editor import (Batch, Command, GlobalCommand, LocalCommand, DiaryCommand, InteractiveError,
+                     Server)
+from .settings import DEFAULT_WIKI, ConfigError, load_wikis, select_wiki, settings_cached
+
+# Result of an operation run by a Wiki in library mode.  files is a sorted
+# list of files below the wiki and HTML paths which the operation added,
+# removed, or modified, or None unless track_files is set; value is returned
+# by native engines:
+Result = collections.namedtuple('Result', ['returncode', 'messages', 'duration', 'files',
+                                           'value'])
+
+
+class _MessageHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
 
 
 class Wiki(object):
@@ -32,14 +56,45 @@ class Wiki(object):
     DEFAULT_SELECT = False
     DEFAULT_OPEN_MATCHES = False
     DEFAULT_OPEN_TABS = False
+    DEFAULT_INTERACTIVE = True
+    DEFAULT_SERVER = False
+    DEFAULT_SERVERNAME = 'VIMWIKI'
+    DEFAULT_TIMEOUT = None
+    DEFAULT_PATH = None
+    DEFAULT_EXT = None
+    DEFAULT_SYNTAX = None
+    DEFAULT_PATH_HTML = None
+    DEFAULT_TEMPLATE_PATH = None
+    DEFAULT_DIARY_REL_PATH = None
+    DEFAULT_LIST_MARKERS = None
+    DEFAULT_USER_HTMLS = None
+    DEFAULT_LIBRARY = False
+    DEFAULT_TRACK_FILES = False
+
+    # Engines used to implement commands; the editor is used by default,
+    # while native engines avoid starting the editor entirely.  Native
+    # modules are imported when used so that launching the editor is not
+    # delayed by modules it does not need:
+    ENGINES = ('vim', 'native')
+    DEFAULT_ENGINE = 'vim'
 
     def __init__(self, **options):
         self._options = options
+        self._batch = None
+        self._settings = None
 
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__,
                            self._options)
 
+    def has_option(self, name):
+        """Return True if option name was given explicitly."""
+        return self._options.get(name) is not None
+
+    def replace(self, **options):
+        """Return a new Wiki with options replacing those given."""
+        return Wiki(**dict(self._options, **options))
+
     @property
     def editor(self):
         return self._options.get('editor', Wiki.DEFAULT_EDITOR)
@@ -60,80 +115,367 @@ class Wiki(object):
     def open_tabs(self):
         return self._options.get('open_tabs', Wiki.DEFAULT_OPEN_TABS)
 
+    @property
+    def interactive(self):
+        return self._options.get('interactive', Wiki.DEFAULT_INTERACTIVE)
+
+    @property
+    def server(self):
+        return self._options.get('server', Wiki.DEFAULT_SERVER)
+
+    @property
+    def servername(self):
+        return self._options.get('servername', Wiki.DEFAULT_SERVERNAME)
+
+    @property
+    def timeout(self):
+        return self._options.get('timeout', Wiki.DEFAULT_TIMEOUT)
+
+    @property
+    def path(self):
+        return os.path.expanduser(self._setting('path', Wiki.DEFAULT_PATH))
+
+    @property
+    def ext(self):
+        return self._setting('ext', Wiki.DEFAULT_EXT)
+
+    @property
+    def syntax(self):
+        return self._setting('syntax', Wiki.DEFAULT_SYNTAX)
+
+    @property
+    def path_html(self):
+        path_html = self._setting('path_html', Wiki.DEFAULT_PATH_HTML)
+        if path_html is None:
+            return self.path.rstrip(os.sep) + '_html'
+
+        return os.path.expanduser(path_html)
+
+    @property
+    def template_path(self):
+        template_path = self._setting('template_path', Wiki.DEFAULT_TEMPLATE_PATH)
+        if template_path is None:
+            return os.path.join(self.path, 'templates')
+
+        return os.path.expanduser(template_path)
+
+    @property
+    def diary_rel_path(self):
+        return self._setting('diary_rel_path', Wiki.DEFAULT_DIARY_REL_PATH)
+
+    @property
+    def bullet(self):
+        # Like Vimwiki, lists are generated using the first list marker; None
+        # selects the default marker for the syntax:
+        list_markers = self._setting('list_markers', Wiki.DEFAULT_LIST_MARKERS)
+        return list_markers[0] if list_markers else None
+
+    @property
+    def user_htmls(self):
+        # Like Vimwiki, user HTML files are given as a comma-separated list
+        # of file names:
+        user_htmls = self._setting('user_htmls', Wiki.DEFAULT_USER_HTMLS) or ''
+        return [name.strip() for name in user_htmls.split(',') if name.strip()]
+
+    @property
+    def library(self):
+        return self._options.get('library', Wiki.DEFAULT_LIBRARY)
+
+    @property
+    def track_files(self):
+        return self._options.get('track_files', Wiki.DEFAULT_TRACK_FILES)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Queue commands issued within the context in a Batch rather than
+        running them immediately.  The yielded Batch should be run once the
+        context exits.
+        """
+        batch = Batch(self)
+        self._batch = batch
+        try:
+            yield batch
+        finally:
+            self._batch = None
+
+    def _setting(self, name, default):
+        # Settings which are not given are read from the wiki selected by
+        # count, or the first wiki like Vimwiki if settings have been cached;
+        # otherwise the Vimwiki defaults are used:
+        value = self._options.get(name, default)
+        if value is not None:
+            return value
+
+        if self._settings is None:
+            if self.count is None and not settings_cached(self.editor):
+                return DEFAULT_WIKI[name]
+
+            self._settings = select_wiki(load_wikis(self.editor), self.count or 1)
+
+        return self._settings[name]
+
+    def _page_name(self, page):
+        # Pages given to native commands are relative to the wiki root and
+        # may include the extension:
+        if self.ext and page.endswith(self.ext):
+            page = page[:-len(self.ext)]
+
+        return page.strip('/')
+
+    def page_filename(self, page):
+        """Return filename of page in the wiki."""
+        return os.path.join(self.path, *(self._page_name(page) + self.ext).split('/'))
+
+    def _run(self, command):
+        if command.interactive and not self.interactive:
+            raise InteractiveError('interactive commands are disabled by --no-interactive')
+
+        if self._batch is not None:
+            self._batch.add(command)
+        elif self.library:
+            if command.interactive:
+                raise InteractiveError('interactive commands cannot be run in library mode')
+
+            return self._result(lambda: (command.call(), None))
+        else:
+            command.run()
+
+    def _native(self, function, *args, **kwargs):
+        if self.library:
+            return self._result(lambda: (0, function(*args, **kwargs)))
+
+        return function(*args, **kwargs)
+
+    def _result(self, function):
+        # Operations run in library mode return a Result rather than
+        # exiting; messages logged by the operation are captured, and files
+        # are found by comparing snapshots taken before and after, which
+        # walks both paths and so is only done if requested:
+        from .pages import changed_files, snapshot
+
+        paths = sorted({self.path, self.path_html}) if self.track_files else []
+        handler = _MessageHandler()
+        logger = logging.getLogger(__package__)
+        logger.addHandler(handler)
+        try:
+            before = snapshot(*paths)
+            start = time.perf_counter()
+            returncode, value = function()
+            duration = time.perf_counter() - start
+            files = changed_files(before, snapshot(*paths)) if paths else None
+        finally:
+            logger.removeHandler(handler)
+
+        return Result(returncode, handler.messages, duration, files, value)
+
+    # Config commands:
+
+    def wikis(self, refresh=False):
+        """Return settings of each wiki configured in the editor.  Settings
+        are cached until the user's vimrc changes unless refresh is set.
+        """
+        return self._native(load_wikis, self.editor, refresh)
+
+    # Server commands:
+
+    def start_server(self):
+        """Start editor server."""
+        from . import parallel
+        return self._native(parallel.run, Server(self).start())
+
+    def stop_server(self):
+        """Stop editor server."""
+        from . import parallel
+        return self._native(parallel.run, Server(self).stop())
+
+    def server_status(self):
+        """Return address of editor server if running, otherwise None."""
+        from . import parallel
+        return self._native(parallel.run, Server(self).status())
+
     # Help commands:
 
     def help(self):
         """Open plugin help file."""
-        Command(self, 'help vimwiki.txt', 'only').run()
+        self._run(Command(self, 'help vimwiki.txt', 'only'))
 
     # Global commands:
 
     def index(self):
         """Open wiki index."""
-        GlobalCommand(self, 'VimwikiIndex').run()
+        self._run(GlobalCommand(self, 'VimwikiIndex'))
 
     def diary_index(self):
         """Open diary index."""
-        GlobalCommand(self, 'VimwikiDiaryIndex').run()
+        self._run(GlobalCommand(self, 'VimwikiDiaryIndex'))
 
     def make_diary_note(self):
         """Open diary page for today."""
-        GlobalCommand(self, 'VimwikiMakeDiaryNote').run()
+        self._run(GlobalCommand(self, 'VimwikiMakeDiaryNote'))
 
     def make_yesterday_diary_note(self):
         """Open diary page for yesterday."""
-        GlobalCommand(self, 'VimwikiMakeYesterdayDiaryNote').run()
+        self._run(GlobalCommand(self, 'VimwikiMakeYesterdayDiaryNote'))
 
     def make_tomorrow_diary_note(self):
         """Open diary page for tomorrow."""
-        GlobalCommand(self, 'VimwikiMakeTomorrowDiaryNote').run()
+        self._run(GlobalCommand(self, 'VimwikiMakeTomorrowDiaryNote'))
 
     # Local commands:
 
     def goto(self, page):
         """Open or create page."""
         assert page.strip()
-        LocalCommand(self, 'VimwikiGoto ' + page).run()
+        self._run(LocalCommand(self, 'VimwikiGoto ' + page))
 
-    def search(self, pattern):
-        """Search wiki for text matching pattern."""
+    def search(self, pattern, open=True, regex=False, index=True, max_count=None):
+        """Search wiki for text matching pattern.  Unless open is set, an
+        iterator of Match is returned from the search index rather than
+        opening the matches in the editor.  If regex is set, pattern is
+        treated as a regular expression rather than a list of words.  If
+        index is not set, pages are scanned directly rather than using the
+        search index.  At most max_count matches are returned if given; in
+        library mode, the value of the Result is a list of Match.
+        """
         assert pattern.strip()
-        LocalCommand(self, 'silent! VimwikiSearch ' + pattern,
-                     open_matches=True).run()
+        if not open:
+            matches = self._search(pattern, regex, index, max_count)
+            return self._native(list, matches) if self.library else matches
+
+        self._run(LocalCommand(self, 'silent! VimwikiSearch ' + pattern,
+                               open_matches=True))
+
+    def _search(self, pattern, regex, index, max_count):
+        from .search import SearchIndex, grep
 
-    def generate_links(self, page, pattern=''):
-        """Create or update an overview of all pages in page."""
+        if not os.path.isdir(self.path):
+            raise ConfigError('wiki %s does not exist' % self.path)
+
+        if not index:
+            yield from grep(self.path, self.ext, pattern, regex=regex, max_count=max_count)
+            return
+
+        with SearchIndex(self.path, self.ext) as search_index:
+            if not search_index.is_current():
+                search_index.update()
+            if regex:
+                matches = search_index.search_regex(pattern)
+            else:
+                matches = search_index.search(pattern)
+            yield from itertools.islice(matches, max_count)
+
+    def generate_links(self, page, pattern='', engine=DEFAULT_ENGINE):
+        """Create or update an overview of all pages in page.  The native
+        engine writes page only if the overview changes.
+        """
+        assert page.strip()
+        if engine == 'native':
+            from . import listing
+            return self._native(listing.generate_links, self.path, self.ext, self.syntax,
+                                self._page_name(page), pattern, self.diary_rel_path,
+                                self.bullet)
+
+        return self._run(LocalCommand(self, 'VimwikiGoto ' + page,
+                                      'VimwikiGenerateLinks ' + pattern,
+                                      interactive=False, write_quit=True))
+
+    def diary_generate_links(self, engine=DEFAULT_ENGINE):
+        """Create or update an overview of diary pages.  The native engine
+        writes the diary index only if the overview changes.
+        """
+        if engine == 'native':
+            from . import listing
+            return self._native(listing.diary_generate_links, self.path, self.ext, self.syntax,
+                                self.diary_rel_path, self.bullet)
+
+        return self._run(DiaryCommand(self, 'VimwikiDiaryGenerateLinks',
+                                      interactive=False, write_quit=True))
+
+    def all_html(self, all=False, engine=DEFAULT_ENGINE, only=()):
+        """Convert all wiki pages to HTML.  The native engine converts pages
+        in parallel without starting the editor, or only the given files.
+        """
+        if engine == 'native':
+            from . import html
+            return self._native(html.all_html, self.path, self.ext, self.path_html,
+                                self.template_path, all=all, only=only,
+                                diary_rel_path=self.diary_rel_path,
+                                user_htmls=self.user_htmls)
+
+        assert not only
+
+        return self._run(LocalCommand(self, 'silent! VimwikiAll2HTML' + ('!' if all else ''),
+                                      interactive=False, quit=True))
+
+    def backlinks(self, page):
+        """Return a list of Link for each link to page from another page.
+        The link index is only updated if a page has been added, removed, or
+        replaced since the last update.
+        """
         assert page.strip()
-        LocalCommand(self, 'VimwikiGoto ' + page, 'VimwikiGenerateLinks ' + pattern,
-                     interactive=False, write_quit=True).run()
-
-    def diary_generate_links(self):
-        """Create or update an overview of diary pages."""
-        DiaryCommand(self, 'VimwikiDiaryGenerateLinks',
-                     interactive=False, write_quit=True).run()
-
-    def all_html(self, all=False):
-        """Convert all wiki pages to HTML."""
-        LocalCommand(self, 'silent! VimwikiAll2HTML' + ('!' if all else ''),
-                     interactive=False, quit=True).run()
-
-    def check_links(self):
-        """Search files and check reachability of links."""
-        LocalCommand(self, 'VimwikiCheckLinks').run()
-
-    def rebuild_tags(self, all=False):
-        """Rebuild tag metadata."""
-        LocalCommand(self, 'VimwikiRebuildTags' + ('!' if all else ''),
-                     interactive=False, quit=True).run()
-
-    def search_tags(self, pattern):
-        """Search wiki for tags matching pattern."""
+        from . import links
+        return self._native(links.backlinks, self.path, self.ext, self.syntax,
+                            self._page_name(page), self.diary_rel_path)
+
+    def orphans(self):
+        """Return a list of pages which are not linked to from any other
+        page.  The link index is only updated if a page has been added,
+        removed, or replaced since the last update.
+        """
+        from . import links
+        return self._native(links.orphans, self.path, self.ext, self.syntax,
+                            self.diary_rel_path)
+
+    def check_links(self, engine=DEFAULT_ENGINE):
+        """Search files and check reachability of links.  The native engine
+        returns a list of Link for each broken link rather than opening the
+        results in the editor.
+        """
+        if engine == 'native':
+            from . import links
+            return self._native(links.check_links, self.path, self.ext, self.syntax,
+                                diary_rel_path=self.diary_rel_path)
+
+        return self._run(LocalCommand(self, 'VimwikiCheckLinks'))
+
+    def rebuild_tags(self, all=False, engine=DEFAULT_ENGINE, only=()):
+        """Rebuild tag metadata.  The native engine rebuilds files whose
+        content has changed, or only the given files.
+        """
+        if engine == 'native':
+            from . import metadata
+            return self._native(metadata.rebuild_tags, self.path, self.ext, self.syntax,
+                                all=all, only=only)
+
+        assert not only
+
+        return self._run(LocalCommand(self, 'VimwikiRebuildTags' + ('!' if all else ''),
+                                      interactive=False, quit=True))
+
+    def list_tags(self):
+        """Return a mapping of tag name to a list of Location read from the
+        tag metadata, which must be built using rebuild_tags.
+        """
+        from . import metadata
+        return self._native(metadata.load_tags, self.path)
+
+    def search_tags(self, pattern, open=True):
+        """Search wiki for tags matching pattern.  Unless open is set, a list
+        of (name, Location) for each tag whose name matches the regular
+        expression pattern is returned from the tag metadata rather than
+        opening the matches in the editor.
+        """
         assert pattern.strip()
-        LocalCommand(self, 'silent! VimwikiSearchTags ' + pattern,
-                     open_matches=True).run()
+        if not open:
+            from . import metadata
+            return self._native(metadata.search_tags, self.path, pattern)
+
+        return self._run(LocalCommand(self, 'silent! VimwikiSearchTags ' + pattern,
+                                      open_matches=True))
 
     def generate_tag_links(self, page, tags=()):
         """Create or update an overview of all tags in page."""
         assert page.strip()
-        LocalCommand(self, 'VimwikiGoto ' + page, 'VimwikiGenerateTagLinks ' + ' '.join(tags),
-                     interactive=False, write_quit=True).run()
+        return self._run(LocalCommand(self, 'VimwikiGoto ' + page,
+                                      'VimwikiGenerateTagLinks ' + ' '.join(tags),
+                                      interactive=False, write_quit=True))